@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Throughput benchmarks of labelx_controller against a fake GitLab server"""
+
+# Import builtin libraries
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+# Import external python libraries
+import click
+
+# Import custom (local) python libraries
+from labelx import api_manager, cache_manager, controller
+from tests.fake_gitlab import FakeGitLab
+
+
+# Run labelx_controller once against a fake server
+def run_benchmark(
+    catalog_size=100,
+    target_count=1,
+    workers=8,
+    engine="threads",
+    sync=False,
+    latency=0.0,
+    error_rate=0.0,
+    throttle_rate=0.0,
+):
+    """
+    Creates a catalog of labels in a number of projects and measures the run
+
+    :param catalog_size: (int) Labels in the catalog
+    :param target_count: (int) Number of projects
+    :param workers: (int) Number of concurrent API calls
+    :param engine: (str) threads/asyncio
+    :param sync: (boolean) Run with --sync
+    :param latency: (float) Seconds every request takes
+    :param error_rate: (float) Share of requests answered with 503
+    :param throttle_rate: (float) Share of requests answered with 429
+    :returns: (dict) Parameters, API calls, wall time and calls per second
+    """
+
+    catalog = {
+        f"component::{number:05d}": {"color": "#0033CC", "description": f"{number}"}
+        for number in range(catalog_size)
+    }
+    targets = [("project", number) for number in range(1, target_count + 1)]
+    fake_gitlab = FakeGitLab(
+        latency=latency, error_rate=error_rate, throttle_rate=throttle_rate
+    )
+    with fake_gitlab, tempfile.TemporaryDirectory() as cache_dir, mock.patch.object(
+        cache_manager, "cache_directory", Path(cache_dir)
+    ), mock.patch.object(
+        controller, "get_host_url", return_value=fake_gitlab.url
+    ), mock.patch.object(
+        controller, "get_headers", return_value={"Content-Type": "application/json"}
+    ), mock.patch.object(
+        controller, "generate_payload", return_value=catalog
+    ), contextlib.redirect_stdout(
+        io.StringIO()
+    ):
+        started = time.perf_counter()
+        try:
+            controller.labelx_controller(
+                endpoint="labels",
+                workers=workers,
+                engine=engine,
+                sync=sync,
+                targets=iter(targets),
+            )
+        finally:
+            wall_time = time.perf_counter() - started
+            api_manager.close_sessions()
+            api_manager.set_retry_policy()
+    calls = sum(fake_gitlab.calls.values())
+    return {
+        "catalog_size": catalog_size,
+        "targets": target_count,
+        "workers": workers,
+        "engine": engine,
+        "calls": calls,
+        "wall_time": round(wall_time, 4),
+        "calls_per_second": round(calls / wall_time, 1),
+    }
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="10,100,1000",
+    show_default=True,
+    help="Comma separated catalog sizes.",
+)
+@click.option(
+    "--targets",
+    "target_counts",
+    default="1,10",
+    show_default=True,
+    help="Comma separated target counts.",
+)
+@click.option("-w", "--workers", default=8, show_default=True, type=int)
+@click.option(
+    "-e",
+    "--engine",
+    default="threads",
+    show_default=True,
+    type=click.Choice(["threads", "asyncio"]),
+)
+@click.option("--sync", is_flag=True, default=False, help="Run with --sync.")
+@click.option(
+    "--latency",
+    default=0.005,
+    show_default=True,
+    type=float,
+    help="Seconds every request takes.",
+)
+@click.option(
+    "--error-rate",
+    default=0.0,
+    show_default=True,
+    type=float,
+    help="Share of requests answered with 503.",
+)
+@click.option(
+    "--throttle-rate",
+    default=0.0,
+    show_default=True,
+    type=float,
+    help="Share of requests answered with 429.",
+)
+@click.option("-o", "--output", default=None, help="Write the results to a JSON file.")
+@click.option(
+    "--baseline",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON results of an earlier run to compare with.",
+)
+@click.option(
+    "--max-regression",
+    default=0.2,
+    show_default=True,
+    type=float,
+    help="Allowed calls/sec drop against the baseline.",
+)
+def main(
+    sizes,
+    target_counts,
+    workers,
+    engine,
+    sync,
+    latency,
+    error_rate,
+    throttle_rate,
+    output,
+    baseline,
+    max_regression,
+):
+    """Benchmarks labelx_controller across catalog sizes and target counts"""
+
+    results = []
+    click.echo(
+        f"{'catalog':>8} {'targets':>8} {'calls':>8} {'wall (s)':>10} {'calls/s':>10}"
+    )
+    for target_count in [int(value) for value in target_counts.split(",")]:
+        for catalog_size in [int(value) for value in sizes.split(",")]:
+            result = run_benchmark(
+                catalog_size=catalog_size,
+                target_count=target_count,
+                workers=workers,
+                engine=engine,
+                sync=sync,
+                latency=latency,
+                error_rate=error_rate,
+                throttle_rate=throttle_rate,
+            )
+            results.append(result)
+            click.echo(
+                f"{catalog_size:>8} {target_count:>8} {result['calls']:>8} "
+                f"{result['wall_time']:>10.3f} {result['calls_per_second']:>10.1f}"
+            )
+    if output:
+        with open(output, "w") as stream:
+            json.dump(results, stream, indent=4)
+    if baseline:
+        with open(baseline) as stream:
+            previous = {
+                (result["catalog_size"], result["targets"]): result
+                for result in json.load(stream)
+            }
+        regressions = []
+        for result in results:
+            before = previous.get((result["catalog_size"], result["targets"]))
+            if before is None:
+                continue
+            limit = before["calls_per_second"] * (1 - max_regression)
+            if result["calls_per_second"] < limit:
+                regressions.append(result)
+                click.secho(
+                    f"[x] {result['catalog_size']} labels x {result['targets']} "
+                    f"targets: {result['calls_per_second']} calls/s, "
+                    f"baseline {before['calls_per_second']} calls/s",
+                    fg="red",
+                )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
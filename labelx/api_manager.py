@@ -4,36 +4,272 @@
 """This module handles the API calls"""
 
 # Import builtin python libraries
+from email.utils import parsedate_to_datetime
 import json
 import logging
-import sys
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import warnings
 
 # Import external python libraries
 import click
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DependencyWarning, InsecureRequestWarning
 
 # Import custom (local) python packages
-from .settings import generate_endpoints, get_authentication
+from . import cache_manager
+from .log_manager import Lazy, mask_secrets
+from .stats_manager import record_call
+from .settings import generate_endpoints, get_authentication, default_pool_size
+from .settings import accepted_status_codes, per_page
+from .settings import rate_limit_safety, default_retry_after, request_timeout
+from .settings import retry_status_codes, default_max_attempts
+from .settings import retry_backoff, max_retry_backoff
 
 # Source code meta data
 __author__ = "Dalwar Hossain"
 __email__ = "dalwar23@pm.me"
 
+# urllib3's DependencyWarnings, InsecureRequestWarning should be silenced.
+warnings.simplefilter("ignore", DependencyWarning)
+warnings.simplefilter("ignore", InsecureRequestWarning)
+
+# Long-lived sessions, one per GitLab host
+_sessions = {}
+_pool_sizes = {}
+_sessions_lock = threading.Lock()
+
+# Rate limiters, one per GitLab host
+_rate_limiters = {}
+
+# Response headers kept with cached list pages
+page_headers = ["X-Next-Page", "X-Total-Pages"]
+
+
+# Rate limiter class
+class RateLimiter(object):
+    """
+    Token bucket shared by all the calls to one GitLab host
+
+    The bucket starts with ``rate`` calls per second (unlimited if None) and is
+    re-paced from the ``RateLimit-Remaining``/``RateLimit-Reset`` headers of
+    every response, so the remaining budget is spread evenly until the window
+    resets. ``Retry-After`` pauses every caller until the given time.
+    """
+
+    def __init__(self, rate=None):
+        """Constructor method for rate limiter class"""
+
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes one token from the bucket
+
+        :returns: (float) Seconds the caller has to wait before the call
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            delay = max(0.0, self.paused_until - now)
+            if self.rate is None:
+                return delay
+            elapsed = now - self.updated
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens < 0:
+                delay = max(delay, -self.tokens / self.rate)
+            return delay
+
+    def acquire(self):
+        """Blocks until the caller may make the next call"""
+
+        delay = self.reserve()
+        if delay > 0:
+            logging.debug("[*] Rate limited, waiting %.2fs.....", delay)
+            time.sleep(delay)
+
+    def update(self, headers=None, status_code=None):
+        """
+        Adapts the pace to the rate limit headers of a response
+
+        :param headers: (dict) Response headers
+        :param status_code: (int) Response status code
+        """
+
+        headers = headers or {}
+        retry_after = _seconds_until(headers.get("Retry-After"))
+        remaining = headers.get("RateLimit-Remaining")
+        reset = headers.get("RateLimit-Reset")
+        with self.lock:
+            now = time.monotonic()
+            if status_code == 429 and retry_after is None:
+                retry_after = default_retry_after
+            if retry_after is not None:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            if remaining is None or reset is None:
+                return
+            try:
+                remaining = int(remaining)
+                window = max(float(reset) - time.time(), 1.0)
+            except ValueError:
+                return
+            if remaining <= 0:
+                self.paused_until = max(self.paused_until, now + window)
+                return
+            rate = remaining / window * rate_limit_safety
+            if self.max_rate is not None:
+                rate = min(rate, self.max_rate)
+            if self.rate is None:
+                self.tokens = max(1.0, rate)
+                self.updated = now
+            self.rate = rate
+            self.capacity = max(1.0, rate)
+
+
+# Retry policy class
+class RetryPolicy(object):
+    """
+    Exponential backoff with full jitter for transient API failures
+
+    Connection errors, timeouts and ``retry_status_codes`` are retried up to
+    ``max_attempts`` calls per item. ``budget`` caps the retries of the whole
+    run, so a failing host can not multiply the number of calls. Calls
+    answered with 429 are not delayed here, the rate limiter already pauses
+    them until ``Retry-After``.
+    """
+
+    def __init__(self, max_attempts=default_max_attempts, budget=None):
+        """Constructor method for retry policy class"""
+
+        self.max_attempts = max_attempts
+        self.budget = budget
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def next_delay(self, attempt=None, status_code=None, error=None):
+        """
+        Decides if a call is retried
+
+        :param attempt: (int) Number of calls made so far for the item
+        :param status_code: (int) Response status code
+        :param error: (Exception) Transport error of the call
+        :returns: (float) Seconds before the next call or None to give up
+        """
+
+        if error is None and status_code not in retry_status_codes:
+            return None
+        if attempt >= self.max_attempts:
+            return None
+        with self.lock:
+            if self.budget is not None and self.retries >= self.budget:
+                return None
+            self.retries += 1
+        if status_code == 429:
+            return 0.0
+        return random.uniform(
+            0, min(max_retry_backoff, retry_backoff * 2 ** (attempt - 1))
+        )
+
+
+# Failed response class
+class FailedResponse(object):
+    """Stands in for the response of a call that could not be made"""
+
+    def __init__(self, reason=None):
+        """Constructor method for failed response class"""
+
+        self.status_code = None
+        self.reason = reason
+        self.headers = {}
+        self.content = b""
+
+
+# Committed response class
+class CommittedResponse(object):
+    """
+    Stands in for the 409 Conflict of a retried create
+
+    The earlier attempt of a retried POST may have been committed before its
+    response was lost, so a conflict on the retry means the item is there.
+    """
+
+    def __init__(self, response=None):
+        """Constructor method for committed response class"""
+
+        self.status_code = 201
+        self.reason = "Created"
+        self.headers = response.headers
+        self.content = response.content
+
+
+# Check the answer of a retried create
+def committed_create(method=None, attempt=1, response=None):
+    """
+    Treats a 409 Conflict that answers a retried POST as created
+
+    :param method: (str) API call method
+    :param attempt: (int) Attempt number of the call
+    :param response: (response) Final response of the call
+    :returns: (response) The response or a CommittedResponse
+    """
+
+    if method == "POST" and attempt > 1 and response.status_code == 409:
+        logging.debug("[*] Conflict on attempt %s, created by an earlier one", attempt)
+        return CommittedResponse(response=response)
+    return response
+
+
+# Retry policy of the run
+_retry_policy = RetryPolicy()
+
+
+# Seconds until a Retry-After value
+def _seconds_until(value=None):
+    """
+    Converts a Retry-After header value into seconds
+
+    :param value: (str) Delay in seconds or an HTTP date
+    :return: (float) Seconds to wait or None if the value is missing/invalid
+    """
+
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
 
 # Define get headers function
-def get_headers():
+def get_headers(host_profile=None):
     """
     This function returns appropriate headers
 
+    :param host_profile: (str) Host profile name, None for the login block
     :return: (dict) A python dictionary of headers
     """
 
-    authentication_token = get_authentication()
+    authentication_token = get_authentication(host_profile=host_profile)
     headers = {
         "PRIVATE-TOKEN": authentication_token,
         "Content-Type": "application/json",
     }
-    logging.debug(f"[*] API Headers: {headers}")
+    logging.debug("[*] API Headers: %s", Lazy(mask_secrets, headers))
     return headers
 
 
@@ -52,6 +288,106 @@ def get_api_endpoint(pid=None, config_path=None):
     return api_end_point
 
 
+# Get scheme and host from an url
+def split_host_url(api_url=None):
+    """
+    Extracts the scheme and host part of an url
+
+    :param api_url: (str) API endpoint
+    :return: (str) scheme://host[:port]
+    """
+
+    parts = urlsplit(str(api_url))
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+# Define get session function
+def get_session(host_url=None, pool_size=None, api_headers=None):
+    """
+    Returns the keep-alive session for a GitLab host, creating it if required
+
+    The connection pool grows when a larger pool size is requested later.
+
+    :param host_url: (str) scheme://host of the GitLab instance
+    :param pool_size: (int) Number of connections kept alive for the host
+    :param api_headers: (dict) Headers every call of the session should carry
+    :return: (requests.Session) Session for the host
+    """
+
+    if pool_size is None:
+        pool_size = default_pool_size
+    with _sessions_lock:
+        session = _sessions.get(host_url)
+        if session is None:
+            session = requests.Session()
+            session.verify = False
+            _sessions[host_url] = session
+            _pool_sizes[host_url] = 0
+            logging.debug(f"[*] New session for: {host_url}")
+        if pool_size > _pool_sizes[host_url]:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount(f"{host_url}/", adapter)
+            _pool_sizes[host_url] = pool_size
+        if api_headers:
+            session.headers.update(api_headers)
+    return session
+
+
+# Define set retry policy function
+def set_retry_policy(policy=None):
+    """
+    Sets the retry policy used by every API call of the run
+
+    :param policy: (RetryPolicy) Retry policy, None restores the default
+    :return: (RetryPolicy) The active retry policy
+    """
+
+    global _retry_policy
+    _retry_policy = policy or RetryPolicy()
+    return _retry_policy
+
+
+# Define get retry policy function
+def get_retry_policy():
+    """
+    Returns the retry policy of the run
+
+    :return: (RetryPolicy) The active retry policy
+    """
+
+    return _retry_policy
+
+
+# Define get rate limiter function
+def get_rate_limiter(host_url=None, rate=None):
+    """
+    Returns the rate limiter of a GitLab host, creating it if required
+
+    :param host_url: (str) scheme://host of the GitLab instance
+    :param rate: (float) Maximum calls per second, None follows the server
+    :return: (RateLimiter) Rate limiter for the host
+    """
+
+    with _sessions_lock:
+        limiter = _rate_limiters.get(host_url)
+        if limiter is None:
+            limiter = RateLimiter(rate=rate)
+            _rate_limiters[host_url] = limiter
+    return limiter
+
+
+# Define close sessions function
+def close_sessions():
+    """Closes all the keep-alive sessions and forgets the rate limits"""
+
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _pool_sizes.clear()
+        _rate_limiters.clear()
+
+
 # Define a method to make the api call
 def call_api_endpoint(
     method=None,
@@ -77,20 +413,136 @@ def call_api_endpoint(
         json_input = None
     else:
         json_input = data
-    logging.debug(f"Payload (call_api_endpoint): {json_input}")
-    logging.debug(f"[*] Making API call.....")
-    try:
-        response = requests.request(
+    logging.debug("Payload (call_api_endpoint): %s", json_input)
+    logging.debug("[*] Making API call.....")
+    host_url = split_host_url(api_url)
+    session = get_session(host_url=host_url)
+    limiter = get_rate_limiter(host_url=host_url)
+    attempt = 0
+    while True:
+        limiter.acquire()
+        attempt += 1
+        started = time.perf_counter()
+        try:
+            response = session.request(
+                method,
+                api_url,
+                data=json_input,
+                headers=api_headers,
+                auth=api_auth,
+                params=parameters,
+                verify=False,
+                timeout=request_timeout,
+            )
+        except (requests.ConnectionError, requests.Timeout) as err:
+            record_call(method, api_url, None, time.perf_counter() - started, attempt)
+            delay = _retry_policy.next_delay(attempt=attempt, error=err)
+            if delay is None:
+                click.secho(f"[x] ERROR: {err}", fg="red")
+                return FailedResponse(reason=type(err).__name__)
+            logging.debug("[*] %s, retrying in %.2fs.....", type(err).__name__, delay)
+            time.sleep(delay)
+            continue
+        except requests.RequestException as err:
+            record_call(method, api_url, None, time.perf_counter() - started, attempt)
+            click.secho(f"[x] ERROR: {err}", fg="red")
+            return FailedResponse(reason=type(err).__name__)
+        record_call(
             method,
             api_url,
-            data=json_input,
-            headers=api_headers,
-            auth=api_auth,
-            params=parameters,
-            verify=False,
+            response.status_code,
+            time.perf_counter() - started,
+            attempt,
         )
-    except Exception as err:
-        click.secho(f"[x] ERROR: {err}", fg="red")
-        sys.exit(1)
+        limiter.update(headers=response.headers, status_code=response.status_code)
+        delay = _retry_policy.next_delay(
+            attempt=attempt, status_code=response.status_code
+        )
+        if delay is None:
+            return committed_create(method, attempt, response)
+        logging.debug("[*] %s, retrying in %.2fs.....", response.reason, delay)
+        time.sleep(delay)
+
+
+# Define a method to read one page of a list endpoint
+def read_api_page(api_url=None, api_headers=None, parameters=None, page=1):
+    """
+    Reads one page of a GitLab list endpoint
+
+    Pages are cached on disk with their ETag. A cached page is revalidated
+    with ``If-None-Match`` and reused when GitLab answers ``304 Not Modified``.
+
+    :param api_url: (str) API endpoint
+    :param api_headers: (dict) API headers to be appended to the call
+    :param parameters: (dict) Extra querystring for the API call
+    :param page: (int) Page number
+    :returns: (tuple) (items, next page, total pages) or None on error or a
+        body that is not a JSON list, next page and total pages are None when
+        GitLab does not report them
+    """
+
+    query = {"per_page": per_page}
+    query.update(parameters or {})
+    query["page"] = page
+    cached = cache_manager.load_response(api_url=api_url, query=query)
+    if cached is not None:
+        api_headers = dict(api_headers or {}, **{"If-None-Match": cached["etag"]})
+    response = call_api_endpoint(
+        method="GET", api_url=api_url, api_headers=api_headers, parameters=query
+    )
+    if response.status_code == 304 and cached is not None:
+        logging.debug("[*] Not modified, using cached page %s of: %s", page, api_url)
+        headers, content = cached["headers"], cached["content"]
+    elif response.status_code in accepted_status_codes:
+        headers = {name: response.headers.get(name) for name in page_headers}
+        content = response.content
     else:
-        return response
+        click.secho(f"[x] Could not list [{api_url}] ({response.reason})", fg="red")
+        return None
+    try:
+        items = json.loads(content)
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        click.secho(f"[x] Could not list [{api_url}] (not a JSON list)", fg="red")
+        return None
+    if response.status_code != 304 and response.headers.get("ETag"):
+        cache_manager.save_response(
+            api_url=api_url,
+            query=query,
+            etag=response.headers["ETag"],
+            headers=headers,
+            content=content,
+        )
+    next_page = headers.get("X-Next-Page") or None
+    total_pages = headers.get("X-Total-Pages") or None
+    return (
+        items,
+        int(next_page) if next_page else None,
+        int(total_pages) if total_pages else None,
+    )
+
+
+# Define a method to read all pages of a list endpoint
+def list_api_endpoint(api_url=None, api_headers=None, parameters=None):
+    """
+    Collects every page of a GitLab list endpoint
+
+    :param api_url: (str) API endpoint
+    :param api_headers: (dict) API headers to be appended to the call
+    :param parameters: (dict) Extra querystring for the API call
+    :returns: (list) All the listed items or None if a page could not be read
+    """
+
+    items = []
+    page = 1
+    while page:
+        result = read_api_page(
+            api_url=api_url, api_headers=api_headers, parameters=parameters, page=page
+        )
+        if result is None:
+            return None
+        page_items, page, _ = result
+        items.extend(page_items)
+    logging.debug("[*] Listed %d items from: %s", len(items), api_url)
+    return items
@@ -11,7 +11,10 @@ import sys
 import click
 
 # Import custom (local) python libraries
-from .controller import labelx_controller
+from .settings import default_engine, default_workers, engines, max_workers
+from .settings import default_processes, max_processes
+from .settings import read_targets, parse_target, default_max_attempts
+from .settings import transports, default_transport, default_batch_size, max_batch_size
 from .utils import debug_manager, banner, initial_message, show_info
 
 # Source code meta data
@@ -19,6 +22,249 @@ __author__ = "Dalwar Hossain"
 __email__ = "dalwar23@pm.me"
 
 
+# Build a decorator from a group of options
+def option_group(*options):
+    """
+    Builds a decorator that applies a group of click options to a command
+
+    :param options: (click.option) Option decorators in help order
+    :returns: (function) Decorator
+    """
+
+    def decorator(function):
+        for option in reversed(options):
+            function = option(function)
+        return function
+
+    return decorator
+
+
+# Target ID parameter type
+class TargetId(click.ParamType):
+    """Numeric project/group ID, optionally prefixed with a host profile"""
+
+    name = "[PROFILE:]ID"
+
+    def __init__(self, kind=None):
+        """Constructor method for target ID parameter type"""
+
+        self.kind = kind
+
+    def convert(self, value, param, ctx):
+        if parse_target(text=value, kind=self.kind) is None:
+            self.fail(f"{value!r} is not a numeric ID or PROFILE:ID.", param, ctx)
+        return value
+
+
+# Targets of a command
+target_options = option_group(
+    click.option(
+        "-p",
+        "--project-id",
+        "project_ids",
+        required=False,
+        multiple=True,
+        help="Numeric project ID, prefix with PROFILE: to apply it to one "
+        "--host-profile only. Can be repeated.",
+        type=TargetId(kind="project"),
+    ),
+    click.option(
+        "-g",
+        "--group-id",
+        "group_ids",
+        required=False,
+        multiple=True,
+        help="Numeric group ID, prefix with PROFILE: to apply it to one "
+        "--host-profile only. Can be repeated.",
+        type=TargetId(kind="group"),
+    ),
+    click.option(
+        "-t",
+        "--targets-file",
+        "targets_file",
+        required=False,
+        help="File with one target per line (123, project:123, group:45 or "
+        "PROFILE:group:45). Use '-' for stdin.",
+        type=click.File("r"),
+    ),
+)
+
+# Concurrency, pace and retries of the API calls
+call_options = option_group(
+    click.option(
+        "-w",
+        "--workers",
+        "workers",
+        required=False,
+        default=default_workers,
+        show_default=True,
+        help="Number of concurrent API calls.",
+        type=click.IntRange(1, max_workers),
+    ),
+    click.option(
+        "--rate-limit",
+        "rate_limit",
+        required=False,
+        default=None,
+        help="Maximum API calls per second. By default the pace follows the "
+        "RateLimit headers of GitLab.",
+        type=click.FloatRange(min=0, min_open=True),
+    ),
+    click.option(
+        "--max-attempts",
+        "max_attempts",
+        required=False,
+        default=default_max_attempts,
+        show_default=True,
+        help="Maximum calls per item on connection errors, timeouts, 429 and 5xx.",
+        type=click.IntRange(1),
+    ),
+    click.option(
+        "--retry-budget",
+        "retry_budget",
+        required=False,
+        default=None,
+        help="Maximum number of retries for the whole run.  [default: no limit]",
+        type=click.IntRange(0),
+    ),
+)
+
+# Execution engine of the API calls
+engine_option = click.option(
+    "-e",
+    "--engine",
+    "engine",
+    required=False,
+    default=default_engine,
+    show_default=True,
+    help="Execution engine for the API calls.",
+    type=click.Choice(engines),
+)
+
+# Worker processes of a run
+processes_option = click.option(
+    "--processes",
+    "processes",
+    required=False,
+    default=default_processes,
+    show_default=True,
+    help="Worker processes per host, the targets are split between them.",
+    type=click.IntRange(1, max_processes),
+)
+
+# Options of the runs that write a catalog
+write_options = option_group(
+    click.option(
+        "--host-profile",
+        "host_profiles",
+        required=False,
+        multiple=True,
+        help="Host profile of the configuration, repeat to run on several hosts.",
+        type=str,
+    ),
+    click.option(
+        "--journal",
+        "journal_file",
+        required=False,
+        default=None,
+        help="Appends the outcome of every label/badge to this NDJSON file.",
+        type=click.Path(dir_okay=False, writable=True),
+    ),
+    click.option(
+        "--resume",
+        "resume",
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Skips the labels/badges the --journal file records as written.",
+    ),
+    click.option(
+        "--sync",
+        "sync",
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Only create missing and update changed entries.",
+    ),
+)
+
+# Deletion of the labels/badges missing from the catalog
+prune_options = option_group(
+    click.option(
+        "--prune",
+        "prune",
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Also delete labels/badges that are not in the catalog.",
+    ),
+    click.option(
+        "--keep",
+        "keep",
+        required=False,
+        multiple=True,
+        default=None,
+        help="Never delete names matching this pattern (e.g. 'team::*'), "
+        "repeatable.",
+        type=str,
+    ),
+)
+
+# Preview of a prune
+dry_run_option = click.option(
+    "--dry-run",
+    "dry_run",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Only list the labels/badges --prune would delete.",
+)
+
+# Descendants of the target groups
+recursive_option = click.option(
+    "-r",
+    "--recursive",
+    "recursive",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Also apply to all subgroups and projects of the groups.",
+)
+
+# Output modes of a run
+output_options = option_group(
+    click.option(
+        "--verbose",
+        "output_mode",
+        flag_value="verbose",
+        help="Prints one line per label/badge.",
+    ),
+    click.option(
+        "--progress",
+        "output_mode",
+        flag_value="progress",
+        help="Shows a progress bar with throughput and ETA.  [default on a terminal]",
+    ),
+    click.option(
+        "--quiet",
+        "output_mode",
+        flag_value="quiet",
+        help="Only prints a summary of the failures.  [default otherwise]",
+    ),
+)
+
+# Debug mode of a command
+debug_option = click.option(
+    "--debug",
+    "sub_debug",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Turns on DEBUG mode.",
+    type=str,
+)
+
+
 # Alias group class
 class AliasedGroup(click.Group):
     def get_command(self, ctx, cmd_name):
@@ -60,9 +306,39 @@ pass_context = click.make_pass_decorator(Context, ensure=True)
     help="Turns on DEBUG mode.",
     type=str,
 )
+@click.option(
+    "--stats",
+    "stats",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Prints API call statistics at the end of the run.",
+)
+@click.option(
+    "--stats-file",
+    "stats_file",
+    required=False,
+    help="Writes the statistics to a .json file or a Prometheus .prom textfile.",
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.option(
+    "--profile",
+    "profile_file",
+    required=False,
+    help="Profiles the command and writes the pstats dump to this file.",
+    type=click.Path(dir_okay=False, writable=True),
+)
+@click.option(
+    "--profile-memory",
+    "profile_memory",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Also traces memory allocations with --profile.",
+)
 @click.version_option()
 @pass_context
-def mission_control(context, debug):
+def mission_control(context, debug, stats, stats_file, profile_file, profile_memory):
     """GitLab label creator control panel"""
 
     context.debug = debug
@@ -70,6 +346,16 @@ def mission_control(context, debug):
     context.banner = True
     context.dry_run = True
     context.show_help = False
+    if stats or stats_file:
+        from .stats_manager import StatsRecorder, set_stats_recorder
+
+        set_stats_recorder(StatsRecorder(output_file=stats_file))
+    if profile_file:
+        from .profile_manager import RunProfiler
+
+        profiler = RunProfiler(output_file=profile_file, memory=profile_memory)
+        profiler.start()
+        click.get_current_context().call_on_close(profiler.stop)
 
 
 @mission_control.command(short_help="Shows package information.")
@@ -95,41 +381,69 @@ def pkg_info(context, author):
 
 
 @mission_control.command(short_help="Create labels.")
-@click.option(
-    "-p",
-    "--project-id",
-    "project_id",
-    required=False,
-    help="Numeric project ID.",
-    type=int,
-)
-@click.option(
-    "-g",
-    "--group-id",
-    "group_id",
-    required=False,
-    help="Numeric group ID.",
-    type=int,
-)
+@target_options
 @click.option(
     "-f",
     "--labels",
     "labels_file",
     required=False,
-    help="Custom labels file.",
+    help="Custom labels file (.yaml or .ndjson).",
     type=click.Path(exists=True, file_okay=True, readable=True),
 )
+@call_options
+@engine_option
 @click.option(
-    "--debug",
-    "sub_debug",
-    is_flag=True,
-    default=False,
+    "--transport",
+    "transport",
+    required=False,
+    default=default_transport,
     show_default=True,
-    help="Turns on DEBUG mode.",
-    type=str,
+    help="API used to create labels. graphql sends the new labels in batches, "
+    "label priorities are only set over rest.",
+    type=click.Choice(transports),
 )
+@click.option(
+    "--batch-size",
+    "batch_size",
+    required=False,
+    default=default_batch_size,
+    show_default=True,
+    help="Labels per GraphQL request.",
+    type=click.IntRange(1, max_batch_size),
+)
+@processes_option
+@write_options
+@prune_options
+@dry_run_option
+@recursive_option
+@output_options
+@debug_option
 @pass_context
-def create_labels(context, project_id, group_id, labels_file, sub_debug):
+def create_labels(
+    context,
+    project_ids,
+    group_ids,
+    targets_file,
+    labels_file,
+    workers,
+    engine,
+    rate_limit,
+    max_attempts,
+    retry_budget,
+    transport,
+    batch_size,
+    processes,
+    host_profiles,
+    journal_file,
+    resume,
+    prune,
+    keep,
+    dry_run,
+    sync,
+    recursive,
+    output_mode,
+    sub_debug,
+):
     """
     Create labels in gitLab group or project
     """
@@ -140,65 +454,230 @@ def create_labels(context, project_id, group_id, labels_file, sub_debug):
         debug_manager()
     if context.initial_msg:
         initial_message(about_text="Create Labels")
-    if project_id and group_id:
+    if not (project_ids or group_ids or targets_file):
         click.secho(
-            f"[x] Project ID and Group ID can not be used at the same time.", fg="red"
+            f"[x] Either Project ID, Group ID or targets file is required.", fg="red"
         )
         sys.exit(1)
-    if all(v is None for v in [project_id, group_id]):
-        click.secho(f"[x] Either Project ID or Group ID is required.", fg="red")
+    if resume and not journal_file:
+        click.secho(f"[x] --resume requires a --journal file.", fg="red")
         sys.exit(1)
-    if project_id or group_id:
-        logging.debug(f"[$] Project ID: {project_id}")
-        logging.debug(f"[$] Group ID: {group_id}")
-        logging.debug(f"[$] Custom Labels file: {labels_file}")
-        labelx_controller(
-            endpoint="labels",
-            project_id=project_id,
-            group_id=group_id,
-            custom_config_path=None,
-            custom_data_file=labels_file,
-        )
+    if dry_run and not prune:
+        click.secho(f"[x] --dry-run requires --prune.", fg="red")
+        sys.exit(1)
+    logging.debug(f"[$] Project IDs: {project_ids}")
+    logging.debug(f"[$] Group IDs: {group_ids}")
+    logging.debug(f"[$] Targets file: {targets_file}")
+    logging.debug(f"[$] Custom Labels file: {labels_file}")
+    logging.debug(f"[$] Workers: {workers}")
+    logging.debug(f"[$] Engine: {engine}")
+    logging.debug(f"[$] Rate limit: {rate_limit}")
+    logging.debug(f"[$] Max attempts: {max_attempts}")
+    logging.debug(f"[$] Retry budget: {retry_budget}")
+    logging.debug(f"[$] Transport: {transport}")
+    logging.debug(f"[$] Batch size: {batch_size}")
+    logging.debug(f"[$] Processes: {processes}")
+    logging.debug(f"[$] Host profiles: {host_profiles}")
+    logging.debug(f"[$] Journal: {journal_file}")
+    logging.debug(f"[$] Resume: {resume}")
+    logging.debug(f"[$] Prune: {prune}")
+    logging.debug(f"[$] Keep: {keep}")
+    logging.debug(f"[$] Dry run: {dry_run}")
+    logging.debug(f"[$] Sync: {sync}")
+    logging.debug(f"[$] Recursive: {recursive}")
+    logging.debug(f"[$] Output: {output_mode}")
+    from .controller import labelx_controller
+
+    targets = read_targets(
+        project_ids=project_ids, group_ids=group_ids, targets_file=targets_file
+    )
+    labelx_controller(
+        endpoint="labels",
+        custom_config_path=None,
+        custom_data_file=labels_file,
+        workers=workers,
+        engine=engine,
+        sync=sync,
+        targets=targets,
+        recursive=recursive,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+        transport=transport,
+        batch_size=batch_size,
+        output_mode=output_mode,
+        host_profiles=host_profiles,
+        processes=processes,
+        journal_file=journal_file,
+        resume=resume,
+        prune=prune,
+        keep=keep,
+        dry_run=dry_run,
+    )
 
 
 @mission_control.command(short_help="Create badges.")
+@target_options
 @click.option(
-    "-p",
-    "--project-id",
-    "project_id",
+    "-f",
+    "--badges",
+    "badges_file",
     required=False,
-    help="Numeric project ID.",
-    type=int,
+    help="Custom badges file (.yaml or .ndjson).",
+    type=click.Path(exists=True, file_okay=True, readable=True),
 )
+@call_options
+@engine_option
+@processes_option
+@write_options
+@prune_options
+@dry_run_option
+@recursive_option
+@output_options
+@debug_option
+@pass_context
+def create_badges(
+    context,
+    project_ids,
+    group_ids,
+    targets_file,
+    badges_file,
+    workers,
+    engine,
+    rate_limit,
+    max_attempts,
+    retry_budget,
+    processes,
+    host_profiles,
+    journal_file,
+    resume,
+    prune,
+    keep,
+    dry_run,
+    sync,
+    recursive,
+    output_mode,
+    sub_debug,
+):
+    """
+    Create badges in  gitLab group or project
+    """
+
+    if context.banner:
+        banner()
+    if context.debug or sub_debug:
+        debug_manager()
+    if context.initial_msg:
+        initial_message(about_text="Create Badges")
+    if not (project_ids or group_ids or targets_file):
+        click.secho(
+            f"[x] Either Project ID, Group ID or targets file is required.", fg="red"
+        )
+        sys.exit(1)
+    if resume and not journal_file:
+        click.secho(f"[x] --resume requires a --journal file.", fg="red")
+        sys.exit(1)
+    if dry_run and not prune:
+        click.secho(f"[x] --dry-run requires --prune.", fg="red")
+        sys.exit(1)
+    logging.debug(f"[$] Project IDs: {project_ids}")
+    logging.debug(f"[$] Group IDs: {group_ids}")
+    logging.debug(f"[$] Targets file: {targets_file}")
+    logging.debug(f"[$] Custom Badges file: {badges_file}")
+    logging.debug(f"[$] Workers: {workers}")
+    logging.debug(f"[$] Engine: {engine}")
+    logging.debug(f"[$] Rate limit: {rate_limit}")
+    logging.debug(f"[$] Max attempts: {max_attempts}")
+    logging.debug(f"[$] Retry budget: {retry_budget}")
+    logging.debug(f"[$] Processes: {processes}")
+    logging.debug(f"[$] Host profiles: {host_profiles}")
+    logging.debug(f"[$] Journal: {journal_file}")
+    logging.debug(f"[$] Resume: {resume}")
+    logging.debug(f"[$] Prune: {prune}")
+    logging.debug(f"[$] Keep: {keep}")
+    logging.debug(f"[$] Dry run: {dry_run}")
+    logging.debug(f"[$] Sync: {sync}")
+    logging.debug(f"[$] Recursive: {recursive}")
+    logging.debug(f"[$] Output: {output_mode}")
+    from .controller import labelx_controller
+
+    targets = read_targets(
+        project_ids=project_ids, group_ids=group_ids, targets_file=targets_file
+    )
+    labelx_controller(
+        endpoint="badges",
+        custom_config_path=None,
+        custom_data_file=badges_file,
+        workers=workers,
+        engine=engine,
+        sync=sync,
+        targets=targets,
+        recursive=recursive,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+        output_mode=output_mode,
+        host_profiles=host_profiles,
+        processes=processes,
+        journal_file=journal_file,
+        resume=resume,
+        prune=prune,
+        keep=keep,
+        dry_run=dry_run,
+    )
+
+
+@mission_control.command(short_help="Plan label/badge changes.")
+@click.argument("endpoint", type=click.Choice(["labels", "badges"]))
 @click.option(
-    "-g",
-    "--group-id",
-    "group_id",
-    required=False,
-    help="Numeric group ID.",
-    type=int,
+    "-o",
+    "--output",
+    "plan_file",
+    required=True,
+    help="Plan file to write.",
+    type=click.Path(dir_okay=False, writable=True),
 )
+@target_options
 @click.option(
     "-f",
-    "--badges",
-    "badges_file",
+    "--data-file",
+    "data_file",
     required=False,
-    help="Custom badges file.",
+    help="Custom labels/badges file (.yaml or .ndjson).",
     type=click.Path(exists=True, file_okay=True, readable=True),
 )
+@call_options
 @click.option(
-    "--debug",
-    "sub_debug",
+    "-r",
+    "--recursive",
+    "recursive",
     is_flag=True,
     default=False,
     show_default=True,
-    help="Turns on DEBUG mode.",
-    type=str,
+    help="Also plan all subgroups and projects of the groups.",
 )
+@prune_options
+@debug_option
 @pass_context
-def create_badges(context, project_id, group_id, badges_file, sub_debug):
+def plan(
+    context,
+    endpoint,
+    plan_file,
+    project_ids,
+    group_ids,
+    targets_file,
+    data_file,
+    workers,
+    rate_limit,
+    max_attempts,
+    retry_budget,
+    recursive,
+    prune,
+    keep,
+    sub_debug,
+):
     """
-    Create badges in  gitLab group or project
+    Compare labels/badges with gitLab and write the changes to a plan file
     """
 
     if context.banner:
@@ -206,23 +685,147 @@ def create_badges(context, project_id, group_id, badges_file, sub_debug):
     if context.debug or sub_debug:
         debug_manager()
     if context.initial_msg:
-        initial_message(about_text="Create Badges")
-    if project_id and group_id:
+        initial_message(about_text=f"Plan {endpoint.capitalize()}")
+    if not (project_ids or group_ids or targets_file):
         click.secho(
-            f"[x] Project ID and Group ID can not be used at the same time.", fg="red"
+            f"[x] Either Project ID, Group ID or targets file is required.", fg="red"
         )
         sys.exit(1)
-    if all(v is None for v in [project_id, group_id]):
-        click.secho(f"[x] Either Project ID or Group ID is required.", fg="red")
-        sys.exit(1)
-    if project_id or group_id:
-        logging.debug(f"[$] Project ID: {project_id}")
-        logging.debug(f"[$] Group ID: {group_id}")
-        logging.debug(f"[$] Custom Badges file: {badges_file}")
-        labelx_controller(
-            endpoint="badges",
-            project_id=project_id,
-            group_id=group_id,
-            custom_data_file=badges_file,
-            custom_config_path=None,
-        )
+    logging.debug(f"[$] Endpoint: {endpoint}")
+    logging.debug(f"[$] Plan file: {plan_file}")
+    logging.debug(f"[$] Project IDs: {project_ids}")
+    logging.debug(f"[$] Group IDs: {group_ids}")
+    logging.debug(f"[$] Targets file: {targets_file}")
+    logging.debug(f"[$] Custom data file: {data_file}")
+    logging.debug(f"[$] Workers: {workers}")
+    logging.debug(f"[$] Rate limit: {rate_limit}")
+    logging.debug(f"[$] Max attempts: {max_attempts}")
+    logging.debug(f"[$] Retry budget: {retry_budget}")
+    logging.debug(f"[$] Recursive: {recursive}")
+    logging.debug(f"[$] Prune: {prune}")
+    logging.debug(f"[$] Keep: {keep}")
+    from .controller import labelx_plan
+
+    targets = read_targets(
+        project_ids=project_ids, group_ids=group_ids, targets_file=targets_file
+    )
+    labelx_plan(
+        endpoint=endpoint,
+        custom_config_path=None,
+        custom_data_file=data_file,
+        plan_file=plan_file,
+        workers=workers,
+        targets=targets,
+        recursive=recursive,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+        prune=prune,
+        keep=keep,
+    )
+
+
+@mission_control.command(short_help="Apply a plan file.")
+@click.argument(
+    "plan_file", type=click.Path(exists=True, dir_okay=False, readable=True)
+)
+@call_options
+@engine_option
+@output_options
+@debug_option
+@pass_context
+def apply(
+    context,
+    plan_file,
+    workers,
+    engine,
+    rate_limit,
+    max_attempts,
+    retry_budget,
+    output_mode,
+    sub_debug,
+):
+    """
+    Execute the API calls of a plan file
+    """
+
+    if context.banner:
+        banner()
+    if context.debug or sub_debug:
+        debug_manager()
+    if context.initial_msg:
+        initial_message(about_text="Apply Plan")
+    logging.debug(f"[$] Plan file: {plan_file}")
+    logging.debug(f"[$] Workers: {workers}")
+    logging.debug(f"[$] Engine: {engine}")
+    logging.debug(f"[$] Rate limit: {rate_limit}")
+    logging.debug(f"[$] Max attempts: {max_attempts}")
+    logging.debug(f"[$] Retry budget: {retry_budget}")
+    logging.debug(f"[$] Output: {output_mode}")
+    from .controller import labelx_apply
+
+    labelx_apply(
+        plan_file=plan_file,
+        custom_config_path=None,
+        workers=workers,
+        engine=engine,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+        output_mode=output_mode,
+    )
+
+
+@mission_control.command(short_help="Retry failed entries of a journal.")
+@click.argument(
+    "journal_file", type=click.Path(exists=True, dir_okay=False, readable=True)
+)
+@call_options
+@engine_option
+@processes_option
+@output_options
+@debug_option
+@pass_context
+def retry_failed(
+    context,
+    journal_file,
+    workers,
+    engine,
+    rate_limit,
+    max_attempts,
+    retry_budget,
+    processes,
+    output_mode,
+    sub_debug,
+):
+    """
+    Write the labels/badges that failed in the runs of a journal again
+    """
+
+    if context.banner:
+        banner()
+    if context.debug or sub_debug:
+        debug_manager()
+    if context.initial_msg:
+        initial_message(about_text="Retry Failed")
+    logging.debug(f"[$] Journal file: {journal_file}")
+    logging.debug(f"[$] Workers: {workers}")
+    logging.debug(f"[$] Engine: {engine}")
+    logging.debug(f"[$] Rate limit: {rate_limit}")
+    logging.debug(f"[$] Max attempts: {max_attempts}")
+    logging.debug(f"[$] Retry budget: {retry_budget}")
+    logging.debug(f"[$] Processes: {processes}")
+    logging.debug(f"[$] Output: {output_mode}")
+    from .controller import labelx_retry_failed
+
+    labelx_retry_failed(
+        journal_file=journal_file,
+        custom_config_path=None,
+        workers=workers,
+        engine=engine,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+        output_mode=output_mode,
+        processes=processes,
+    )
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""This module handles the API calls with the asyncio engine"""
+
+# Import builtin python libraries
+import asyncio
+from collections import deque
+import logging
+import sys
+import time
+
+# Import external python libraries
+import click
+
+# Import custom (local) python packages
+from .api_manager import FailedResponse, committed_create, split_host_url
+from .api_manager import get_rate_limiter, get_retry_policy
+from .settings import request_timeout
+from .stats_manager import record_call
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+
+# Response class
+class AsyncResponse(object):
+    """Response of an asyncio API call with the attributes labelx reads"""
+
+    def __init__(self, status_code=None, reason=None, headers=None, content=b""):
+        """Constructor method for asyncio response class"""
+
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers or {}
+        self.content = content
+
+
+# Check engine availability
+def check_async_engine():
+    """
+    Checks if the asyncio engine can be used
+
+    :returns: (None) Exits if aiohttp is not installed
+    """
+
+    if aiohttp is None:
+        click.secho(f"[x] asyncio engine requires 'aiohttp' to be installed.", fg="red")
+        click.secho(f"[!] Use: pip install labelx[async]", fg="blue")
+        sys.exit(1)
+
+
+# Define a method to make the api call
+async def async_call_api_endpoint(
+    session=None,
+    method=None,
+    api_url=None,
+    data=None,
+    api_headers=None,
+    parameters=None,
+):
+    """
+    This coroutine makes the API call
+
+    :param session: (aiohttp.ClientSession) Session used for the call
+    :param method: (str) API call method e.g. GET, POST etc
+    :param api_url: (str) API endpoint
+    :param data: (str) API call payload body [should be JSON/XML]
+    :param api_headers: (dict) API headers to be appended to the call
+    :param parameters: (dict) Querystring for the API call
+    :returns: (AsyncResponse) Response with status code, reason and headers
+    """
+
+    logging.debug("Payload (async_call_api_endpoint): %s", data)
+    limiter = get_rate_limiter(host_url=split_host_url(api_url))
+    retry_policy = get_retry_policy()
+    attempt = 0
+    while True:
+        delay = limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        attempt += 1
+        started = time.perf_counter()
+        try:
+            async with session.request(
+                method,
+                api_url,
+                data=data,
+                headers=api_headers,
+                params=parameters,
+                ssl=False,
+            ) as response:
+                content = await response.read()
+                api_response = AsyncResponse(
+                    status_code=response.status,
+                    reason=response.reason,
+                    headers=response.headers,
+                    content=content,
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            record_call(method, api_url, None, time.perf_counter() - started, attempt)
+            delay = retry_policy.next_delay(attempt=attempt, error=err)
+            if delay is None:
+                click.secho(f"[x] ERROR: {err!r}", fg="red")
+                return FailedResponse(reason=type(err).__name__)
+            logging.debug("[*] %s, retrying in %.2fs.....", type(err).__name__, delay)
+            await asyncio.sleep(delay)
+            continue
+        record_call(
+            method,
+            api_url,
+            api_response.status_code,
+            time.perf_counter() - started,
+            attempt,
+        )
+        limiter.update(
+            headers=api_response.headers, status_code=api_response.status_code
+        )
+        delay = retry_policy.next_delay(
+            attempt=attempt, status_code=api_response.status_code
+        )
+        if delay is None:
+            return committed_create(method, attempt, api_response)
+        logging.debug("[*] %s, retrying in %.2fs.....", api_response.reason, delay)
+        await asyncio.sleep(delay)
+
+
+# Run api requests as coroutines
+def run_async(items=None, concurrency=1, api_headers=None):
+    """
+    Runs (key, request) items as coroutines with a concurrency semaphore
+
+    ``request`` is a dict of ``async_call_api_endpoint`` keyword arguments or
+    None, in which case no call is made. Results are yielded in input order and
+    the items iterable is consumed lazily.
+
+    :param items: (iterable) (key, request) tuples
+    :param concurrency: (int) Maximum number of calls in flight
+    :param api_headers: (dict) Headers the keep-alive session should carry
+    :returns: (generator) ((key, request), response) tuples in input order
+    """
+
+    check_async_engine()
+    loop = asyncio.new_event_loop()
+    state = {}
+
+    async def _open():
+        state["semaphore"] = asyncio.Semaphore(concurrency)
+        connector = aiohttp.TCPConnector(
+            limit=concurrency, limit_per_host=concurrency, ssl=False
+        )
+        state["session"] = aiohttp.ClientSession(
+            connector=connector,
+            headers=api_headers,
+            timeout=aiohttp.ClientTimeout(total=request_timeout),
+        )
+
+    async def _call(request):
+        if request is None:
+            return None
+        async with state["semaphore"]:
+            return await async_call_api_endpoint(session=state["session"], **request)
+
+    in_flight = deque()
+    try:
+        loop.run_until_complete(_open())
+        for item in items:
+            in_flight.append((item, loop.create_task(_call(item[1]))))
+            if len(in_flight) >= concurrency * 2:
+                done_item, task = in_flight.popleft()
+                yield done_item, loop.run_until_complete(task)
+        while in_flight:
+            done_item, task = in_flight.popleft()
+            yield done_item, loop.run_until_complete(task)
+    finally:
+        for _, task in in_flight:
+            task.cancel()
+        if in_flight:
+            loop.run_until_complete(
+                asyncio.gather(*(task for _, task in in_flight), return_exceptions=True)
+            )
+        if "session" in state:
+            loop.run_until_complete(state["session"].close())
+        loop.close()
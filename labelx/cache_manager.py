@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""On-disk cache handler module"""
+
+# Import builtin python libraries
+import hashlib
+import logging
+import os
+from pathlib import Path
+import pickle
+import tempfile
+import threading
+
+# Import custom (local) python packages
+from . import __package_name__ as package_name
+from .settings import response_cache_size
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Cache path
+cache_home = os.environ.get("XDG_CACHE_HOME") or Path(Path.home()) / ".cache"
+cache_directory = Path(cache_home) / package_name
+
+# Size of the cached list responses, counted once per process
+_response_bytes = None
+_response_lock = threading.Lock()
+
+
+# Fingerprint of a catalog file
+def catalog_fingerprint(file_path=None, content=None):
+    """
+    Builds the key a parsed catalog is cached with
+
+    :param file_path: (str) Catalog file path
+    :param content: (bytes) Content of the catalog file
+    :returns: (dict) Resolved path, size, modification time and content hash
+    """
+
+    file_stat = os.stat(file_path)
+    return {
+        "path": os.path.realpath(file_path),
+        "size": file_stat.st_size,
+        "mtime": file_stat.st_mtime_ns,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+# Cache file of a catalog
+def _catalog_cache_file(fingerprint=None):
+    """
+    Returns the cache file path of a catalog
+
+    :param fingerprint: (dict) Catalog fingerprint
+    :returns: (Path) Cache file path
+    """
+
+    path_hash = hashlib.sha256(fingerprint["path"].encode()).hexdigest()
+    return cache_directory / "catalogs" / f"{path_hash}.pickle"
+
+
+# Load a parsed catalog
+def load_catalog(fingerprint=None):
+    """
+    Loads a parsed catalog from the cache
+
+    :param fingerprint: (dict) Catalog fingerprint
+    :returns: Parsed catalog or None if it is not cached or out of date
+    """
+
+    cache_file = _catalog_cache_file(fingerprint=fingerprint)
+    try:
+        with open(cache_file, "rb") as stream:
+            cached_fingerprint, data = pickle.load(stream)
+    except FileNotFoundError:
+        return None
+    except Exception as err:
+        logging.debug(f"[!] Ignoring unreadable catalog cache [{cache_file}]: {err}")
+        return None
+    if cached_fingerprint != fingerprint:
+        return None
+    logging.debug(f"[#] Using cached catalog for: [{fingerprint['path']}]")
+    return data
+
+
+# Write a cache file atomically
+def _write_cache_file(cache_file=None, data=None):
+    """
+    Pickles data next to its cache file and renames it into place
+
+    :param cache_file: (Path) Cache file path
+    :param data: Data to be cached
+    :returns: (int) Size of the written file, 0 if it could not be written
+    """
+
+    temp_path = None
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=cache_file.parent)
+        with os.fdopen(file_descriptor, "wb") as stream:
+            pickle.dump(data, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_file)
+        return os.path.getsize(cache_file)
+    except Exception as err:
+        logging.debug(f"[!] Could not write cache file [{cache_file}]: {err}")
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return 0
+
+
+# Save a parsed catalog
+def save_catalog(fingerprint=None, data=None):
+    """
+    Saves a parsed catalog to the cache
+
+    The file is written next to its final path and renamed, so concurrent
+    runs never read a partial cache file. Errors are ignored, the cache is
+    only an optimization.
+
+    :param fingerprint: (dict) Catalog fingerprint
+    :param data: Parsed catalog
+    """
+
+    cache_file = _catalog_cache_file(fingerprint=fingerprint)
+    _write_cache_file(cache_file=cache_file, data=(fingerprint, data))
+
+
+# Cache file of a list response
+def _response_cache_file(api_url=None, query=None):
+    """
+    Returns the cache file path of a list response
+
+    :param api_url: (str) API endpoint including the host
+    :param query: (dict) Querystring of the call
+    :returns: (Path) Cache file path
+    """
+
+    key = f"{api_url}?{sorted((query or {}).items())}"
+    key_hash = hashlib.sha256(key.encode()).hexdigest()
+    return cache_directory / "responses" / f"{key_hash}.pickle"
+
+
+# Load a cached list response
+def load_response(api_url=None, query=None):
+    """
+    Loads a cached list response
+
+    :param api_url: (str) API endpoint including the host
+    :param query: (dict) Querystring of the call
+    :returns: (dict) etag, headers and content or None if it is not cached
+    """
+
+    cache_file = _response_cache_file(api_url=api_url, query=query)
+    try:
+        with open(cache_file, "rb") as stream:
+            cached = pickle.load(stream)
+        os.utime(cache_file)
+    except FileNotFoundError:
+        return None
+    except Exception as err:
+        logging.debug(f"[!] Ignoring unreadable response cache [{cache_file}]: {err}")
+        return None
+    return cached
+
+
+# Save a list response
+def save_response(api_url=None, query=None, etag=None, headers=None, content=None):
+    """
+    Saves a list response and evicts the least recently used responses when
+    the cache grows over ``response_cache_size`` bytes
+
+    :param api_url: (str) API endpoint including the host
+    :param query: (dict) Querystring of the call
+    :param etag: (str) ETag of the response
+    :param headers: (dict) Response headers to be kept, e.g. pagination
+    :param content: (bytes) Response body
+    """
+
+    global _response_bytes
+    cache_file = _response_cache_file(api_url=api_url, query=query)
+    try:
+        old_size = os.path.getsize(cache_file)
+    except OSError:
+        old_size = 0
+    cached = {"etag": etag, "headers": headers, "content": content}
+    new_size = _write_cache_file(cache_file=cache_file, data=cached)
+    with _response_lock:
+        if _response_bytes is None:
+            _response_bytes = sum(size for _, size in _response_files())
+        else:
+            _response_bytes += new_size - old_size
+        if _response_bytes > response_cache_size:
+            _response_bytes = _evict_responses(max_bytes=response_cache_size // 2)
+
+
+# Cached list responses
+def _response_files():
+    """
+    Lists the cached list responses
+
+    :returns: (list) (path, size) tuples, least recently used first
+    """
+
+    entries = []
+    try:
+        with os.scandir(cache_directory / "responses") as scan:
+            for entry in scan:
+                try:
+                    file_stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((file_stat.st_mtime_ns, entry.path, file_stat.st_size))
+    except OSError:
+        return []
+    return [(path, size) for _, path, size in sorted(entries)]
+
+
+# Evict cached list responses
+def _evict_responses(max_bytes=None):
+    """
+    Removes the least recently used list responses until the cache fits
+
+    :param max_bytes: (int) Size the cache is reduced to
+    :returns: (int) Size of the cache after the eviction
+    """
+
+    response_files = _response_files()
+    total = sum(size for _, size in response_files)
+    for path, size in response_files:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+    logging.debug(f"[*] Response cache reduced to {total} bytes")
+    return total
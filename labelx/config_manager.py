@@ -8,6 +8,7 @@ import logging
 import os
 from pathlib import Path
 import sys
+import threading
 
 # Import external python libraries
 import click
@@ -15,6 +16,7 @@ import click
 # Import custom (local) python packages
 from . import __package_name__ as package_name
 from . import settings
+from .log_manager import Lazy, mask_secrets
 
 # Source code meta data
 __author__ = "Dalwar Hossain"
@@ -42,6 +44,11 @@ config_files = [
     for file_name in file_names
 ]
 
+# Discovered config path per lookup list and parsed configs per config path
+_discovered_configs = {}
+_config_cache = {}
+_config_lock = threading.Lock()
+
 
 # Check file permissions
 def _check_file_permissions(file_paths=None):
@@ -77,27 +84,49 @@ def load_config(config_file_paths=None):
     """
     This function reads and load the configurations into the system
 
+    The discovered configuration file and its parsed content are cached for
+    the process. The file is only looked up again when it disappears and only
+    parsed again when its modification time or size changes. The returned
+    dictionary is shared, callers must not modify it.
+
     :param config_file_paths: (list) A list of paths for configuration lookup
     :return: (dict) Merged configurations
     """
 
     if config_file_paths is None:
         config_file_paths = config_files
-    logging.debug(f"Default lookup paths: {config_files}")
-    file_flag, permission_flag, default_config = _check_file_permissions(
-        file_paths=config_file_paths
-    )
-    logging.debug(f"File Flag: {file_flag}")
-    logging.debug(f"Permission Flag: {permission_flag}")
-    logging.debug(f"Default Config: {default_config}")
-    if file_flag == 1 and permission_flag == 1:
+    lookup_key = tuple(str(path) for path in config_file_paths)
+    with _config_lock:
+        default_config = _discovered_configs.get(lookup_key)
+        try:
+            config_stat = os.stat(default_config) if default_config else None
+        except OSError:
+            config_stat = None
+        if config_stat is None:
+            logging.debug(f"Default lookup paths: {config_files}")
+            file_flag, permission_flag, default_config = _check_file_permissions(
+                file_paths=config_file_paths
+            )
+            logging.debug(f"File Flag: {file_flag}")
+            logging.debug(f"Permission Flag: {permission_flag}")
+            logging.debug(f"Default Config: {default_config}")
+            if not (file_flag == 1 and permission_flag == 1):
+                _discovered_configs.pop(lookup_key, None)
+                click.secho(f"[x] Could not locate configuration file!", fg="red")
+                sys.exit(1)
+            _discovered_configs[lookup_key] = default_config
+            config_stat = os.stat(default_config)
+        resolved_path = os.path.realpath(default_config)
+        config_version = (config_stat.st_mtime_ns, config_stat.st_size)
+        cached = _config_cache.get(resolved_path)
+        if cached is not None and cached[0] == config_version:
+            logging.debug(f"[#] Using cached configs from: [{resolved_path}]")
+            return cached[1]
         all_configs = settings.read_yaml(yaml_file_path=default_config)
         base_directory = Path(default_config).parent
         all_configs["common"] = {}
         all_configs["common"]["base_directory"] = base_directory
+        _config_cache[resolved_path] = (config_version, all_configs)
         logging.debug(f"[#] Configuration read complete!")
-        logging.debug(f"Configs: {all_configs}")
+        logging.debug("Configs: %s", Lazy(mask_secrets, all_configs))
         return all_configs
-    else:
-        click.secho(f"[x] Could not locate configuration file!", fg="red")
-        sys.exit(1)
@@ -4,23 +4,1134 @@
 """This module handles the API calls"""
 
 # Import builtin python libraries
-import json
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import fnmatchcase
+from itertools import chain, islice
 import logging
+from queue import Queue
 import sys
+import threading
 
 # Import external python libraries
 import click
 import requests
 
 # Import custom (local) python packages
-from .api_manager import call_api_endpoint, get_headers
-from .settings import generate_endpoints, accepted_status_codes, generate_payload
+from .api_manager import call_api_endpoint, get_headers, get_session
+from .api_manager import get_rate_limiter, set_retry_policy, RetryPolicy
+from .api_manager import list_api_endpoint, read_api_page
+from .settings import get_host_url, accepted_status_codes, generate_payload
+from .settings import get_login
+from .settings import default_engine, default_workers, sync_fields
+from .settings import default_max_attempts
+from .settings import build_endpoint, read_targets, target_endpoint
+from .settings import is_ndjson, parse_target, stream_payload
+from .settings import default_transport, default_batch_size
+from .graphql_manager import graphql_url, label_create_batch, split_batch_response
+from .graphql_manager import target_path
+from .payload_manager import dumps, encode_entry
+from .journal_manager import Journal, completed_entries, failed_entries
+from .journal_manager import target_text
+from .plan_manager import count_operations, plan_header, read_plan, write_plan
+from .report_manager import get_reporter, SharedReporter
+from .process_manager import run_shards, split_targets
+from .stats_manager import get_stats_recorder, report_stats
 from .utils import goodbye
 
 # Source code meta data
 __author__ = "Dalwar Hossain"
 __email__ = "dalwar23@pm.me"
 
+# Group members to walk and their list parameters
+group_members = {
+    "subgroups": {},
+    "projects": {"with_shared": "false", "archived": "false", "simple": "true"},
+}
+
+# Targets counted up front to size the progress bar
+counted_targets = 10000
+
+
+# Run a function over items with a bounded number of calls in flight
+def _run_ordered(function=None, items=None, workers=1):
+    """
+    Runs a function over items using a bounded thread pool
+
+    Results are yielded in the same order as the items, no matter which call
+    finishes first. At most ``workers * 2`` items are queued at any time, so
+    the items iterable is consumed lazily.
+
+    :param function: (callable) Function that accepts one item
+    :param items: (iterable) Items to process
+    :param workers: (int) Number of worker threads
+    :returns: (generator) (item, result) tuples in input order
+    """
+
+    if workers <= 1:
+        for item in items:
+            yield item, function(item)
+        return
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            in_flight.append((item, executor.submit(function, item)))
+            if len(in_flight) >= workers * 2:
+                done_item, future = in_flight.popleft()
+                yield done_item, future.result()
+        while in_flight:
+            done_item, future = in_flight.popleft()
+            yield done_item, future.result()
+
+
+# Call the api endpoint for a (key, request) item
+def _call_request(item=None):
+    """
+    Makes the API call described by a (key, request) item
+
+    :param item: (tuple) key and call_api_endpoint keyword arguments or None
+    :returns: (response) Python requests response or None if request is None
+    """
+
+    request = item[1]
+    if request is None:
+        return None
+    return call_api_endpoint(**request)
+
+
+# Execute api requests with the selected engine
+def _execute(
+    items=None, engine=default_engine, workers=default_workers, api_headers=None
+):
+    """
+    Executes (key, request) items with the selected engine
+
+    :param items: (iterable) (key, request) tuples
+    :param engine: (str) threads/asyncio
+    :param workers: (int) Number of concurrent API calls
+    :param api_headers: (dict) Headers shared by all the calls of the run
+    :returns: (generator) ((key, request), response) tuples in input order
+    """
+
+    if engine == "asyncio":
+        from .async_manager import run_async
+
+        return run_async(items=items, concurrency=workers, api_headers=api_headers)
+    return _run_ordered(function=_call_request, items=items, workers=workers)
+
+
+# Serialize catalog entries into api payloads
+def _prepare_payloads(entries=None):
+    """
+    Generates (name, attributes, payload) tuples from label/badge data
+
+    :param entries: (iterable) (name, attributes) pairs of the catalog
+    :returns: (generator) (name, attributes, payload) tuples, payload is an
+        EncodedPayload or None on TypeError
+    """
+
+    for data_key, data_value in entries:
+        data_value["name"] = data_key
+        yield data_key, data_value, encode_entry(data_value=data_value)
+
+
+# Normalize a field value for comparison
+def _normalize(field=None, value=None):
+    """
+    Normalizes label/badge field values so that equal settings compare equal
+
+    :param field: (str) Field name
+    :param value: Field value from the catalog or from GitLab
+    :returns: Comparable value
+    """
+
+    if value is None or value == "":
+        return None
+    if field == "color":
+        return str(value).lower()
+    return value
+
+
+# Index remote labels/badges by name
+def _remote_index(existing=None, target_kind=None):
+    """
+    Indexes the labels/badges listed from GitLab by name
+
+    GitLab allows several badges with the same name, so every entry of a
+    name is kept, oldest first.
+
+    :param existing: (list) Labels/badges listed from GitLab
+    :param target_kind: (str) project/group, used to ignore inherited badges
+    :returns: (dict) name -> list of remote labels/badges
+    """
+
+    remote = {}
+    for item in existing:
+        if "kind" in item and item["kind"] != target_kind:
+            continue
+        remote.setdefault(item.get("name"), []).append(item)
+    for data_key, remote_items in remote.items():
+        if len(remote_items) > 1:
+            remote_items.sort(key=lambda remote_item: remote_item.get("id") or 0)
+            click.secho(
+                f"[!] {len(remote_items)} remote entries of a {target_kind} share "
+                f"the name [{data_key}]",
+                fg="yellow",
+            )
+    return remote
+
+
+# Compare one catalog entry with the remote side
+def _entry_change(endpoint=None, data_key=None, data_value=None, remote=None):
+    """
+    Works out if a catalog entry is missing or changed on the remote side
+
+    Only the fields in ``sync_fields`` that GitLab reports back are compared,
+    with the oldest remote entry of the name.
+
+    :param endpoint: (str) labels/badges endpoint
+    :param data_key: (str) Label/badge name
+    :param data_value: (dict) Label/badge attributes
+    :param remote: (dict) name -> remote labels/badges, see _remote_index
+    :returns: (tuple) (api method, remote id) or None if up to date
+    """
+
+    remote_items = remote.get(data_key)
+    if not remote_items:
+        return "POST", None
+    remote_item = remote_items[0]
+    for field in sync_fields[endpoint]:
+        if field not in data_value or field not in remote_item:
+            continue
+        if _normalize(field, data_value[field]) != _normalize(
+            field, remote_item[field]
+        ):
+            return "PUT", remote_item["id"]
+    return None
+
+
+# Compare catalog with remote labels/badges
+def _diff_catalog(endpoint=None, all_data=None, existing=None, target_kind=None):
+    """
+    Works out which catalog entries are missing or changed on the remote side
+
+    :param endpoint: (str) labels/badges endpoint
+    :param all_data: (dict) key value pairs of the label name and attributes
+    :param existing: (list) Labels/badges listed from GitLab
+    :param target_kind: (str) project/group, used to ignore inherited badges
+    :returns: (dict) name -> (api method, remote id) for entries to be written
+    """
+
+    remote = _remote_index(existing=existing, target_kind=target_kind)
+    changes = {}
+    for data_key, data_value in all_data.items():
+        change = _entry_change(endpoint, data_key, data_value, remote)
+        if change is not None:
+            changes[data_key] = change
+    return changes
+
+
+# Remote labels/badges missing from the catalog
+def _stale_entries(remote=None, names=None, keep=None):
+    """
+    Works out which remote labels/badges are not in the catalog
+
+    Duplicates of a catalog name are stale as well, only the oldest entry of
+    the name is kept.
+
+    :param remote: (dict) name -> remote labels/badges, see _remote_index
+    :param names: (set) Label/badge names of the catalog
+    :param keep: (list) fnmatch patterns of names that are never deleted
+    :returns: (tuple) List of (name, remote label/badge) tuples to delete and
+        the number of names kept by the patterns
+    """
+
+    stale = []
+    kept = 0
+    for data_key, remote_items in remote.items():
+        if not data_key:
+            continue
+        if data_key in names:
+            remote_items = remote_items[1:]
+        if not remote_items:
+            continue
+        if keep and any(fnmatchcase(data_key, pattern) for pattern in keep):
+            kept += len(remote_items)
+            continue
+        stale += [(data_key, remote_item) for remote_item in remote_items]
+    return stale, kept
+
+
+# Label of a target
+def _target_label(target=None):
+    """
+    Human readable label of a target
+
+    :param target: (tuple) ("project"/"group", numeric id), prefixed with the
+        host profile name in runs over several hosts
+    :returns: (str) e.g. "project 123" or "eu: project 123"
+    """
+
+    *host_profile, kind, target_id = target
+    if host_profile:
+        return f"{host_profile[0]}: {kind} {target_id}"
+    return f"{kind} {target_id}"
+
+
+# Read the remote state of targets
+def _list_targets(
+    targets=None, endpoint=None, host_url=None, api_headers=None, workers=1
+):
+    """
+    Lists the existing labels/badges of every target concurrently
+
+    :param targets: (iterable) ("project"/"group", numeric id) tuples
+    :param endpoint: (str) labels/badges endpoint
+    :param host_url: (str) protocol://host of the GitLab instance
+    :param api_headers: (dict) API headers to be appended to the calls
+    :param workers: (int) Number of concurrent API calls
+    :returns: (generator) (target, existing) tuples, existing is None on error
+    """
+
+    def _list(target):
+        return list_api_endpoint(
+            api_url=target_endpoint(host_url, endpoint, target),
+            api_headers=api_headers,
+            parameters={"include_ancestor_groups": "false"},
+        )
+
+    return _run_ordered(function=_list, items=targets, workers=workers)
+
+
+# Expand groups into their descendants
+def _walk_groups(targets=None, host_url=None, api_headers=None, workers=1):
+    """
+    Expands group targets with every descendant subgroup and project
+
+    Each page of ``/groups/:id/subgroups`` and ``/groups/:id/projects`` is a
+    separate task in one thread pool. Subgroups are queued as soon as they are
+    found and the remaining pages of a listing are requested together when
+    GitLab reports the page count, so the tree is never walked level by level.
+
+    :param targets: (iterable) ("project"/"group", numeric id) tuples
+    :param host_url: (str) protocol://host of the GitLab instance
+    :param api_headers: (dict) API headers to be appended to the calls
+    :param workers: (int) Number of concurrent API calls
+    :returns: (generator) Targets followed by their descendants as found
+    """
+
+    def _read(group_id, member, page):
+        api_url = build_endpoint(host_url, member, group_id=group_id)
+        result = read_api_page(
+            api_url=api_url,
+            api_headers=api_headers,
+            parameters=group_members[member],
+            page=page,
+        )
+        return group_id, member, page, result
+
+    with ThreadPoolExecutor(max_workers=max(workers, 2)) as executor:
+
+        def _queue_group(group_id):
+            return {
+                executor.submit(_read, group_id, member, 1) for member in group_members
+            }
+
+        for target in targets:
+            yield target
+            if target[0] != "group":
+                continue
+            pending = _queue_group(target[1])
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    group_id, member, page, result = future.result()
+                    if result is None:
+                        continue
+                    items, next_page, total_pages = result
+                    if page == 1 and total_pages:
+                        for other_page in range(2, total_pages + 1):
+                            pending.add(
+                                executor.submit(_read, group_id, member, other_page)
+                            )
+                    elif next_page and not total_pages:
+                        pending.add(executor.submit(_read, group_id, member, next_page))
+                    for item in items:
+                        if member == "subgroups":
+                            pending |= _queue_group(item["id"])
+                            yield "group", item["id"]
+                        else:
+                            yield "project", item["id"]
+
+
+# Targets of one host
+def _profile_targets(targets=None, host_profile=None, host_profiles=None):
+    """
+    Lazily filters the targets that apply to one host of a run
+
+    :param targets: (iterable) ("project"/"group", id) tuples, optionally
+        prefixed with a host profile name
+    :param host_profile: (str) Host profile name, None for the login block
+    :param host_profiles: (list) Host profile names of the run, the first host
+        reports the targets of the profiles outside the run
+    :returns: (generator) ("project"/"group", id) tuples without the prefix
+    """
+
+    for target in targets:
+        *prefix, kind, target_id = target
+        if not prefix or prefix[0] == host_profile:
+            yield kind, target_id
+        elif host_profile == host_profiles[0] and prefix[0] not in host_profiles:
+            click.secho(
+                f"[!] Target [{':'.join(map(str, target))}] is not for a host "
+                f"profile of the run. Skipping.....",
+                fg="yellow",
+            )
+
+
+# Split the targets of a run between its hosts
+def _route_targets(targets=None, host_profiles=None):
+    """
+    Splits the targets of a run between its hosts
+
+    A target prefixed with a host profile name only goes to that host, the
+    other targets go to every host. Hosts without targets are left out of the
+    run unless no host has any.
+
+    :param targets: (iterable) ("project"/"group", id) tuples, optionally
+        prefixed with a host profile name, or None
+    :param host_profiles: (list) Host profile names, [None] for the login block
+    :returns: (dict) host profile name -> targets, None if targets is None.
+        The targets of a single host are filtered lazily
+    """
+
+    if targets is None:
+        return dict.fromkeys(host_profiles)
+    if len(host_profiles) == 1:
+        return {
+            host_profiles[0]: _profile_targets(
+                targets=targets,
+                host_profile=host_profiles[0],
+                host_profiles=host_profiles,
+            )
+        }
+    targets = list(targets)
+    host_targets = {}
+    for host_profile in host_profiles:
+        profile_targets = list(
+            _profile_targets(
+                targets=targets, host_profile=host_profile, host_profiles=host_profiles
+            )
+        )
+        if profile_targets:
+            host_targets[host_profile] = profile_targets
+        else:
+            click.secho(
+                f"[!] No targets for host profile [{host_profile}]. Skipping.....",
+                fg="yellow",
+            )
+    return host_targets or {host_profiles[0]: []}
+
+
+# Counters of a run
+def _run_counters():
+    """
+    Counters of a host run, also the totals of a run over several hosts and
+    worker processes
+
+    :returns: (dict) Counter name -> 0, "settled" lists journal keys
+    """
+
+    return {
+        "up_to_date": 0,
+        "resumed": 0,
+        "pruned": 0,
+        "kept": 0,
+        "existing": 0,
+        "settled": [],
+    }
+
+
+# Prepare the api clients of a run
+def _setup_run(
+    host=None,
+    workers=default_workers,
+    engine=default_engine,
+    rate_limit=None,
+    max_attempts=default_max_attempts,
+    retry_budget=None,
+    host_profile=None,
+    retry_policy=None,
+):
+    """
+    Prepares the headers, rate limiter, retry policy and session of a run
+
+    :param host: (str) protocol://host of the GitLab instance
+    :param workers: (int) Number of concurrent API calls
+    :param engine: (str) Execution engine, threads/asyncio
+    :param rate_limit: (float) Maximum API calls per second
+    :param max_attempts: (int) Maximum calls per item for transient failures
+    :param retry_budget: (int) Maximum retries of the whole run, None for no cap
+    :param host_profile: (str) Host profile name, None for the login block
+    :param retry_policy: (RetryPolicy) Retry policy shared by every host of
+        the run, None makes a new one
+    :returns: (tuple) API headers and the retry policy of the run
+    """
+
+    headers = get_headers(host_profile=host_profile)
+    get_rate_limiter(host_url=host, rate=rate_limit)
+    if retry_policy is None:
+        retry_policy = RetryPolicy(max_attempts=max_attempts, budget=retry_budget)
+    set_retry_policy(retry_policy)
+    if engine != "asyncio":
+        get_session(host_url=host, pool_size=workers, api_headers=headers)
+    return headers, retry_policy
+
+
+# Resolve the targets of a run
+def _resolve_targets(
+    targets=None,
+    project_id=None,
+    group_id=None,
+    recursive=False,
+    host=None,
+    api_headers=None,
+    workers=default_workers,
+):
+    """
+    Resolves the targets of a run and exits if there is none
+
+    :param targets: (iterable) ("project"/"group", id) tuples or None
+    :param project_id: (int) Numeric project number, used if targets is None
+    :param group_id: (int) Numeric group number, used if targets is None
+    :param recursive: (boolean) Also yield every descendant of the groups
+    :param host: (str) protocol://host of the GitLab instance
+    :param api_headers: (dict) API headers to be appended to the calls
+    :param workers: (int) Number of concurrent API calls
+    :returns: (tuple) Lazy targets iterator and the number of targets, None if
+        there are more than ``counted_targets`` or more than one descendant,
+        group subtrees are not walked ahead of the run
+    """
+
+    if targets is None:
+        targets = read_targets(
+            project_ids=[] if project_id is None else [project_id],
+            group_ids=[] if group_id is None else [group_id],
+        )
+    if recursive:
+        targets = _walk_groups(
+            targets=targets, host_url=host, api_headers=api_headers, workers=workers
+        )
+    targets = iter(targets)
+    counted = 1 if recursive else counted_targets
+    first_targets = list(islice(targets, counted + 1))
+    if not first_targets:
+        click.secho(f"[x] No project ID/Group ID found!", fg="red")
+        sys.exit(1)
+    target_count = len(first_targets)
+    if target_count > counted:
+        target_count = None
+    return chain(first_targets, targets), target_count
+
+
+# Load the catalog of a run
+def _load_catalog(endpoint=None, host=None, custom_data_file=None, quiet=False):
+    """
+    Loads the labels/badges catalog of a run
+
+    YAML catalogs are parsed and serialized once. NDJSON catalogs are streamed
+    again every time the returned function is called.
+
+    :param endpoint: (str) labels/badges endpoint
+    :param host: (str) protocol://host of the GitLab instance
+    :param custom_data_file: (str) Custom label/badge file path
+    :param quiet: (boolean) Do not print which catalog is loaded
+    :returns: (tuple) Function that returns (name, attributes, payload) tuples
+        and the number of entries, None for streamed catalogs
+    """
+
+    if custom_data_file and is_ndjson(file_path=custom_data_file):
+        if not quiet:
+            click.secho(
+                f"[*] Streaming custom {endpoint} data from [{custom_data_file}].....",
+                fg="cyan",
+            )
+
+        def _catalog():
+            return _prepare_payloads(
+                entries=stream_payload(
+                    endpoint_type=endpoint,
+                    scm_host=host,
+                    custom_data_file_path=custom_data_file,
+                )
+            )
+
+        return _catalog, None
+    all_data = generate_payload(
+        endpoint_type=endpoint,
+        scm_host=host,
+        custom_data_file_path=custom_data_file,
+        quiet=quiet,
+    )
+    payloads = list(_prepare_payloads(entries=all_data.items()))
+    return (lambda: payloads), len(payloads)
+
+
+# Count the entries of a catalog
+def _catalog_size(endpoint=None, custom_data_file=None):
+    """
+    Counts the labels/badges of a catalog without serializing them
+
+    :param endpoint: (str) labels/badges endpoint
+    :param custom_data_file: (str) Custom label/badge file path
+    :returns: (int) Number of entries, None for streamed catalogs, which are
+        only announced
+    """
+
+    if custom_data_file and is_ndjson(file_path=custom_data_file):
+        return _load_catalog(endpoint=endpoint, custom_data_file=custom_data_file)[1]
+    return len(
+        generate_payload(endpoint_type=endpoint, custom_data_file_path=custom_data_file)
+    )
+
+
+# Build a GraphQL batch item
+def _batch_request(target=None, full_path=None, batch=None, host=None, headers=None):
+    """
+    Builds the (key, request) item of a batch of labels
+
+    :param target: (tuple) ("project"/"group", numeric id)
+    :param full_path: (str) Full path of the target
+    :param batch: (list) (name, attributes) pairs of the labels
+    :param host: (str) protocol://host of the GitLab instance
+    :param headers: (dict) API headers to be appended to the call
+    :returns: (tuple) ((target, names, "POST"), request)
+    """
+
+    request = {
+        "method": "POST",
+        "api_url": graphql_url(host_url=host),
+        "data": label_create_batch(
+            target_kind=target[0], full_path=full_path, entries=batch
+        ),
+        "api_headers": headers,
+    }
+    return (target, tuple(data_key for data_key, _ in batch), "POST"), request
+
+
+# Expand the results of GraphQL batches
+def _expand_batches(results=None):
+    """
+    Replaces the result of every batch with one result per label
+
+    :param results: (iterable) ((key, request), response) tuples, the name of
+        a batch key is the tuple of its label names
+    :returns: (generator) ((key, request), response) tuples per label
+    """
+
+    for ((target, data_key, api_method), request), api_response in results:
+        if not isinstance(data_key, tuple):
+            yield ((target, data_key, api_method), request), api_response
+            continue
+        item_responses = split_batch_response(response=api_response, size=len(data_key))
+        for name, item_response in zip(data_key, item_responses):
+            yield ((target, name, api_method), request), item_response
+
+
+# Report the results of a run
+def _report(results=None, multi_target=False, reporter=None, journal=None):
+    """
+    Hands the result of every API call to the reporter of the run
+
+    :param results: (iterable) (((target, name, api method), request), response)
+        tuples, name is None for a target that could not be read and request
+        is None for an entry that could not be serialized
+    :param multi_target: (boolean) Prefix the output with the target
+    :param reporter: (Reporter) Reporter of the output mode
+    :param journal: (Journal) Journal that records every outcome or None
+    :returns: (list) Skipped targets/entries
+    """
+
+    skipped = []
+    for ((target, data_key, api_method), request), api_response in results:
+        target_label = _target_label(target)
+        prefix = target_label if multi_target else None
+        if data_key is None:
+            prefix, api_method, reason = target_label, None, "Not readable"
+        elif request is None:
+            api_method, reason = None, "TypeError detected!"
+        elif api_response.status_code in accepted_status_codes:
+            reason = None
+        else:
+            reason = api_response.reason
+        ok = reason is None
+        reporter.result(
+            target=prefix, name=data_key, action=api_method, ok=ok, reason=reason
+        )
+        if journal is not None:
+            journal.record(
+                target=target, name=data_key, action=api_method, ok=ok, reason=reason
+            )
+        if not ok:
+            if data_key is None:
+                skipped.append(target_label)
+            else:
+                skipped.append(
+                    f"{target_label}: {data_key}" if multi_target else data_key
+                )
+    reporter.close()
+    return skipped
+
+
+# Prepared run of one GitLab host
+class HostRun(object):
+    """
+    API calls of one GitLab host prepared by _host_run
+
+    ``results`` executes the calls with a reporter and returns the results.
+    ``target_count`` and ``catalog_size`` are None if they are not known
+    ahead of the run.
+    """
+
+    __slots__ = (
+        "results",
+        "target_count",
+        "catalog_size",
+        "counters",
+        "retry_policy",
+    )
+
+    def __init__(
+        self,
+        results=None,
+        target_count=None,
+        catalog_size=None,
+        counters=None,
+        retry_policy=None,
+    ):
+        """Constructor method for host run class"""
+
+        self.results = results
+        self.target_count = target_count
+        self.catalog_size = catalog_size
+        self.counters = counters
+        self.retry_policy = retry_policy
+
+
+# Prepare the run of one GitLab host
+def _host_run(
+    endpoint=None,
+    project_id=None,
+    group_id=None,
+    custom_config_path=None,
+    custom_data_file=None,
+    workers=default_workers,
+    engine=default_engine,
+    sync=False,
+    targets=None,
+    recursive=False,
+    rate_limit=None,
+    max_attempts=default_max_attempts,
+    retry_budget=None,
+    transport=default_transport,
+    batch_size=default_batch_size,
+    host_profile=None,
+    shards=1,
+    journal_profile=None,
+    completed=None,
+    only=None,
+    prune=False,
+    keep=None,
+    dry_run=False,
+    retry_policy=None,
+    quiet_catalog=False,
+):
+    """
+    Prepares the API calls of one GitLab host
+
+    The ``workers`` and ``rate_limit`` settings of a host profile override the
+    ones of the run, every host gets its own session, pool and rate limiter.
+
+    :param host_profile: (str) Host profile name, None for the login block
+    :param shards: (int) Number of processes sharing the host, the rate limit
+        is split between them
+    :param journal_profile: (str) Host profile name in the journal keys, None
+        for runs on a single host
+    :param completed: (set) (profile, target, name) journal keys of entries
+        that are skipped because they were already written
+    :param only: (dict) (profile, target) -> names to write, None for every
+        name of the target. Targets missing from the dict are skipped
+    :param prune: (boolean) Also delete remote entries missing from the
+        catalog. Without sync, entries whose name exists are not created
+    :param keep: (list) fnmatch patterns of names that are never pruned
+    :param dry_run: (boolean) Only print the entries prune would delete
+    :param retry_policy: (RetryPolicy) Retry policy shared by every host of
+        the run, None makes a new one
+    :param quiet_catalog: (boolean) Do not print which catalog is loaded, the
+        parent process of worker processes prints it once
+    :returns: (HostRun) Prepared run of the host. The "settled" counter
+        lists the journal keys of the ``only`` entries found up to date. See
+        labelx_controller for the other parameters
+    """
+
+    host = get_host_url(
+        custom_config_path=custom_config_path, host_profile=host_profile
+    )
+    if host_profile is not None:
+        login = get_login(
+            custom_config_path=custom_config_path, host_profile=host_profile
+        )
+        workers = login.get("workers", workers)
+        rate_limit = login.get("rate_limit", rate_limit)
+    if rate_limit is not None:
+        rate_limit = rate_limit / shards
+    headers, retry_policy = _setup_run(
+        host=host,
+        workers=workers,
+        engine=engine,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+        host_profile=host_profile,
+        retry_policy=retry_policy,
+    )
+    targets, target_count = _resolve_targets(
+        targets=targets,
+        project_id=project_id,
+        group_id=group_id,
+        recursive=recursive,
+        host=host,
+        api_headers=headers,
+        workers=workers,
+    )
+    catalog, catalog_size = _load_catalog(
+        endpoint=endpoint,
+        host=host,
+        custom_data_file=custom_data_file,
+        quiet=quiet_catalog,
+    )
+    counters = _run_counters()
+
+    def _results(reporter=None):
+        if sync or prune:
+            target_states = _list_targets(
+                targets=targets,
+                endpoint=endpoint,
+                host_url=host,
+                api_headers=headers,
+                workers=workers,
+            )
+        else:
+            target_states = ((target, None) for target in targets)
+        if transport == "graphql":
+            target_states = _run_ordered(
+                function=lambda state: target_path(host, state[0], headers),
+                items=target_states,
+                workers=workers,
+            )
+        else:
+            target_states = ((state, None) for state in target_states)
+
+        def _requests():
+            for (target, existing), full_path in target_states:
+                text = target_text(target=target)[1]
+                names = None
+                if only is not None:
+                    names = only.get((journal_profile, text), set())
+                    if names is not None and not names:
+                        continue
+                endpoint_url = target_endpoint(host, endpoint, target)
+                remote = None
+                if sync or prune:
+                    if existing is None:
+                        yield (target, None, "GET"), None
+                        continue
+                    remote = _remote_index(existing=existing, target_kind=target[0])
+                if transport == "graphql" and full_path is None:
+                    yield (target, None, "GET"), None
+                    continue
+                batch = []
+                catalog_names = set() if prune else None
+                for data_key, data_value, payload in catalog():
+                    if prune:
+                        catalog_names.add(data_key)
+                    if names is not None and data_key not in names:
+                        continue
+                    if dry_run:
+                        reporter.advance()
+                        continue
+                    if completed and (journal_profile, text, data_key) in completed:
+                        counters["resumed"] += 1
+                        reporter.advance()
+                        continue
+                    api_method, api_url = "POST", endpoint_url
+                    if sync:
+                        change = _entry_change(endpoint, data_key, data_value, remote)
+                        if change is None:
+                            counters["up_to_date"] += 1
+                            if only is not None:
+                                counters["settled"].append(
+                                    (journal_profile, text, data_key)
+                                )
+                            reporter.advance()
+                            continue
+                        api_method, remote_id = change
+                        if remote_id is not None:
+                            api_url = f"{endpoint_url}/{remote_id}"
+                    elif remote is not None and data_key in remote:
+                        counters["existing"] += 1
+                        reporter.advance()
+                        continue
+                    if payload is None:
+                        yield (target, data_key, api_method), None
+                        continue
+                    if full_path is not None and api_method == "POST":
+                        batch.append((data_key, data_value))
+                        if len(batch) >= batch_size:
+                            yield _batch_request(
+                                target, full_path, batch, host, headers
+                            )
+                            batch = []
+                        continue
+                    data = payload.body
+                    logging.debug("Payload: %s", data)
+                    request = {
+                        "method": api_method,
+                        "api_url": api_url,
+                        "data": data,
+                        "api_headers": headers,
+                    }
+                    yield (target, data_key, api_method), request
+                if batch:
+                    yield _batch_request(target, full_path, batch, host, headers)
+                if not prune:
+                    continue
+                stale, kept = _stale_entries(remote, catalog_names, keep)
+                counters["kept"] += kept
+                if dry_run:
+                    counters["pruned"] += len(stale)
+                    click.secho(
+                        f"[$] {_target_label(target)}: {len(stale)} to delete"
+                        + "".join(f"\n    - {data_key}" for data_key, _ in stale),
+                        fg="cyan",
+                    )
+                    continue
+                for data_key, remote_item in stale:
+                    if names is not None and data_key not in names:
+                        continue
+                    if completed and (journal_profile, text, data_key) in completed:
+                        counters["resumed"] += 1
+                        continue
+                    counters["pruned"] += 1
+                    request = {
+                        "method": "DELETE",
+                        "api_url": f"{endpoint_url}/{remote_item['id']}",
+                        "data": None,
+                        "api_headers": headers,
+                    }
+                    yield (target, data_key, "DELETE"), request
+
+        results = _execute(
+            items=_requests(), engine=engine, workers=workers, api_headers=headers
+        )
+        return _expand_batches(results)
+
+    return HostRun(
+        results=_results,
+        target_count=target_count,
+        catalog_size=catalog_size,
+        counters=counters,
+        retry_policy=retry_policy,
+    )
+
+
+# Merge the results of several hosts
+def _merge_results(host_results=None):
+    """
+    Runs the results of every host in its own thread and yields them as they
+    arrive, so a slow host does not hold up the others
+
+    :param host_results: (dict) host profile name -> results iterable
+    :returns: (generator) Results with the profile name prepended to the
+        target of every key
+    """
+
+    arrived = Queue()
+
+    def _drain(host_profile, results):
+        try:
+            for ((target, data_key, api_method), request), response in results:
+                key = ((host_profile, *target), data_key, api_method)
+                arrived.put((key, request, response))
+        except BaseException as err:
+            arrived.put(err)
+        finally:
+            arrived.put(None)
+
+    threads = [
+        threading.Thread(target=_drain, args=(host_profile, results), daemon=True)
+        for host_profile, results in host_results.items()
+    ]
+    for thread in threads:
+        thread.start()
+    running = len(threads)
+    while running:
+        result = arrived.get()
+        if result is None:
+            running -= 1
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            key, request, response = result
+            yield (key, request), response
+
+
+# Run every host in a thread of this process
+def _threaded_run(run_settings=None, host_profiles=None, output_mode=None):
+    """
+    Prepares the hosts of a run in this process
+
+    :param run_settings: (dict) _host_run keyword arguments shared by the hosts
+    :param host_profiles: (list) Host profile names, [None] for the login block
+    :param output_mode: (str) verbose/progress/quiet or None
+    :returns: (tuple) Results, whether the output is prefixed with targets,
+        the totals of the run and the reporter
+    """
+
+    retry_policy = RetryPolicy(
+        max_attempts=run_settings["max_attempts"], budget=run_settings["retry_budget"]
+    )
+    host_targets = _route_targets(
+        targets=run_settings["targets"], host_profiles=host_profiles
+    )
+    runs = {
+        host_profile: _host_run(
+            **dict(run_settings, targets=targets),
+            host_profile=host_profile,
+            journal_profile=host_profile if len(host_profiles) > 1 else None,
+            retry_policy=retry_policy,
+        )
+        for host_profile, targets in host_targets.items()
+    }
+    sizes = [
+        run.catalog_size * run.target_count
+        if run.catalog_size and run.target_count
+        else None
+        for run in runs.values()
+    ]
+    multi_target = len(host_profiles) > 1 or runs[host_profiles[0]].target_count != 1
+    reporter = get_reporter(
+        output_mode=output_mode, total=None if None in sizes else sum(sizes)
+    )
+    if len(host_profiles) == 1:
+        results = runs[host_profiles[0]].results(reporter)
+    else:
+        reporter = SharedReporter(reporter=reporter)
+        results = _merge_results(
+            host_results={
+                host_profile: run.results(reporter)
+                for host_profile, run in runs.items()
+            }
+        )
+    totals = dict(_run_counters(), retries=0)
+
+    def _count(results):
+        yield from results
+        for run in runs.values():
+            for name, count in run.counters.items():
+                totals[name] += count
+        totals["retries"] = retry_policy.retries
+
+    return _count(results), multi_target, totals, reporter
+
+
+# Run the targets of every host in worker processes
+def _sharded_run(run_settings=None, host_profiles=None, processes=2, output_mode=None):
+    """
+    Resolves the targets of every host and splits them between processes
+
+    The catalog is counted once here and loaded by every worker without
+    printing which one it is.
+
+    :param run_settings: (dict) _host_run keyword arguments shared by the hosts
+    :param host_profiles: (list) Host profile names, [None] for the login block
+    :param processes: (int) Worker processes per host
+    :param output_mode: (str) verbose/progress/quiet or None
+    :returns: (tuple) Results, whether the output is prefixed with targets,
+        the totals of the run and the reporter
+    """
+
+    shards = []
+    sizes = []
+    retry_policy = RetryPolicy(
+        max_attempts=run_settings["max_attempts"], budget=run_settings["retry_budget"]
+    )
+    host_targets = _route_targets(
+        targets=run_settings["targets"], host_profiles=host_profiles
+    )
+    catalog_size = _catalog_size(
+        endpoint=run_settings["endpoint"],
+        custom_data_file=run_settings["custom_data_file"],
+    )
+    for host_profile, targets in host_targets.items():
+        host = get_host_url(
+            custom_config_path=run_settings["custom_config_path"],
+            host_profile=host_profile,
+        )
+        headers, _ = _setup_run(
+            host=host,
+            workers=run_settings["workers"],
+            rate_limit=run_settings["rate_limit"],
+            max_attempts=run_settings["max_attempts"],
+            retry_budget=run_settings["retry_budget"],
+            host_profile=host_profile,
+            retry_policy=retry_policy,
+        )
+        targets, _ = _resolve_targets(
+            targets=targets,
+            project_id=run_settings["project_id"],
+            group_id=run_settings["group_id"],
+            recursive=run_settings["recursive"],
+            host=host,
+            api_headers=headers,
+            workers=run_settings["workers"],
+        )
+        targets = list(targets)
+        sizes.append(catalog_size * len(targets) if catalog_size else None)
+        host_shards = split_targets(targets=targets, shards=processes)
+        for shard_targets in host_shards:
+            shards.append(
+                {
+                    "run": dict(
+                        run_settings,
+                        targets=shard_targets,
+                        recursive=False,
+                        host_profile=host_profile,
+                        shards=len(host_shards),
+                        journal_profile=(
+                            host_profile if len(host_profiles) > 1 else None
+                        ),
+                        quiet_catalog=True,
+                    ),
+                    "prefix": host_profile if len(host_profiles) > 1 else None,
+                    "stats": get_stats_recorder() is not None,
+                    "log_level": logging.getLogger().level,
+                }
+            )
+    budget = run_settings["retry_budget"]
+    if budget is not None:
+        budget = max(budget - retry_policy.retries, 0)
+        for shard in shards:
+            shard["run"]["retry_budget"] = -(-budget // len(shards))
+    click.secho(f"[*] Running {len(shards)} worker processes.....", fg="cyan")
+    reporter = get_reporter(
+        output_mode=output_mode, total=None if None in sizes else sum(sizes)
+    )
+    totals = dict(_run_counters(), retries=retry_policy.retries)
+    multi_target = len(host_profiles) > 1 or len(shards[0]["run"]["targets"]) != 1
+    results = run_shards(shards=shards, reporter=reporter, totals=totals)
+    return results, multi_target, totals, reporter
+
 
 def labelx_controller(
     endpoint=None,
@@ -28,6 +1139,25 @@ def labelx_controller(
     group_id=None,
     custom_config_path=None,
     custom_data_file=None,
+    workers=default_workers,
+    engine=default_engine,
+    sync=False,
+    targets=None,
+    recursive=False,
+    rate_limit=None,
+    max_attempts=default_max_attempts,
+    retry_budget=None,
+    transport=default_transport,
+    batch_size=default_batch_size,
+    output_mode=None,
+    host_profiles=None,
+    processes=1,
+    journal_file=None,
+    resume=False,
+    only=None,
+    prune=False,
+    keep=None,
+    dry_run=False,
 ):
     """
     Label creation controller function
@@ -36,45 +1166,403 @@ def labelx_controller(
     :param project_id: (int) Numeric project number
     :param group_id: (int) Numeric group number
     :param custom_config_path: (str) custom config path
-    :param custom_data_file: (str) Custom label/badge information .yaml file path
+    :param custom_data_file: (str) Custom label/badge information .yaml file path,
+        .ndjson/.jsonl files are streamed entry by entry
+    :param workers: (int) Number of concurrent API calls
+    :param engine: (str) Execution engine, threads/asyncio
+    :param sync: (boolean) Only create missing and update changed entries
+    :param targets: (iterable) ("project"/"group", id) tuples, used instead of
+        project_id/group_id and consumed lazily on a single host. A target
+        prefixed with a host profile name is only applied to that host
+    :param recursive: (boolean) Also apply to every descendant of the groups
+    :param rate_limit: (float) Maximum API calls per second, None follows the
+        RateLimit headers of GitLab
+    :param max_attempts: (int) Maximum calls per item for transient failures
+    :param retry_budget: (int) Maximum retries of the whole run, None for no cap
+    :param transport: (str) rest/graphql, graphql creates labels in batches
+    :param batch_size: (int) Labels per GraphQL request
+    :param output_mode: (str) verbose/progress/quiet, None picks progress on a
+        terminal and quiet otherwise
+    :param host_profiles: (list) Host profile names, the hosts run in
+        parallel and the targets without a host profile prefix are applied to
+        every host. None uses the login block
+    :param processes: (int) Worker processes per host, the targets are split
+        between them
+    :param journal_file: (str) Journal file the outcome of every entry is
+        appended to
+    :param resume: (boolean) Skip the entries the journal records as written
+    :param only: (dict) (profile, target) -> names to write, see _host_run
+    :param prune: (boolean) Also delete remote entries missing from the
+        catalog, the deletes share the workers and the rate limit
+    :param keep: (list) fnmatch patterns of names that are never pruned
+    :param dry_run: (boolean) Only print the entries prune would delete,
+        nothing is written
+    :returns: (stdout) Output on screen
+    """
+
+    if transport == "graphql" and endpoint != "labels":
+        click.secho(f"[x] GraphQL transport only supports labels!", fg="red")
+        sys.exit(1)
+    host_profiles = list(host_profiles or [None])
+    run_settings = {
+        "endpoint": endpoint,
+        "project_id": project_id,
+        "group_id": group_id,
+        "custom_config_path": custom_config_path,
+        "custom_data_file": custom_data_file,
+        "workers": workers,
+        "engine": engine,
+        "sync": sync,
+        "targets": targets,
+        "recursive": recursive,
+        "rate_limit": rate_limit,
+        "max_attempts": max_attempts,
+        "retry_budget": retry_budget,
+        "transport": transport,
+        "batch_size": batch_size,
+        "completed": (
+            completed_entries(journal_file=journal_file, endpoint=endpoint)
+            if resume
+            else None
+        ),
+        "only": only,
+        "prune": prune,
+        "keep": list(keep) if keep else None,
+        "dry_run": dry_run,
+    }
+    journal = None
+    if journal_file:
+        journal = Journal(
+            journal_file=journal_file,
+            endpoint=endpoint,
+            custom_data_file=custom_data_file,
+            host_profiles=host_profiles if host_profiles[0] is not None else None,
+            prune=prune,
+            keep=keep,
+        )
+    if processes > 1:
+        results, multi_target, totals, reporter = _sharded_run(
+            run_settings=run_settings,
+            host_profiles=host_profiles,
+            processes=processes,
+            output_mode=output_mode,
+        )
+    else:
+        results, multi_target, totals, reporter = _threaded_run(
+            run_settings=run_settings,
+            host_profiles=host_profiles,
+            output_mode=output_mode,
+        )
+    try:
+        skipped = _report(
+            results=results,
+            multi_target=multi_target,
+            reporter=reporter,
+            journal=journal,
+        )
+        if journal is not None:
+            journal.settle(entries=totals["settled"])
+    finally:
+        if journal is not None:
+            journal.close()
+    if sync and not dry_run:
+        click.secho(
+            f"[*] {totals['up_to_date']} {endpoint} already up to date.", fg="cyan"
+        )
+    elif prune and not dry_run:
+        click.secho(
+            f"[*] {totals['existing']} {endpoint} already exist, not created.",
+            fg="cyan",
+        )
+    if resume:
+        click.secho(
+            f"[*] {totals['resumed']} {endpoint} already written, skipped.", fg="cyan"
+        )
+    if dry_run:
+        click.secho(
+            f"[*] {totals['pruned']} {endpoint} would be deleted (dry run).",
+            fg="cyan",
+        )
+    elif prune:
+        click.secho(f"[*] {totals['pruned']} {endpoint} pruned.", fg="cyan")
+    if prune and totals["kept"]:
+        click.secho(f"[*] {totals['kept']} {endpoint} kept by --keep.", fg="cyan")
+    if totals["retries"]:
+        click.secho(f"[*] Retried API calls: {totals['retries']}", fg="cyan")
+    report_stats()
+    goodbye(before=True, data=skipped)
+
+
+def labelx_retry_failed(
+    journal_file=None,
+    custom_config_path=None,
+    workers=default_workers,
+    engine=default_engine,
+    rate_limit=None,
+    max_attempts=default_max_attempts,
+    retry_budget=None,
+    output_mode=None,
+    processes=1,
+):
+    """
+    Retry controller function, writes the entries whose last outcome in a
+    journal is a failure again
+
+    The targets are synced, so entries fixed in the meantime are not written
+    twice. The outcomes are appended to the same journal.
+
+    :param journal_file: (str) Journal file of earlier runs
+    :param custom_config_path: (str) custom config path
+    :param workers: (int) Number of concurrent API calls
+    :param engine: (str) Execution engine, threads/asyncio
+    :param rate_limit: (float) Maximum API calls per second
+    :param max_attempts: (int) Maximum calls per item for transient failures
+    :param retry_budget: (int) Maximum retries of the whole run, None for no cap
+    :param output_mode: (str) verbose/progress/quiet, None picks progress on a
+        terminal and quiet otherwise
+    :param processes: (int) Worker processes per host
+    :returns: (stdout) Output on screen
+    """
+
+    header, failed = failed_entries(journal_file=journal_file)
+    if not failed:
+        click.secho(f"[*] No failed entries in [{journal_file}].", fg="green")
+        return
+    click.secho(
+        f"[*] Retrying {len(failed)} targets with failed {header['endpoint']} "
+        f"from [{journal_file}].....",
+        fg="cyan",
+    )
+    targets = sorted(
+        {
+            parse_target(
+                text=text if host_profile is None else f"{host_profile}:{text}"
+            )
+            for host_profile, text in failed
+        },
+        key=lambda target: (target[:-2], target[-2], target[-1]),
+    )
+    labelx_controller(
+        endpoint=header["endpoint"],
+        custom_config_path=custom_config_path,
+        custom_data_file=header["data_file"],
+        workers=workers,
+        engine=engine,
+        sync=True,
+        targets=targets,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+        output_mode=output_mode,
+        host_profiles=header["host_profiles"],
+        processes=processes,
+        journal_file=journal_file,
+        only=failed,
+        prune=header.get("prune", False),
+        keep=header.get("keep"),
+    )
+
+
+def labelx_plan(
+    endpoint=None,
+    custom_config_path=None,
+    custom_data_file=None,
+    plan_file=None,
+    workers=default_workers,
+    targets=None,
+    recursive=False,
+    rate_limit=None,
+    max_attempts=default_max_attempts,
+    retry_budget=None,
+    prune=False,
+    keep=None,
+):
+    """
+    Plan controller function, diffs the catalog with every target and writes
+    the resulting API calls to a plan file
+
+    :param endpoint: (str) labels/badges endpoint
+    :param custom_config_path: (str) custom config path
+    :param custom_data_file: (str) Custom label/badge file path
+    :param plan_file: (str) Plan file path
+    :param workers: (int) Number of concurrent API calls
+    :param targets: (iterable) ("project"/"group", id) tuples
+    :param recursive: (boolean) Also plan every descendant of the groups
+    :param rate_limit: (float) Maximum API calls per second
+    :param max_attempts: (int) Maximum calls per item for transient failures
+    :param retry_budget: (int) Maximum retries of the whole run, None for no cap
+    :param prune: (boolean) Also delete remote entries missing from the catalog
+    :param keep: (list) fnmatch patterns of names that are never deleted
     :returns: (stdout) Output on screen
     """
 
     skipped = []
-    api_method = "POST"
-    endpoint_url, host = generate_endpoints(
-        endpoint_type=endpoint, project_id=project_id, group_id=group_id
+    totals = {"POST": 0, "PUT": 0, "DELETE": 0}
+    host = get_host_url(custom_config_path=custom_config_path)
+    headers, _ = _setup_run(
+        host=host,
+        workers=workers,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
     )
-    headers = get_headers()
-    all_data = generate_payload(
-        endpoint_type=endpoint, scm_host=host, custom_data_file_path=custom_data_file
+    targets, _ = _resolve_targets(
+        targets=_route_targets(targets=targets, host_profiles=[None])[None],
+        recursive=recursive,
+        host=host,
+        api_headers=headers,
+        workers=workers,
     )
-    for data_key, data_value in all_data.items():
-        data_value["name"] = data_key
-        try:
-            payload = json.dumps(data_value, indent=4)
-        except TypeError:
+    catalog, _ = _load_catalog(
+        endpoint=endpoint, host=host, custom_data_file=custom_data_file
+    )
+    target_states = _list_targets(
+        targets=targets,
+        endpoint=endpoint,
+        host_url=host,
+        api_headers=headers,
+        workers=workers,
+    )
+
+    def _operations():
+        for target, existing in target_states:
+            target_label = _target_label(target)
+            if existing is None:
+                click.secho(f"[x] Skipping [{target_label}].....", fg="red")
+                skipped.append(target_label)
+                continue
+            path = target_endpoint(host, endpoint, target)[len(host) :]
+            remote = _remote_index(existing=existing, target_kind=target[0])
+            counts = {"POST": 0, "PUT": 0, "DELETE": 0}
+            names = set()
+            for data_key, data_value, payload in catalog():
+                names.add(data_key)
+                change = _entry_change(endpoint, data_key, data_value, remote)
+                if change is None:
+                    continue
+                if payload is None:
+                    click.secho(
+                        f"[x] TypeError detected!. Skipping [{data_key}].....",
+                        fg="red",
+                    )
+                    skipped.append(f"{target_label}: {data_key}")
+                    continue
+                api_method, remote_id = change
+                counts[api_method] += 1
+                yield {
+                    "target": f"{target[0]}:{target[1]}",
+                    "method": api_method,
+                    "path": path if remote_id is None else f"{path}/{remote_id}",
+                    "name": data_key,
+                    "data": data_value,
+                }
+            if prune:
+                stale, _ = _stale_entries(remote=remote, names=names, keep=keep)
+                for data_key, remote_item in stale:
+                    counts["DELETE"] += 1
+                    yield {
+                        "target": f"{target[0]}:{target[1]}",
+                        "method": "DELETE",
+                        "path": f"{path}/{remote_item['id']}",
+                        "name": data_key,
+                        "data": None,
+                    }
             click.secho(
-                f"[x] TypeError detected!. Skipping [{data_key}].....", fg="red"
+                f"[$] {target_label}: {counts['POST']} to create, "
+                f"{counts['PUT']} to update, {counts['DELETE']} to delete",
+                fg="cyan",
             )
-            skipped.append(data_key)
-            payload = None
-        if payload:
-            click.secho(f"[$] Creating - ", fg="cyan", nl=False)
-            click.secho(f"[{data_key}]", fg="magenta", nl=False)
-            click.secho(f" ..... ", fg="yellow", nl=False)
-            logging.debug(f"Payload: {payload}")
-            api_response = call_api_endpoint(
-                method=api_method,
-                api_url=endpoint_url,
-                data=payload,
-                api_headers=headers,
+            for api_method, count in counts.items():
+                totals[api_method] += count
+
+    written = write_plan(
+        plan_file=plan_file,
+        header=plan_header(endpoint=endpoint, host_url=host, prune=prune),
+        operations=_operations(),
+    )
+    click.secho(
+        f"[*] Plan with {written} API calls ({totals['POST']} create, "
+        f"{totals['PUT']} update, {totals['DELETE']} delete) "
+        f"written to [{plan_file}]",
+        fg="green",
+    )
+    report_stats()
+    goodbye(before=True, data=skipped)
+
+
+def labelx_apply(
+    plan_file=None,
+    custom_config_path=None,
+    workers=default_workers,
+    engine=default_engine,
+    rate_limit=None,
+    max_attempts=default_max_attempts,
+    retry_budget=None,
+    output_mode=None,
+):
+    """
+    Apply controller function, executes the API calls of a plan file
+
+    :param plan_file: (str) Plan file path, see labelx_plan
+    :param custom_config_path: (str) custom config path
+    :param workers: (int) Number of concurrent API calls
+    :param engine: (str) Execution engine, threads/asyncio
+    :param rate_limit: (float) Maximum API calls per second
+    :param max_attempts: (int) Maximum calls per item for transient failures
+    :param retry_budget: (int) Maximum retries of the whole run, None for no cap
+    :param output_mode: (str) verbose/progress/quiet, None picks progress on a
+        terminal and quiet otherwise
+    :returns: (stdout) Output on screen
+    """
+
+    plan = read_plan(plan_file=plan_file)
+    header = next(plan)
+    host = get_host_url(custom_config_path=custom_config_path)
+    if header["host"] != host:
+        click.secho(
+            f"[x] Plan was made for [{header['host']}], "
+            f"configured host is [{host}]!",
+            fg="red",
+        )
+        sys.exit(1)
+    click.secho(
+        f"[*] Applying {header['endpoint']} plan from [{plan_file}] "
+        f"created at {header['created']}.....",
+        fg="cyan",
+    )
+    headers, retry_policy = _setup_run(
+        host=host,
+        workers=workers,
+        engine=engine,
+        rate_limit=rate_limit,
+        max_attempts=max_attempts,
+        retry_budget=retry_budget,
+    )
+
+    def _requests():
+        for operation in plan:
+            key = (
+                parse_target(text=operation["target"]),
+                operation["name"],
+                operation["method"],
             )
-            if api_response.status_code in accepted_status_codes:
-                click.secho(f"DONE", fg="green")
-            else:
-                click.secho(f"FAILED ({api_response.reason})", fg="red")
-                skipped.append(data_key)
-        else:
-            skipped.append(data_key)
+            data = operation["data"]
+            request = {
+                "method": operation["method"],
+                "api_url": f"{host}{operation['path']}",
+                "data": None if data is None else dumps(data),
+                "api_headers": headers,
+            }
+            yield key, request
+
+    results = _execute(
+        items=_requests(), engine=engine, workers=workers, api_headers=headers
+    )
+    reporter = get_reporter(
+        output_mode=output_mode, total=count_operations(plan_file=plan_file)
+    )
+    skipped = _report(results=results, multi_target=True, reporter=reporter)
+    if retry_policy.retries:
+        click.secho(f"[*] Retried API calls: {retry_policy.retries}", fg="cyan")
+    report_stats()
     goodbye(before=True, data=skipped)
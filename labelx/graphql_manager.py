@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""This module handles the GraphQL API calls"""
+
+# Import builtin python libraries
+import json
+import logging
+
+# Import custom (local) python packages
+from .api_manager import call_api_endpoint
+from .payload_manager import dumps
+from .settings import accepted_status_codes, api_version
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Label attributes accepted by the labelCreate mutation
+label_create_fields = ["color", "description"]
+
+# Full path attribute of a target
+path_fields = {
+    "project": ("projects", "path_with_namespace"),
+    "group": ("groups", "full_path"),
+}
+
+
+# Response of one alias of a batch
+class BatchItemResponse(object):
+    """Stands in for the response of one mutation of a batch"""
+
+    def __init__(self, error=None):
+        """Constructor method for batch item response class"""
+
+        self.status_code = None if error else 201
+        self.reason = error or "Created"
+        self.headers = {}
+        self.content = b""
+
+
+# Get the GraphQL endpoint
+def graphql_url(host_url=None):
+    """
+    Returns the GraphQL endpoint of a GitLab instance
+
+    :param host_url: (str) protocol://host of the GitLab instance
+    :returns: (str) GraphQL endpoint
+    """
+
+    return f"{host_url}/api/graphql"
+
+
+# Get the full path of a target
+def target_path(host_url=None, target=None, api_headers=None):
+    """
+    Looks up the full path of a project/group, GraphQL does not take IDs
+
+    :param host_url: (str) protocol://host of the GitLab instance
+    :param target: (tuple) ("project"/"group", numeric id)
+    :param api_headers: (dict) API headers to be appended to the call
+    :returns: (str) Full path, e.g. "group/subgroup/project" or None on error
+    """
+
+    kind, target_id = target
+    collection, path_field = path_fields[kind]
+    response = call_api_endpoint(
+        method="GET",
+        api_url=f"{host_url}/api/{api_version}/{collection}/{target_id}",
+        api_headers=api_headers,
+    )
+    if response.status_code not in accepted_status_codes:
+        return None
+    return json.loads(response.content)[path_field]
+
+
+# Build a batch of labelCreate mutations
+def label_create_batch(target_kind=None, full_path=None, entries=None):
+    """
+    Builds one GraphQL document with an aliased labelCreate per label
+
+    :param target_kind: (str) project/group
+    :param full_path: (str) Full path of the project/group
+    :param entries: (list) (name, attributes) pairs of the labels
+    :returns: (bytes) JSON request body
+    """
+
+    variables = {}
+    for number, (data_key, data_value) in enumerate(entries):
+        label_input = {f"{target_kind}Path": full_path, "title": data_key}
+        for field in label_create_fields:
+            if data_value.get(field) is not None:
+                label_input[field] = data_value[field]
+        variables[f"l{number}"] = label_input
+    arguments = ", ".join(f"${alias}: LabelCreateInput!" for alias in variables)
+    mutations = " ".join(
+        f"{alias}: labelCreate(input: ${alias}) {{ errors }}" for alias in variables
+    )
+    query = f"mutation LabelxBatch({arguments}) {{ {mutations} }}"
+    logging.debug("[*] GraphQL batch of %d labels for: %s", len(variables), full_path)
+    return dumps({"query": query, "variables": variables})
+
+
+# Split a batch response
+def split_batch_response(response=None, size=None):
+    """
+    Maps a batch response back to the labels of the batch
+
+    :param response: (response) Response of the batch call
+    :param size: (int) Number of labels in the batch
+    :returns: (list) One BatchItemResponse per label, in batch order
+    """
+
+    if response.status_code not in accepted_status_codes:
+        return [BatchItemResponse(error=response.reason)] * size
+    try:
+        body = json.loads(response.content)
+    except ValueError:
+        return [BatchItemResponse(error="Invalid GraphQL response")] * size
+    data = body.get("data") or {}
+    alias_errors = {}
+    for error in body.get("errors") or []:
+        path = error.get("path") or [None]
+        alias_errors.setdefault(path[0], error.get("message"))
+    results = []
+    for number in range(size):
+        alias = f"l{number}"
+        result = data.get(alias)
+        if result is None:
+            error = alias_errors.get(alias) or alias_errors.get(None)
+            results.append(BatchItemResponse(error=error or "No result"))
+        elif result.get("errors"):
+            results.append(BatchItemResponse(error="; ".join(result["errors"])))
+        else:
+            results.append(BatchItemResponse())
+    return results
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Run journal module"""
+
+# Import builtin python libraries
+from datetime import datetime, timezone
+import json
+import os
+import sys
+
+# Import external python libraries
+import click
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Journal file format version
+journal_version = 1
+
+
+# Text of a target
+def target_text(target=None):
+    """
+    Journal text of a target
+
+    :param target: (tuple) ("project"/"group", numeric id), optionally
+        prefixed with the host profile name
+    :returns: (tuple) Host profile name or None and e.g. "project:123"
+    """
+
+    *host_profile, kind, target_id = target
+    return (host_profile[0] if host_profile else None), f"{kind}:{target_id}"
+
+
+# Journal class
+class Journal(object):
+    """
+    Appends the outcome of every completed entry to a NDJSON file
+
+    Every run starts with a header line. The file is line buffered, so an
+    interrupted run keeps every outcome reported before the interruption.
+    """
+
+    def __init__(
+        self,
+        journal_file=None,
+        endpoint=None,
+        custom_data_file=None,
+        host_profiles=None,
+        prune=False,
+        keep=None,
+    ):
+        """Constructor method for journal class"""
+
+        self.journal_file = journal_file
+        self.stream = open(journal_file, "a", buffering=1)
+        self._write(
+            {
+                "labelx_journal": journal_version,
+                "endpoint": endpoint,
+                "data_file": (
+                    os.path.abspath(custom_data_file) if custom_data_file else None
+                ),
+                "host_profiles": list(host_profiles) if host_profiles else None,
+                "prune": prune,
+                "keep": list(keep) if keep else None,
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+        )
+
+    def _write(self, record=None):
+        """
+        Appends one record
+
+        :param record: (dict) Journal record
+        """
+
+        self.stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def record(self, target=None, name=None, action=None, ok=True, reason=None):
+        """
+        Appends the outcome of one entry
+
+        :param target: (tuple) Target of the entry, see target_text
+        :param name: (str) Label/badge name, None for a target that could not
+            be read
+        :param action: (str) API method or None if no call was made
+        :param ok: (boolean) Whether the entry was written
+        :param reason: (str) Failure reason
+        """
+
+        host_profile, text = target_text(target=target)
+        self._write(
+            {
+                "profile": host_profile,
+                "target": text,
+                "name": name,
+                "method": action,
+                "ok": ok,
+                "reason": reason,
+            }
+        )
+
+    def settle(self, entries=None):
+        """
+        Records entries a retry run found already up to date as written
+
+        :param entries: (list) (profile, target, name) journal keys
+        """
+
+        for host_profile, text, name in entries:
+            self._write(
+                {
+                    "profile": host_profile,
+                    "target": text,
+                    "name": name,
+                    "method": None,
+                    "ok": True,
+                    "reason": None,
+                }
+            )
+
+    def close(self):
+        """Closes the journal file"""
+
+        self.stream.close()
+
+
+# Read a journal file
+def read_journal(journal_file=None):
+    """
+    Reads the headers and outcomes of a journal file
+
+    A truncated last line, e.g. of a killed run, is ignored. The failure of
+    a target that could not be read is dropped once one of its entries is
+    recorded. Labels and badges runs may share a journal, so the outcomes
+    are keyed by the endpoint of their run.
+
+    :param journal_file: (str) Journal file path
+    :returns: (tuple) Last run header or None and a dict of
+        (endpoint, profile, target, name) -> (last outcome record, header of
+        its run)
+    """
+
+    header = None
+    outcomes = {}
+    if not os.path.exists(journal_file):
+        return header, outcomes
+    with open(journal_file, "r") as stream:
+        for line in stream:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "labelx_journal" in record:
+                if record["labelx_journal"] != journal_version:
+                    click.secho(
+                        f"[x] Unsupported journal version "
+                        f"[{record['labelx_journal']}]!",
+                        fg="red",
+                    )
+                    sys.exit(1)
+                header = record
+                continue
+            if header is None:
+                continue
+            target = (header["endpoint"], record["profile"], record["target"])
+            if record["name"] is not None:
+                outcomes.pop((*target, None), None)
+            outcomes[(*target, record["name"])] = record, header
+    return header, outcomes
+
+
+# Entries already written
+def completed_entries(journal_file=None, endpoint=None):
+    """
+    Lists the entries a journal records as written
+
+    :param journal_file: (str) Journal file path
+    :param endpoint: (str) labels/badges endpoint of the entries
+    :returns: (set) (profile, target, name) tuples
+    """
+
+    _, outcomes = read_journal(journal_file=journal_file)
+    return {
+        key[1:]
+        for key, (record, _) in outcomes.items()
+        if record["ok"] and key[0] == endpoint
+    }
+
+
+# Entries that failed
+def failed_entries(journal_file=None):
+    """
+    Lists the entries whose last outcome in a journal is a failure
+
+    The failures have to come from runs of the same endpoint, data file, host
+    profiles and prune settings, so they can be retried with the settings of
+    those runs.
+
+    :param journal_file: (str) Journal file path
+    :returns: (tuple) Header of the run of the failures, the last run header
+        if there are none, and a dict of (profile, target) -> set of names,
+        None for a target that could not be read
+    """
+
+    header, outcomes = read_journal(journal_file=journal_file)
+    if header is None:
+        click.secho(f"[x] [{journal_file}] is not a labelx journal!", fg="red")
+        sys.exit(1)
+    failed = {}
+    runs = {}
+    for (_, host_profile, text, name), (record, run) in outcomes.items():
+        if record["ok"]:
+            continue
+        settings = (
+            run["endpoint"],
+            run["data_file"],
+            run["host_profiles"],
+            run.get("prune"),
+            run.get("keep"),
+        )
+        runs[repr(settings)] = run
+        key = (host_profile, text)
+        if name is None:
+            failed[key] = None
+        elif failed.get(key, set()) is not None:
+            failed.setdefault(key, set()).add(name)
+    if len(runs) > 1:
+        click.secho(
+            f"[x] [{journal_file}] has failures of runs with different settings, "
+            f"use one journal per endpoint and data file!",
+            fg="red",
+        )
+        sys.exit(1)
+    return (next(iter(runs.values())) if runs else header), failed
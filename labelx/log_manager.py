@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Debug logging helpers module"""
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Keys whose values are never logged
+secret_keys = ["token", "private-token", "authorization"]
+
+
+# Deferred log argument class
+class Lazy(object):
+    """
+    Log argument that is only formatted when the record is emitted
+
+    Passed as a ``%s`` argument to logging, the function is not called when
+    the log level is disabled.
+    """
+
+    __slots__ = ("function", "args", "kwargs")
+
+    def __init__(self, function=None, *args, **kwargs):
+        """Constructor method for lazy class"""
+
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        """Calls the function and returns its result as text"""
+
+        return str(self.function(*self.args, **self.kwargs))
+
+
+# Mask a secret
+def mask(value=None):
+    """
+    Masks a secret, keeping the last four characters of long values
+
+    :param value: (str) Secret
+    :returns: (str) Masked secret
+    """
+
+    value = str(value)
+    if len(value) < 12:
+        return "****"
+    return f"****{value[-4:]}"
+
+
+# Mask the secrets of a dictionary
+def mask_secrets(data=None):
+    """
+    Copies a (nested) dictionary with the values of secret keys masked
+
+    :param data: (dict) Headers, configurations etc.
+    :returns: (dict) Copy that is safe to log
+    """
+
+    masked = {}
+    for key, value in data.items():
+        if str(key).lower() in secret_keys and value is not None:
+            masked[key] = mask(value=value)
+        elif isinstance(value, dict):
+            masked[key] = mask_secrets(data=value)
+        else:
+            masked[key] = value
+    return masked
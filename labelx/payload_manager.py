@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""API payload encoding module"""
+
+# Import builtin python libraries
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+
+# Encode data as compact JSON
+def dumps(data=None):
+    """
+    Encodes data as compact UTF-8 JSON, with orjson when it is installed
+
+    :param data: Data to encode
+    :returns: (bytes) JSON body
+    :raises TypeError: If the data can not be encoded
+    """
+
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# Encoded payload class
+class EncodedPayload(object):
+    """
+    Compact JSON body of one catalog entry, encoded once per run
+    """
+
+    __slots__ = ("body",)
+
+    def __init__(self, data_value=None):
+        """Constructor method for encoded payload class"""
+
+        self.body = dumps(data_value)
+
+
+# Encode a catalog entry
+def encode_entry(data_value=None):
+    """
+    Encodes the attributes of a label/badge once
+
+    :param data_value: (dict) Label/badge attributes including the name
+    :returns: (EncodedPayload) Encoded payload or None on TypeError
+    """
+
+    try:
+        return EncodedPayload(data_value=data_value)
+    except TypeError:
+        return None
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Plan file handler module"""
+
+# Import builtin python libraries
+from datetime import datetime, timezone
+import json
+import sys
+
+# Import external python libraries
+import click
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Plan file format version
+plan_version = 1
+
+
+# Build a plan header
+def plan_header(endpoint=None, host_url=None, prune=False):
+    """
+    Builds the first line of a plan file
+
+    :param endpoint: (str) labels/badges endpoint
+    :param host_url: (str) protocol://host of the GitLab instance
+    :param prune: (boolean) Whether the plan deletes entries missing from the
+        catalog
+    :returns: (dict) Plan header
+    """
+
+    return {
+        "labelx_plan": plan_version,
+        "endpoint": endpoint,
+        "host": host_url,
+        "prune": prune,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+# Write a plan file
+def write_plan(plan_file=None, header=None, operations=None):
+    """
+    Writes a plan file, one compact JSON object per line
+
+    The header is the first line, every following line is one API call with
+    its ``target``, ``method``, ``path``, ``name`` and ``data``. Operations
+    are written as they are generated. No credentials are written.
+
+    :param plan_file: (str) Plan file path
+    :param header: (dict) Plan header, see plan_header
+    :param operations: (iterable) Operation dictionaries
+    :returns: (int) Number of operations written
+    """
+
+    written = 0
+    with open(plan_file, "w") as stream:
+        stream.write(json.dumps(header, separators=(",", ":")) + "\n")
+        for operation in operations:
+            stream.write(json.dumps(operation, separators=(",", ":")) + "\n")
+            written += 1
+    return written
+
+
+# Read a plan file
+def read_plan(plan_file=None):
+    """
+    Lazily reads a plan file
+
+    :param plan_file: (str) Plan file path
+    :returns: (generator) The plan header followed by the operations
+    """
+
+    with open(plan_file, "r") as stream:
+        try:
+            header = json.loads(stream.readline())
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or "labelx_plan" not in header:
+            click.secho(f"[x] [{plan_file}] is not a labelx plan file!", fg="red")
+            sys.exit(1)
+        if header["labelx_plan"] != plan_version:
+            click.secho(
+                f"[x] Unsupported plan version [{header['labelx_plan']}]!", fg="red"
+            )
+            sys.exit(1)
+        yield header
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+# Count the operations of a plan file
+def count_operations(plan_file=None):
+    """
+    Counts the operations of a plan file without parsing them
+
+    :param plan_file: (str) Plan file path
+    :returns: (int) Number of operations
+    """
+
+    with open(plan_file, "rb") as stream:
+        return max(sum(1 for line in stream if line.strip()) - 1, 0)
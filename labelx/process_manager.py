@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Multi-process run module"""
+
+# Import builtin python libraries
+import logging
+import multiprocessing
+import queue
+import sys
+
+# Import external python libraries
+import click
+
+# Import custom (local) python packages
+from .stats_manager import StatsRecorder, get_stats_recorder, set_stats_recorder
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Results sent to the parent in one message
+results_per_message = 100
+
+# Seconds the parent waits for a message before checking the workers
+worker_poll_seconds = 1.0
+
+
+# Split targets into shards
+def split_targets(targets=None, shards=1):
+    """
+    Deals the targets round robin into shards
+
+    :param targets: (list) ("project"/"group", id) tuples
+    :param shards: (int) Maximum number of shards
+    :returns: (list) Non empty lists of targets
+    """
+
+    shards = max(min(shards, len(targets)), 1)
+    return [targets[number::shards] for number in range(shards)]
+
+
+# Shard response class
+class ShardResponse(object):
+    """Response of an API call made by a worker process"""
+
+    def __init__(self, status_code=None, reason=None):
+        """Constructor method for shard response class"""
+
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = {}
+
+
+# Shard reporter class
+class _ShardReporter(object):
+    """Sends the results of a worker process to the parent in chunks"""
+
+    def __init__(self, messages=None, prefix=None):
+        """Constructor method for shard reporter class"""
+
+        self.messages = messages
+        self.prefix = prefix
+        self.results = []
+        self.advanced = 0
+
+    def advance(self, count=1):
+        """Counts entries that needed no API call"""
+
+        self.advanced += count
+
+    def send(self, result=None):
+        """
+        Queues the result of one API call
+
+        :param result: (tuple) (((target, name, api method), request), response)
+        """
+
+        ((target, data_key, api_method), request), api_response = result
+        if self.prefix is not None:
+            target = (self.prefix, *target)
+        self.results.append(
+            (
+                target,
+                data_key,
+                api_method,
+                request is not None,
+                None if api_response is None else api_response.status_code,
+                None if api_response is None else api_response.reason,
+            )
+        )
+        if len(self.results) >= results_per_message:
+            self.flush()
+
+    def flush(self):
+        """Sends the queued results"""
+
+        if self.results or self.advanced:
+            self.messages.put(("results", self.results, self.advanced))
+            self.results = []
+            self.advanced = 0
+
+
+# Run a shard in a worker process
+def _run_shard(shard=None, messages=None):
+    """
+    Runs the API calls of one shard, entry point of the worker processes
+
+    :param shard: (dict) Keyword arguments of the host run, the number and
+        the settings of the worker
+    :param messages: (multiprocessing.Queue) Queue to the parent process
+    """
+
+    from .controller import _host_run
+
+    logging.getLogger().setLevel(shard["log_level"])
+    recorder = set_stats_recorder(StatsRecorder()) if shard["stats"] else None
+    reporter = _ShardReporter(messages=messages, prefix=shard["prefix"])
+    try:
+        run = _host_run(**shard["run"])
+        for result in run.results(reporter):
+            reporter.send(result=result)
+        reporter.flush()
+        stats = None
+        if recorder is not None:
+            stats = (recorder.counts, recorder.latencies.tolist(), recorder.retries)
+        messages.put(
+            ("done", shard["number"], run.counters, run.retry_policy.retries, stats)
+        )
+    except BaseException as err:
+        reporter.flush()
+        messages.put(("error", shard["number"], f"{type(err).__name__}: {err}"))
+
+
+# Check for workers that exited without reporting
+def _check_workers(workers=None, finished=None, messages=None):
+    """
+    Stops the run if a worker exited before sending its results
+
+    A worker flushes its messages before it exits, so a dead worker only
+    counts as failed once the queue is empty.
+
+    :param workers: (list) Worker processes, indexed by shard number
+    :param finished: (set) Numbers of the shards that reported done
+    :param messages: (multiprocessing.Queue) Queue from the workers
+    """
+
+    for number, worker in enumerate(workers):
+        if number in finished or worker.exitcode is None:
+            continue
+        if not messages.empty():
+            return
+        click.secho(
+            f"[x] Worker process {number} exited with code {worker.exitcode} "
+            f"before finishing!",
+            fg="red",
+        )
+        sys.exit(1)
+
+
+# Run shards in worker processes
+def run_shards(shards=None, reporter=None, totals=None):
+    """
+    Runs every shard in its own process and yields the results as they arrive
+
+    The worker processes are spawned, so none inherits the sessions or the
+    threads of the parent. Every worker makes its own session and loads the
+    catalog once. A worker that fails or exits without reporting, e.g. when
+    it is killed, stops the run.
+
+    :param shards: (list) Shard dictionaries, see _run_shard
+    :param reporter: (Reporter) Reporter that counts entries without calls
+    :param totals: (dict) Filled with the counters and retries of the workers
+    :returns: (generator) (((target, name, api method), request), response)
+        tuples, request is True for a call that was made
+    """
+
+    context = multiprocessing.get_context("spawn")
+    messages = context.Queue(maxsize=len(shards) * 4)
+    workers = [
+        context.Process(
+            target=_run_shard, args=(dict(shard, number=number), messages), daemon=True
+        )
+        for number, shard in enumerate(shards)
+    ]
+    for worker in workers:
+        worker.start()
+    finished = set()
+    try:
+        while len(finished) < len(workers):
+            try:
+                message = messages.get(timeout=worker_poll_seconds)
+            except queue.Empty:
+                _check_workers(workers=workers, finished=finished, messages=messages)
+                continue
+            if message[0] == "results":
+                _, results, advanced = message
+                if advanced:
+                    reporter.advance(count=advanced)
+                for target, data_key, api_method, made, status, reason in results:
+                    key = (tuple(target), data_key, api_method)
+                    request = True if made else None
+                    response = ShardResponse(status_code=status, reason=reason)
+                    yield (key, request), response
+            elif message[0] == "done":
+                _, number, counters, retries, stats = message
+                finished.add(number)
+                for name, count in counters.items():
+                    totals[name] += count
+                totals["retries"] += retries
+                recorder = get_stats_recorder()
+                if stats is not None and recorder is not None:
+                    recorder.merge(*stats)
+            else:
+                click.secho(
+                    f"[x] Worker process {message[1]} failed ({message[2]})!", fg="red"
+                )
+                sys.exit(1)
+    finally:
+        for worker in workers:
+            if worker.is_alive() and len(finished) < len(workers):
+                worker.terminate()
+            worker.join()
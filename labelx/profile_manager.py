@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Run profiler module"""
+
+# Import builtin python libraries
+import cProfile
+import io
+import pstats
+import tracemalloc
+
+# Import external python libraries
+import click
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Number of functions/allocation sites in the reports
+report_lines = 25
+
+
+# Run profiler class
+class RunProfiler(object):
+    """
+    Profiles a run with cProfile and optionally tracemalloc
+
+    cProfile follows the main thread. It parses the catalog, serializes the
+    payloads and prints the output; time spent by the worker threads on the
+    network shows up as waiting for their results.
+    """
+
+    def __init__(self, output_file=None, memory=False):
+        """Constructor method for run profiler class"""
+
+        self.output_file = output_file
+        self.memory = memory
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        """Starts profiling"""
+
+        if self.memory:
+            tracemalloc.start(10)
+        self.profile.enable()
+
+    def stop(self):
+        """
+        Stops profiling and writes the reports
+
+        The pstats dump is written to the output file, a text report of the
+        slowest functions next to it (``.txt``) and with memory profiling the
+        top allocation sites (``.memory.txt``).
+
+        :returns: (stdout) Output on screen
+        """
+
+        self.profile.disable()
+        self.profile.dump_stats(self.output_file)
+        report = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=report)
+        stats.sort_stats("cumulative").print_stats(report_lines)
+        stats.sort_stats("tottime").print_stats(report_lines)
+        with open(f"{self.output_file}.txt", "w") as stream:
+            stream.write(report.getvalue())
+        click.secho(f"[*] Profile written to [{self.output_file}]", fg="cyan")
+        if not self.memory:
+            return
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(f"{self.output_file}.memory.txt", "w") as stream:
+            stream.write(f"Current: {current} bytes, peak: {peak} bytes\n\n")
+            for statistic in snapshot.statistics("lineno")[:report_lines]:
+                stream.write(f"{statistic}\n")
+            stream.write("\n")
+            for statistic in snapshot.statistics("traceback")[:3]:
+                stream.write(f"{statistic}\n")
+                stream.write("\n".join(statistic.traceback.format()) + "\n\n")
+        click.secho(
+            f"[*] Allocations written to [{self.output_file}.memory.txt]", fg="cyan"
+        )
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Run output module"""
+
+# Import builtin python libraries
+import sys
+import threading
+import time
+
+# Import external python libraries
+import click
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Console verbs for api methods
+actions = {"POST": "Creating", "PUT": "Updating", "DELETE": "Deleting"}
+
+# Failures listed in the failure summary
+max_listed_failures = 20
+
+
+# Reporter base class
+class Reporter(object):
+    """
+    Collects the results of a run and prints the failure summary
+
+    Subclasses decide what is printed for every result.
+    """
+
+    def __init__(self, total=None):
+        """Constructor method for reporter class"""
+
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.failures = []
+        self.reasons = {}
+
+    def result(self, target=None, name=None, action=None, ok=True, reason=None):
+        """
+        Records the result of one entry
+
+        :param target: (str) Target label, e.g. "project 1", None for single
+            target runs
+        :param name: (str) Label/badge name, None for a target that could not
+            be read
+        :param action: (str) API method or None for a target/entry that was
+            skipped before any call
+        :param ok: (boolean) Whether the entry was written
+        :param reason: (str) Failure reason
+        """
+
+        self.completed += 1
+        if not ok:
+            label = f"{target}: {name}" if target and name else target or name
+            self.failed += 1
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+            if len(self.failures) < max_listed_failures:
+                self.failures.append((label, reason))
+
+    def advance(self, count=1):
+        """
+        Counts entries that needed no API call, e.g. already up to date
+
+        :param count: (int) Number of entries
+        """
+
+        self.completed += count
+
+    def close(self):
+        """
+        Prints the failure summary
+
+        :returns: (stdout) Output on screen
+        """
+
+        if not self.failed:
+            return
+        reasons = ", ".join(
+            f"{reason} ({count})"
+            for reason, count in sorted(self.reasons.items(), key=lambda x: -x[1])
+        )
+        click.secho(f"[x] {self.failed} failed: {reasons}", fg="red")
+        for label, reason in self.failures:
+            click.secho(f"    {label} ({reason})", fg="red")
+        if self.failed > len(self.failures):
+            click.secho(
+                f"    ... and {self.failed - len(self.failures)} more", fg="red"
+            )
+
+
+# Verbose reporter class
+class VerboseReporter(Reporter):
+    """Prints one line per entry"""
+
+    def result(self, target=None, name=None, action=None, ok=True, reason=None):
+        """Prints the result of one entry, see Reporter.result"""
+
+        super().result(target=target, name=name, action=action, ok=ok, reason=reason)
+        if name is None:
+            click.secho(f"[x] Skipping [{target}].....", fg="red")
+            return
+        if action is None:
+            click.secho(f"[x] {reason}. Skipping [{name}].....", fg="red")
+            return
+        line = click.style(f"[$] {actions[action]} - ", fg="cyan")
+        if target:
+            line += click.style(f"[{target}] ", fg="blue")
+        line += click.style(f"[{name}]", fg="magenta")
+        line += click.style(f" ..... ", fg="yellow")
+        if ok:
+            line += click.style(f"DONE", fg="green")
+        else:
+            line += click.style(f"FAILED ({reason})", fg="red")
+        click.echo(line)
+
+    def close(self):
+        """The lines of the failures were already printed"""
+
+
+# Progress reporter class
+class ProgressReporter(Reporter):
+    """
+    Redraws one progress line with throughput and ETA
+
+    The line is redrawn at most every ``interval`` seconds. When the output
+    is not a terminal a new line is printed every ``log_interval`` seconds.
+    """
+
+    interval = 0.1
+    log_interval = 10.0
+    width = 30
+
+    def __init__(self, total=None, stream=None):
+        """Constructor method for progress reporter class"""
+
+        super().__init__(total=total)
+        self.stream = stream or sys.stderr
+        self.is_tty = self.stream.isatty()
+        self.started = time.monotonic()
+        self.drawn = 0.0
+
+    def result(self, target=None, name=None, action=None, ok=True, reason=None):
+        """Records one entry and redraws the progress line when due"""
+
+        super().result(target=target, name=name, action=action, ok=ok, reason=reason)
+        self._draw()
+
+    def advance(self, count=1):
+        """Counts entries without API calls and redraws when due"""
+
+        super().advance(count=count)
+        self._draw()
+
+    def _line(self):
+        """
+        Builds the progress line
+
+        :returns: (str) Bar, counts, throughput and ETA
+        """
+
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = self.completed / elapsed
+        parts = [f"{self.completed}"]
+        if self.total:
+            done = min(self.completed / self.total, 1.0)
+            filled = int(done * self.width)
+            bar = "#" * filled + "-" * (self.width - filled)
+            parts = [f"[{bar}] {self.completed}/{self.total}"]
+        parts.append(f"{self.failed} failed")
+        parts.append(f"{rate:.1f}/s")
+        if self.total and rate > 0:
+            remaining = max(self.total - self.completed, 0) / rate
+            parts.append(f"ETA {int(remaining // 60):02d}:{int(remaining % 60):02d}")
+        return ", ".join(parts)
+
+    def _draw(self, force=False):
+        """
+        Redraws the progress line if the interval passed
+
+        :param force: (boolean) Redraw regardless of the interval
+        """
+
+        now = time.monotonic()
+        interval = self.interval if self.is_tty else self.log_interval
+        if not force and now - self.drawn < interval:
+            return
+        self.drawn = now
+        if self.is_tty:
+            click.echo(f"\r[*] {self._line()}\x1b[K", file=self.stream, nl=False)
+        else:
+            click.echo(f"[*] {self._line()}", file=self.stream)
+
+    def close(self):
+        """Draws the final progress line and the failure summary"""
+
+        self._draw(force=True)
+        if self.is_tty:
+            click.echo("", file=self.stream)
+        super().close()
+
+
+# Quiet reporter class
+class QuietReporter(Reporter):
+    """Only prints the failure summary"""
+
+
+# Shared reporter class
+class SharedReporter(object):
+    """Serializes the calls of several threads to one reporter"""
+
+    def __init__(self, reporter=None):
+        """Constructor method for shared reporter class"""
+
+        self.reporter = reporter
+        self._lock = threading.Lock()
+
+    def result(self, **kwargs):
+        """Records the result of one entry, see Reporter.result"""
+
+        with self._lock:
+            self.reporter.result(**kwargs)
+
+    def advance(self, count=1):
+        """Counts entries without API calls, see Reporter.advance"""
+
+        with self._lock:
+            self.reporter.advance(count=count)
+
+    def close(self):
+        """Prints the failure summary, see Reporter.close"""
+
+        with self._lock:
+            self.reporter.close()
+
+
+# Output modes
+reporters = {
+    "verbose": VerboseReporter,
+    "progress": ProgressReporter,
+    "quiet": QuietReporter,
+}
+
+
+# Get a reporter
+def get_reporter(output_mode=None, total=None):
+    """
+    Creates the reporter of an output mode
+
+    :param output_mode: (str) verbose/progress/quiet, None picks progress on a
+        terminal and quiet otherwise
+    :param total: (int) Expected number of entries if known
+    :returns: (Reporter) Reporter
+    """
+
+    if output_mode is None:
+        output_mode = "progress" if sys.stderr.isatty() else "quiet"
+    return reporters[output_mode](total=total)
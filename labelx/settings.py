@@ -11,10 +11,10 @@ import json
 
 # Import external python libraries
 import click
-import yaml
 
 # Import custom (local) python packages
 from . import config_manager
+from .log_manager import Lazy, mask
 
 # Source code meta data
 __author__ = "Dalwar Hossain"
@@ -22,9 +22,50 @@ __email__ = "dalwar23@pm.me"
 
 # Setting parameters
 api_version = "v4"
-accepted_status_codes = [200, 201, 202]
+accepted_status_codes = [200, 201, 202, 204]
 max_col_length = 88
 allowed_extensions = ["yaml", "yml"]
+ndjson_extensions = ["ndjson", "jsonl"]
+target_kinds = ["project", "group"]
+default_workers = 1
+max_workers = 4096
+default_processes = 1
+max_processes = 256
+engines = ["threads", "asyncio"]
+default_engine = "threads"
+default_pool_size = 10
+transports = ["rest", "graphql"]
+default_transport = "rest"
+default_batch_size = 50
+max_batch_size = 100
+per_page = 100
+rate_limit_safety = 0.9
+default_retry_after = 1.0
+request_timeout = 30
+retry_status_codes = [429, 502, 503, 504]
+default_max_attempts = 5
+retry_backoff = 0.5
+max_retry_backoff = 30.0
+response_cache_size = 256 * 1024 * 1024
+sync_fields = {
+    "labels": ["color", "description", "priority"],
+    "badges": ["link_url", "image_url", "position"],
+}
+
+
+# Link url modification of one badge
+def mod_default(data_value=None, host=None):
+    """
+    This method adds the host name before the link_url of a badge if required
+
+    :param data_value: (dict) Badge attributes
+    :param host: (str) Source code management host url
+    :returns: (dict) Badge attributes with the modified link_url
+    """
+
+    if "%" in data_value["link_url"]:
+        data_value["link_url"] = f"{host}/{data_value['link_url']}"
+    return data_value
 
 
 # Default link url modification for badges endpoint
@@ -39,46 +80,104 @@ def mod_defaults(init_dict=None, host=None):
 
     ret_dict = {}
     for data_key, data_value in init_dict.items():
-        if "%" in data_value["link_url"]:
-            data_value["link_url"] = f"{host}/{data_value['link_url']}"
-            ret_dict[data_key] = data_value
-        else:
-            ret_dict[data_key] = data_value
-    logging.debug(f"Modified defaults: {ret_dict}")
+        ret_dict[data_key] = mod_default(data_value=data_value, host=host)
+    logging.debug("Modified defaults: %s", ret_dict)
     return ret_dict
 
 
 # Read configurations
-def read_yaml(yaml_file_path=None):
+def read_yaml(yaml_file_path=None, use_cache=False):
     """
     This method reads configurations from a .yaml file
 
+    The C (libyaml) loader is used when PyYAML is built with it.
+
     :param yaml_file_path: Configuration files full path (default and custom)
+    :param use_cache: (boolean) Reuse the parsed data of an unchanged file
     :returns: (dict) a python dictionary with yaml file data
     """
 
+    import yaml
+    from . import cache_manager
+
     logging.debug(f"[$] Reading yaml file.....")
     file_ext = str(yaml_file_path).rsplit(".", 1)[1]
     if file_ext in allowed_extensions:
-        with open(yaml_file_path, "r") as stream:
-            try:
-                defaults = yaml.load(stream, Loader=yaml.FullLoader)
-            except Exception as err:
-                click.secho(f"[x] ERROR: {err}", fg="red")
-                sys.exit(1)
+        with open(yaml_file_path, "rb") as stream:
+            content = stream.read()
+        if use_cache:
+            fingerprint = cache_manager.catalog_fingerprint(
+                file_path=yaml_file_path, content=content
+            )
+            defaults = cache_manager.load_catalog(fingerprint=fingerprint)
+            if defaults is not None:
+                return defaults
+        try:
+            defaults = yaml.load(
+                content, Loader=getattr(yaml, "CFullLoader", yaml.FullLoader)
+            )
+        except Exception as err:
+            click.secho(f"[x] ERROR: {err}", fg="red")
+            sys.exit(1)
+        if use_cache:
+            cache_manager.save_catalog(fingerprint=fingerprint, data=defaults)
         return defaults
     else:
         return False
 
 
+# Check catalog format
+def is_ndjson(file_path=None):
+    """
+    Checks if a labels/badges file is a NDJSON catalog
+
+    :param file_path: (str) Labels/badges file path
+    :returns: (boolean) True for .ndjson/.jsonl files
+    """
+
+    return str(file_path).rsplit(".", 1)[-1] in ndjson_extensions
+
+
+# Read a NDJSON catalog
+def read_ndjson(ndjson_file_path=None):
+    """
+    Lazily reads a NDJSON catalog with one label/badge object per line
+
+    Every object needs a ``name``, the other keys are the attributes. Empty
+    lines are ignored and invalid lines are reported and skipped.
+
+    :param ndjson_file_path: (str) Full Path to Labels/badges (NDJSON) file
+    :returns: (generator) (name, attributes) tuples
+    """
+
+    with open(ndjson_file_path, "r") as stream:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                data_value = json.loads(line)
+                data_key = data_value.pop("name")
+            except (ValueError, KeyError, AttributeError, TypeError) as err:
+                click.secho(
+                    f"[x] Invalid entry at line {line_number} ({err}). Skipping.....",
+                    fg="red",
+                )
+                continue
+            yield data_key, data_value
+
+
 # Generate payloads
-def generate_payload(endpoint_type=None, scm_host=None, custom_data_file_path=None):
+def generate_payload(
+    endpoint_type=None, scm_host=None, custom_data_file_path=None, quiet=False
+):
     """
     Parse file or default values to generate a list of labels with attributes
 
     :param endpoint_type: (str) labels/badges endpoint string
     :param scm_host: (str) Source code management host url
-    :param custom_data_file_path: (str) Full Path to Labels/badges (YAML) file
+    :param custom_data_file_path: (str) Full Path to Labels/badges (YAML/NDJSON)
+        file
+    :param quiet: (boolean) Do not print which data is used
     :returns: (dict) key value pairs of the label name and attributes
     """
 
@@ -86,53 +185,119 @@ def generate_payload(endpoint_type=None, scm_host=None, custom_data_file_path=No
         dir_path = os.path.dirname(os.path.realpath(__file__))
         data_file = f"{endpoint_type}.yaml"
         data_yaml_file = os.path.join(dir_path, data_file)
-        builtin_data = read_yaml(yaml_file_path=data_yaml_file)
+        builtin_data = read_yaml(yaml_file_path=data_yaml_file, use_cache=True)
         if endpoint_type == "badges":
             default_data = mod_defaults(init_dict=builtin_data, host=scm_host)
         else:
             default_data = builtin_data
-        click.secho(
-            f"[*] Custom {endpoint_type} data not provided. Using builtin data.....",
-            fg="cyan",
-        )
-        logging.debug(f"[$] Builtin data: {json.dumps(default_data, indent=4)}")
+        if not quiet:
+            click.secho(
+                f"[*] Custom {endpoint_type} data not provided. "
+                f"Using builtin data.....",
+                fg="cyan",
+            )
+        logging.debug("[$] Builtin data: %s", Lazy(json.dumps, default_data, indent=4))
     else:
-        custom_data = read_yaml(yaml_file_path=custom_data_file_path)
+        if is_ndjson(file_path=custom_data_file_path):
+            custom_data = dict(read_ndjson(ndjson_file_path=custom_data_file_path))
+        else:
+            custom_data = read_yaml(
+                yaml_file_path=custom_data_file_path, use_cache=True
+            )
         if endpoint_type == "badges":
             default_data = mod_defaults(init_dict=custom_data, host=scm_host)
         else:
             default_data = custom_data
-        click.secho(
-            f"[*] Using custom {endpoint_type} data from [{custom_data_file_path}].....",
-            fg="cyan",
-        )
+        if not quiet:
+            click.secho(
+                f"[*] Using custom {endpoint_type} data from "
+                f"[{custom_data_file_path}].....",
+                fg="cyan",
+            )
         logging.debug(
-            f"[$] Default data (after custom): {json.dumps(default_data, indent=4)}"
+            "[$] Default data (after custom): %s",
+            Lazy(json.dumps, default_data, indent=4),
         )
     return default_data
 
 
-# Generate Endpoints
-def generate_endpoints(
-    endpoint_type=None, project_id=None, group_id=None, custom_config_path=None
-):
+# Stream payloads
+def stream_payload(endpoint_type=None, scm_host=None, custom_data_file_path=None):
     """
-    Get API endpoints
+    Lazily generate labels/badges with attributes from a NDJSON catalog
+
+    Unlike generate_payload the catalog is never held in memory, every entry
+    is parsed when it is requested.
+
+    :param endpoint_type: (str) labels/badges endpoint string
+    :param scm_host: (str) Source code management host url
+    :param custom_data_file_path: (str) Full Path to Labels/badges (NDJSON) file
+    :returns: (generator) (name, attributes) tuples
+    """
+
+    for data_key, data_value in read_ndjson(ndjson_file_path=custom_data_file_path):
+        if endpoint_type == "badges":
+            data_value = mod_default(data_value=data_value, host=scm_host)
+        yield data_key, data_value
+
+
+# Get the login of a host profile
+def get_login(custom_config_path=None, host_profile=None):
+    """
+    Get the login block of the configuration or of one of its host profiles
+
+    Host profiles are named entries of the ``hosts`` block, each with its own
+    protocol, host and token, e.g. one per self-managed GitLab instance.
 
-    :param endpoint_type: (str) labels/badges?
-    :param project_id: (int) GitLab Project ID
-    :param group_id: (int) GitLab Group ID
     :param custom_config_path: (str) Configuration file path
-    :returns: (str) API endpoint
+    :param host_profile: (str) Host profile name, None for the login block
+    :returns: (dict) protocol, host, token and optional run settings
     """
 
     if custom_config_path:
         all_configs = config_manager.load_config(config_file_paths=[custom_config_path])
     else:
         all_configs = config_manager.load_config()
-    protocol = all_configs["login"]["protocol"]
-    host = all_configs["login"]["host"]
-    host_url = f"{protocol}://{host}"
+    if host_profile is None:
+        return all_configs["login"]
+    host_profiles = all_configs.get("hosts") or {}
+    if host_profile not in host_profiles:
+        click.secho(
+            f"[x] Host profile [{host_profile}] not found in the configuration!",
+            fg="red",
+        )
+        sys.exit(1)
+    return host_profiles[host_profile]
+
+
+# Get host url
+def get_host_url(custom_config_path=None, host_profile=None):
+    """
+    Get the GitLab host url from the configuration
+
+    :param custom_config_path: (str) Configuration file path
+    :param host_profile: (str) Host profile name, None for the login block
+    :returns: (str) protocol://host
+    """
+
+    login = get_login(custom_config_path=custom_config_path, host_profile=host_profile)
+    protocol = login["protocol"]
+    host = login["host"]
+    return f"{protocol}://{host}"
+
+
+# Build an endpoint for a project or group
+def build_endpoint(host_url=None, endpoint_type=None, project_id=None, group_id=None):
+    """
+    Build the API endpoint of a project or group
+
+    :param host_url: (str) protocol://host of the GitLab instance
+    :param endpoint_type: (str) labels/badges?
+    :param project_id: (int) GitLab Project ID
+    :param group_id: (int) GitLab Group ID
+    :returns: (str) API endpoint
+    """
+
     if isinstance(project_id, int):
         endpoint = f"{host_url}/api/{api_version}/projects/{project_id}/{endpoint_type}"
     elif isinstance(group_id, int):
@@ -141,23 +306,122 @@ def generate_endpoints(
         click.secho(f"[x] No project ID/Group ID found!", fg="red")
         sys.exit(1)
     logging.debug(f"Endpoint: {endpoint}")
+    return endpoint
+
+
+# Generate Endpoints
+def generate_endpoints(
+    endpoint_type=None, project_id=None, group_id=None, custom_config_path=None
+):
+    """
+    Get API endpoints
+
+    :param endpoint_type: (str) labels/badges?
+    :param project_id: (int) GitLab Project ID
+    :param group_id: (int) GitLab Group ID
+    :param custom_config_path: (str) Configuration file path
+    :returns: (str) API endpoint
+    """
+
+    host_url = get_host_url(custom_config_path=custom_config_path)
+    endpoint = build_endpoint(
+        host_url=host_url,
+        endpoint_type=endpoint_type,
+        project_id=project_id,
+        group_id=group_id,
+    )
     return [endpoint, host_url]
 
 
+# Build the endpoint of a target
+def target_endpoint(host_url=None, endpoint_type=None, target=None):
+    """
+    Build the API endpoint of a (kind, id) target
+
+    :param host_url: (str) protocol://host of the GitLab instance
+    :param endpoint_type: (str) labels/badges?
+    :param target: (tuple) ("project"/"group", numeric id)
+    :returns: (str) API endpoint
+    """
+
+    kind, target_id = target
+    if kind == "group":
+        return build_endpoint(host_url, endpoint_type, group_id=target_id)
+    return build_endpoint(host_url, endpoint_type, project_id=target_id)
+
+
+# Parse a target
+def parse_target(text=None, kind=None):
+    """
+    Parse a target like ``123``, ``project:123``, ``group:45`` or
+    ``eu:project:123``
+
+    A target prefixed with a host profile name is only applied to that host.
+
+    :param text: (str) Target text, a bare number is a project ID
+    :param kind: (str) project/group, the kind of a text without one, like
+        ``123`` or ``eu:123``. None reads the kind from the text
+    :returns: (tuple) ("project"/"group", numeric id), prefixed with the host
+        profile name if the text has one, or None if invalid
+    """
+
+    *prefix, target_id = [part.strip() for part in str(text).strip().split(":")]
+    if kind is None:
+        kind = prefix.pop().lower() if prefix else "project"
+    if kind not in target_kinds or len(prefix) > 1 or prefix == [""]:
+        return None
+    if not target_id.isdigit():
+        return None
+    return (*prefix, kind, int(target_id))
+
+
+# Read targets
+def read_targets(project_ids=(), group_ids=(), targets_file=None):
+    """
+    Lazily generate targets from IDs and a targets file/stream
+
+    The file is read line by line. Empty lines and lines starting with ``#``
+    are ignored.
+
+    :param project_ids: (iterable) Numeric project IDs, optionally prefixed
+        with a host profile name like ``eu:123``
+    :param group_ids: (iterable) Numeric group IDs, like project_ids
+    :param targets_file: (file) Open file with one target per line
+    :returns: (generator) ("project"/"group", numeric id) tuples, prefixed
+        with the host profile name if the target has one
+    """
+
+    for project_id in project_ids:
+        yield parse_target(text=project_id, kind="project")
+    for group_id in group_ids:
+        yield parse_target(text=group_id, kind="group")
+    if targets_file is None:
+        return
+    for line in targets_file:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        target = parse_target(text=line)
+        if target is None:
+            click.secho(f"[!] Invalid target [{line}]. Skipping.....", fg="yellow")
+            continue
+        yield target
+
+
 # Define authentication
-def get_authentication():
+def get_authentication(host_profile=None):
     """
     Generates the authentication
 
+    :param host_profile: (str) Host profile name, None for the login block
     :return: (str/tuple) Authentication
     """
 
     configs = config_manager.load_config()
-    if configs:
-        login = configs["login"]
-    else:
+    if not configs:
         sys.exit(1)
+    login = get_login(host_profile=host_profile)
 
     token = login["token"]
-    logging.debug(f"Authentication Token: {token}")
+    logging.debug("Authentication Token: %s", Lazy(mask, token))
     return token
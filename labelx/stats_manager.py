@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""API call statistics module"""
+
+# Import builtin python libraries
+from array import array
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+
+# Import external python libraries
+import click
+
+# Source code meta data
+__author__ = "Dalwar Hossain"
+__email__ = "dalwar23@pm.me"
+
+# Reported latency percentiles
+percentiles = [50, 95, 99]
+
+# Last path segment that is not an ID
+_endpoint_class = re.compile(r"/([A-Za-z_]+)(?:/\d+)?/?$")
+
+
+# Statistics recorder class
+class StatsRecorder(object):
+    """
+    Records method, endpoint class, status and latency of every API call
+
+    Every HTTP attempt is one call, so a call that is retried twice is
+    recorded three times and counts two retries.
+    """
+
+    def __init__(self, output_file=None):
+        """Constructor method for statistics recorder class"""
+
+        self.output_file = output_file
+        self.started = time.monotonic()
+        self.counts = {}
+        self.latencies = array("d")
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record(
+        self, method=None, api_url=None, status_code=None, latency=None, attempt=1
+    ):
+        """
+        Records one API call
+
+        :param method: (str) API call method
+        :param api_url: (str) API endpoint
+        :param status_code: (int) Response status or None if the call failed
+        :param latency: (float) Seconds the call took
+        :param attempt: (int) Attempt number of the call
+        """
+
+        match = _endpoint_class.search(api_url.split("?", 1)[0])
+        key = (
+            method,
+            match.group(1) if match else "other",
+            str(status_code or "error"),
+        )
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.latencies.append(latency)
+            if attempt > 1:
+                self.retries += 1
+
+    def merge(self, counts=None, latencies=None, retries=0):
+        """
+        Adds the calls recorded by another recorder, e.g. of a worker process
+
+        :param counts: (dict) (method, endpoint, status) -> calls
+        :param latencies: (list) Seconds every call took
+        :param retries: (int) Retried calls
+        """
+
+        with self._lock:
+            for key, count in counts.items():
+                self.counts[key] = self.counts.get(key, 0) + count
+            self.latencies.extend(latencies)
+            self.retries += retries
+
+    def summary(self):
+        """
+        Summarizes the recorded calls
+
+        :returns: (dict) Totals, calls per second, latency percentiles, retries
+            and the calls per method/endpoint/status
+        """
+
+        with self._lock:
+            latencies = sorted(self.latencies)
+            counts = dict(self.counts)
+            retries = self.retries
+        duration = time.monotonic() - self.started
+        total = len(latencies)
+        quantiles = {}
+        for percentile in percentiles:
+            rank = max(math.ceil(percentile / 100 * total) - 1, 0)
+            quantiles[f"p{percentile}"] = latencies[rank] if latencies else 0.0
+        return {
+            "calls": total,
+            "duration_seconds": round(duration, 3),
+            "calls_per_second": round(total / duration, 2) if duration else 0.0,
+            "latency_seconds": {
+                name: round(value, 6) for name, value in quantiles.items()
+            },
+            "latency_seconds_sum": round(sum(latencies), 6),
+            "retries": retries,
+            "by_call": [
+                {
+                    "method": method,
+                    "endpoint": endpoint,
+                    "status": status,
+                    "count": count,
+                }
+                for (method, endpoint, status), count in sorted(counts.items())
+            ],
+        }
+
+
+# Recorder of the run, None when statistics are off
+_stats_recorder = None
+
+
+# Set the statistics recorder of the run
+def set_stats_recorder(recorder=None):
+    """
+    Sets the statistics recorder used by every API call of the run
+
+    :param recorder: (StatsRecorder) Recorder or None to stop recording
+    :returns: (StatsRecorder) The recorder
+    """
+
+    global _stats_recorder
+    _stats_recorder = recorder
+    return recorder
+
+
+# Get the statistics recorder of the run
+def get_stats_recorder():
+    """
+    Returns the statistics recorder of the run
+
+    :returns: (StatsRecorder) Recorder or None if statistics are off
+    """
+
+    return _stats_recorder
+
+
+# Record an API call
+def record_call(method=None, api_url=None, status_code=None, latency=None, attempt=1):
+    """
+    Records an API call if statistics are on
+
+    :param method: (str) API call method
+    :param api_url: (str) API endpoint
+    :param status_code: (int) Response status or None if the call failed
+    :param latency: (float) Seconds the call took
+    :param attempt: (int) Attempt number of the call
+    """
+
+    recorder = _stats_recorder
+    if recorder is not None:
+        recorder.record(method, api_url, status_code, latency, attempt)
+
+
+# Prometheus textfile of a summary
+def _prometheus_text(summary=None):
+    """
+    Formats a summary in the Prometheus text exposition format
+
+    :param summary: (dict) Summary, see StatsRecorder.summary
+    :returns: (str) Prometheus textfile content
+    """
+
+    lines = [
+        "# HELP labelx_api_calls_total API calls by method, endpoint and status.",
+        "# TYPE labelx_api_calls_total counter",
+    ]
+    for call in summary["by_call"]:
+        lines.append(
+            f'labelx_api_calls_total{{method="{call["method"]}",'
+            f'endpoint="{call["endpoint"]}",status="{call["status"]}"}} '
+            f'{call["count"]}'
+        )
+    lines += [
+        "# HELP labelx_api_call_latency_seconds Latency of the API calls.",
+        "# TYPE labelx_api_call_latency_seconds summary",
+    ]
+    for percentile in percentiles:
+        lines.append(
+            f'labelx_api_call_latency_seconds{{quantile="{percentile / 100}"}} '
+            f'{summary["latency_seconds"][f"p{percentile}"]}'
+        )
+    lines += [
+        f"labelx_api_call_latency_seconds_sum {summary['latency_seconds_sum']}",
+        f"labelx_api_call_latency_seconds_count {summary['calls']}",
+        "# HELP labelx_api_retries_total Retried API calls.",
+        "# TYPE labelx_api_retries_total counter",
+        f"labelx_api_retries_total {summary['retries']}",
+        "# HELP labelx_run_duration_seconds Duration of the run.",
+        "# TYPE labelx_run_duration_seconds gauge",
+        f"labelx_run_duration_seconds {summary['duration_seconds']}",
+        "# HELP labelx_api_calls_per_second API calls per second of the run.",
+        "# TYPE labelx_api_calls_per_second gauge",
+        f"labelx_api_calls_per_second {summary['calls_per_second']}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# Write a summary to a file
+def write_stats(output_file=None, summary=None):
+    """
+    Writes a summary as JSON, or as a Prometheus textfile for .prom files
+
+    The file is written next to its final path and renamed, so a textfile
+    collector never reads a partial file.
+
+    :param output_file: (str) Output file path
+    :param summary: (dict) Summary, see StatsRecorder.summary
+    """
+
+    if str(output_file).endswith(".prom"):
+        content = _prometheus_text(summary=summary)
+    else:
+        content = json.dumps(summary, indent=4) + "\n"
+    directory = os.path.dirname(os.path.abspath(output_file))
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(file_descriptor, "w") as stream:
+            stream.write(content)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, output_file)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+# Report the statistics of the run
+def report_stats():
+    """
+    Prints the statistics of the run and writes them to the output file
+
+    :returns: (stdout) Output on screen, nothing if statistics are off
+    """
+
+    recorder = _stats_recorder
+    if recorder is None:
+        return
+    summary = recorder.summary()
+    latency = summary["latency_seconds"]
+    click.secho(
+        f"[*] API calls: {summary['calls']} in {summary['duration_seconds']}s "
+        f"({summary['calls_per_second']} calls/s), retries: {summary['retries']}",
+        fg="cyan",
+    )
+    click.secho(
+        "[*] Latency: "
+        + ", ".join(f"{name} {value * 1000:.1f}ms" for name, value in latency.items()),
+        fg="cyan",
+    )
+    for call in summary["by_call"]:
+        click.secho(
+            f"    {call['method']:<6} {call['endpoint']:<10} {call['status']:<6} "
+            f"{call['count']}",
+            fg="cyan",
+        )
+    if recorder.output_file:
+        write_stats(output_file=recorder.output_file, summary=summary)
+        click.secho(f"[*] Statistics written to [{recorder.output_file}]", fg="cyan")
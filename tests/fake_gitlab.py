@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""In-process fake GitLab server for tests and benchmarks"""
+
+# Import builtin libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+# Endpoints served by the fake server
+collection_path = re.compile(r"^/api/v4/(projects|groups)/(\d+)/(labels|badges)$")
+item_path = re.compile(r"^/api/v4/(projects|groups)/(\d+)/(labels|badges)/(\d+)$")
+target_path = re.compile(r"^/api/v4/(projects|groups)/(\d+)$")
+alias_pattern = re.compile(r"(\w+): labelCreate\(input: \$(\w+)\)")
+
+
+class FakeGitLabHandler(BaseHTTPRequestHandler):
+    """Answers the labels/badges endpoints from the state of its server"""
+
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment, avoids delayed ACK stalls
+    wbufsize = -1
+
+    def _send(self, status=200, body=None, headers=None):
+        content = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _handle(self, method=None):
+        server = self.server
+        body = self._read_body()
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.calls[method] = server.calls.get(method, 0) + 1
+            failure = server.failure()
+        if failure == 429:
+            self._send(429, headers={"Retry-After": str(server.retry_after)})
+            return
+        if failure:
+            self._send(failure)
+            return
+        path = urlsplit(self.path).path
+        query = parse_qs(urlsplit(self.path).query)
+        if method == "POST" and path == "/api/graphql":
+            self._send(200, server.graphql(body))
+            return
+        match = target_path.match(path)
+        if method == "GET" and match:
+            kind, target_id = match.groups()
+            path_field = "path_with_namespace" if kind == "projects" else "full_path"
+            self._send(200, {"id": int(target_id), path_field: f"{kind}/{target_id}"})
+            return
+        match = collection_path.match(path)
+        if match and method == "GET":
+            self._send_page(server.items(match.groups()), query)
+            return
+        if match and method == "POST":
+            status, item = server.create(match.groups(), body)
+            if status == 201 and server.lose_response():
+                self._send(503)
+                return
+            self._send(status, item)
+            return
+        match = item_path.match(path)
+        if match and method in ("PUT", "DELETE"):
+            *key, item_id = match.groups()
+            status, item = server.change(tuple(key), int(item_id), method, body)
+            self._send(status, item)
+            return
+        self._send(404, {"message": "404 Not Found"})
+
+    def _send_page(self, items=None, query=None):
+        per_page = int(query.get("per_page", ["20"])[0])
+        page = int(query.get("page", ["1"])[0])
+        total_pages = max(1, -(-len(items) // per_page))
+        page_items = items[(page - 1) * per_page : page * per_page]
+        etag = f'W/"{hashlib.sha256(json.dumps(page_items).encode()).hexdigest()}"'
+        headers = {"ETag": etag, "X-Total-Pages": str(total_pages)}
+        if page < total_pages:
+            headers["X-Next-Page"] = str(page + 1)
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, headers=headers)
+            return
+        self._send(200, page_items, headers=headers)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeGitLab(ThreadingHTTPServer):
+    """
+    Fake GitLab instance serving labels/badges of projects and groups
+
+    :param latency: (float) Seconds every request takes
+    :param error_rate: (float) Share of requests answered with 503
+    :param throttle_rate: (float) Share of requests answered with 429
+    :param retry_after: (int) Retry-After seconds of the 429 answers
+    :param seed: (int) Seed of the failure decisions
+    :param lost_responses: (int) Creates that are committed but answered with
+        503, like a proxy that times out after GitLab wrote the item
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        retry_after=0,
+        seed=0,
+        lost_responses=0,
+    ):
+        super().__init__(("127.0.0.1", 0), FakeGitLabHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lost_responses = lost_responses
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.state = {}
+        self.next_id = 1
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def failure(self):
+        draw = self.random.random()
+        if draw < self.throttle_rate:
+            return 429
+        if draw < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def lose_response(self):
+        with self.lock:
+            if self.lost_responses <= 0:
+                return False
+            self.lost_responses -= 1
+            return True
+
+    def items(self, key=None):
+        with self.lock:
+            return list(self.state.get(key, {}).values())
+
+    def create(self, key=None, body=None):
+        with self.lock:
+            items = self.state.setdefault(key, {})
+            if any(item.get("name") == body.get("name") for item in items.values()):
+                return 409, {"message": "Label already exists"}
+            item = dict(body, id=self.next_id)
+            self.next_id += 1
+            items[item["id"]] = item
+            return 201, item
+
+    def change(self, key=None, item_id=None, method=None, body=None):
+        with self.lock:
+            items = self.state.get(key, {})
+            if item_id not in items:
+                return 404, {"message": "404 Not Found"}
+            if method == "DELETE":
+                del items[item_id]
+                return 204, None
+            items[item_id].update(body)
+            return 200, items[item_id]
+
+    def graphql(self, body=None):
+        data = {}
+        for alias, variable in alias_pattern.findall(body.get("query", "")):
+            label_input = body["variables"][variable]
+            kind = "projects" if "projectPath" in label_input else "groups"
+            full_path = label_input.get("projectPath") or label_input.get("groupPath")
+            key = (kind, full_path.rsplit("/", 1)[1], "labels")
+            label = {"name": label_input.pop("title")}
+            label.update(
+                (field, value)
+                for field, value in label_input.items()
+                if not field.endswith("Path")
+            )
+            status, _ = self.create(key, label)
+            errors = [] if status == 201 else ["Title has already been taken"]
+            data[alias] = {"errors": errors}
+        return {"data": data}
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+# Import custom (local) python libraries
+from labelx import api_manager, cache_manager
+from tests.fake_gitlab import FakeGitLab
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Records the client port of every request on a keep-alive connection"""
+
+    protocol_version = "HTTP/1.1"
+    client_ports = []
+    throttled = 0
+    unavailable = 0
+    not_modified = 0
+    body_bytes = 0
+    html_pages = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        KeepAliveHandler.client_ports.append(self.client_address[1])
+        if KeepAliveHandler.unavailable:
+            KeepAliveHandler.unavailable -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if KeepAliveHandler.throttled:
+            KeepAliveHandler.throttled -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        page = int(query["page"][0])
+        per_page = int(query["per_page"][0])
+        items = [{"id": number} for number in range(250)]
+        body = json.dumps(items[(page - 1) * per_page : page * per_page]).encode()
+        if KeepAliveHandler.html_pages:
+            KeepAliveHandler.html_pages -= 1
+            body = b"<html><body>502 Bad Gateway</body></html>"
+        etag = f'W/"{hashlib.sha256(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            KeepAliveHandler.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        KeepAliveHandler.body_bytes += len(body)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        if page * per_page < len(items):
+            self.send_header("X-Next-Page", str(page + 1))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestApiManager(unittest.TestCase):
+    """
+    Test api manager class
+    """
+
+    def setUp(self):
+        KeepAliveHandler.client_ports = []
+        KeepAliveHandler.throttled = 0
+        KeepAliveHandler.unavailable = 0
+        KeepAliveHandler.not_modified = 0
+        KeepAliveHandler.body_bytes = 0
+        KeepAliveHandler.html_pages = 0
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_patch = mock.patch.object(
+            cache_manager, "cache_directory", Path(self.cache_dir.name)
+        )
+        self.cache_patch.start()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.host_url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        api_manager.close_sessions()
+        api_manager.set_retry_policy()
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache_patch.stop()
+        self.cache_dir.cleanup()
+
+    # get_session()
+
+    def test_api_manager_get_session_returns_one_session_per_host(self):
+        first = api_manager.get_session(host_url="https://a.gitlab.com")
+        second = api_manager.get_session(host_url="https://a.gitlab.com")
+        other = api_manager.get_session(host_url="https://b.gitlab.com")
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+    def test_api_manager_get_session_holds_headers_and_pool_size(self):
+        session = api_manager.get_session(
+            host_url=self.host_url, pool_size=16, api_headers={"PRIVATE-TOKEN": "x"}
+        )
+        adapter = session.get_adapter(f"{self.host_url}/api/v4/projects/1/labels")
+        self.assertEqual(session.headers["PRIVATE-TOKEN"], "x")
+        self.assertEqual(adapter._pool_maxsize, 16)
+
+    # call_api_endpoint()
+
+    def test_api_manager_call_api_endpoint_reuses_connection(self):
+        for _ in range(5):
+            response = api_manager.call_api_endpoint(
+                method="POST", api_url=f"{self.host_url}/api/v4/projects/1/labels"
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(KeepAliveHandler.client_ports), 5)
+        self.assertEqual(len(set(KeepAliveHandler.client_ports)), 1)
+
+    def test_api_manager_call_api_endpoint_reschedules_too_many_requests(self):
+        KeepAliveHandler.throttled = 2
+        response = api_manager.call_api_endpoint(
+            method="POST", api_url=f"{self.host_url}/api/v4/projects/1/labels"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(KeepAliveHandler.client_ports), 3)
+
+    def test_api_manager_call_api_endpoint_retries_service_unavailable(self):
+        KeepAliveHandler.unavailable = 2
+        with mock.patch.object(api_manager.time, "sleep") as sleep:
+            response = api_manager.call_api_endpoint(
+                method="POST", api_url=f"{self.host_url}/api/v4/projects/1/labels"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_api_manager_call_api_endpoint_accepts_conflict_of_committed_create(self):
+        with FakeGitLab(lost_responses=1) as fake_gitlab, mock.patch.object(
+            api_manager.time, "sleep"
+        ):
+            response = api_manager.call_api_endpoint(
+                method="POST",
+                api_url=f"{fake_gitlab.url}/api/v4/projects/1/labels",
+                data=json.dumps({"name": "bug", "color": "#ff0000"}),
+                api_headers={"Content-Type": "application/json"},
+            )
+            conflict = api_manager.call_api_endpoint(
+                method="POST",
+                api_url=f"{fake_gitlab.url}/api/v4/projects/1/labels",
+                data=json.dumps({"name": "bug", "color": "#ff0000"}),
+                api_headers={"Content-Type": "application/json"},
+            )
+        self.assertEqual((response.status_code, response.reason), (201, "Created"))
+        self.assertEqual(fake_gitlab.calls, {"POST": 3})
+        self.assertEqual(len(fake_gitlab.items(("projects", "1", "labels"))), 1)
+        self.assertEqual(conflict.status_code, 409)
+
+    def test_api_manager_call_api_endpoint_returns_failed_response_when_offline(self):
+        api_manager.set_retry_policy(api_manager.RetryPolicy(max_attempts=3))
+        with socket.socket() as closed_socket:
+            closed_socket.bind(("127.0.0.1", 0))
+            closed_port = closed_socket.getsockname()[1]
+        with mock.patch.object(api_manager.time, "sleep") as sleep:
+            response = api_manager.call_api_endpoint(
+                method="POST", api_url=f"http://127.0.0.1:{closed_port}/api/v4"
+            )
+        self.assertIsInstance(response, api_manager.FailedResponse)
+        self.assertIsNone(response.status_code)
+        self.assertEqual(response.reason, "ConnectionError")
+        self.assertEqual(sleep.call_count, 2)
+
+    # RetryPolicy()
+
+    def test_api_manager_retry_policy_only_retries_transient_failures(self):
+        policy = api_manager.RetryPolicy(max_attempts=3)
+        self.assertIsNone(policy.next_delay(attempt=1, status_code=409))
+        self.assertLessEqual(policy.next_delay(attempt=1, status_code=502), 0.5)
+        self.assertEqual(policy.next_delay(attempt=2, status_code=429), 0.0)
+        self.assertIsNone(policy.next_delay(attempt=3, status_code=503))
+        self.assertEqual(policy.retries, 2)
+
+    def test_api_manager_retry_policy_respects_budget(self):
+        policy = api_manager.RetryPolicy(max_attempts=10, budget=2)
+        delays = [policy.next_delay(attempt=1, error=OSError()) for _ in range(3)]
+        self.assertIsNotNone(delays[1])
+        self.assertIsNone(delays[2])
+
+    # RateLimiter()
+
+    def test_api_manager_rate_limiter_paces_after_burst(self):
+        limiter = api_manager.RateLimiter(rate=10)
+        delays = [limiter.reserve() for _ in range(12)]
+        self.assertEqual(delays[:10], [0.0] * 10)
+        self.assertAlmostEqual(delays[11], 0.2, delta=0.05)
+
+    def test_api_manager_rate_limiter_follows_ratelimit_headers(self):
+        limiter = api_manager.RateLimiter()
+        limiter.update(
+            headers={
+                "RateLimit-Remaining": "100",
+                "RateLimit-Reset": str(time.time() + 10),
+            }
+        )
+        self.assertAlmostEqual(limiter.rate, 9.0, delta=0.5)
+
+    def test_api_manager_rate_limiter_pauses_on_retry_after(self):
+        limiter = api_manager.RateLimiter()
+        limiter.update(headers={"Retry-After": "2"}, status_code=429)
+        self.assertAlmostEqual(limiter.reserve(), 2.0, delta=0.1)
+
+    def test_api_manager_rate_limiter_pauses_until_reset_when_exhausted(self):
+        limiter = api_manager.RateLimiter()
+        limiter.update(
+            headers={
+                "RateLimit-Remaining": "0",
+                "RateLimit-Reset": str(time.time() + 5),
+            }
+        )
+        self.assertAlmostEqual(limiter.reserve(), 5.0, delta=0.2)
+
+    # list_api_endpoint()
+
+    def test_api_manager_list_api_endpoint_follows_pages(self):
+        items = api_manager.list_api_endpoint(
+            api_url=f"{self.host_url}/api/v4/projects/1/labels"
+        )
+        self.assertEqual([item["id"] for item in items], list(range(250)))
+
+    def test_api_manager_list_api_endpoint_fails_on_a_page_that_is_not_json(self):
+        api_url = f"{self.host_url}/api/v4/projects/1/labels"
+        KeepAliveHandler.html_pages = 1
+        with mock.patch.object(api_manager.click, "secho") as secho:
+            self.assertIsNone(api_manager.list_api_endpoint(api_url=api_url))
+        secho.assert_called_once_with(
+            f"[x] Could not list [{api_url}] (not a JSON list)", fg="red"
+        )
+        self.assertEqual(len(api_manager.list_api_endpoint(api_url=api_url)), 250)
+
+    def test_api_manager_list_api_endpoint_reuses_not_modified_pages(self):
+        api_url = f"{self.host_url}/api/v4/projects/1/labels"
+        first = api_manager.list_api_endpoint(api_url=api_url)
+        downloaded = KeepAliveHandler.body_bytes
+        second = api_manager.list_api_endpoint(api_url=api_url)
+        self.assertEqual(first, second)
+        self.assertEqual(KeepAliveHandler.not_modified, 3)
+        self.assertEqual(KeepAliveHandler.body_bytes, downloaded)
+
+    def test_api_manager_response_cache_evicts_least_recently_used(self):
+        with mock.patch.object(
+            cache_manager, "response_cache_size", 3000
+        ), mock.patch.object(cache_manager, "_response_bytes", None):
+            for number in range(10):
+                cache_manager.save_response(
+                    api_url=f"{self.host_url}/api/v4/projects/{number}/labels",
+                    etag="x",
+                    headers={},
+                    content=b"0" * 500,
+                )
+            cached = [
+                cache_manager.load_response(
+                    api_url=f"{self.host_url}/api/v4/projects/{number}/labels"
+                )
+                for number in range(10)
+            ]
+        self.assertIsNone(cached[0])
+        self.assertIsNotNone(cached[9])
+        self.assertLessEqual(
+            sum(size for _, size in cache_manager._response_files()), 3000
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import unittest
+
+# Import custom (local) python libraries
+from benchmarks.bench_controller import run_benchmark
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Test benchmarks class
+    """
+
+    def test_benchmarks_run_benchmark_reports_every_call(self):
+        result = run_benchmark(catalog_size=10, target_count=2, workers=4)
+        self.assertEqual(result["calls"], 20)
+        self.assertGreater(result["calls_per_second"], 0)
+
+    def test_benchmarks_run_benchmark_survives_throttling_and_errors(self):
+        result = run_benchmark(
+            catalog_size=20,
+            target_count=2,
+            workers=4,
+            sync=True,
+            error_rate=0.1,
+            throttle_rate=0.1,
+        )
+        self.assertGreater(result["calls"], 42)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
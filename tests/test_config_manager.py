@@ -6,6 +6,7 @@ import os
 import shutil
 from pathlib import Path
 import unittest
+from unittest import mock
 
 # Import external python libraries
 import yaml
@@ -13,6 +14,7 @@ import yaml
 # Import custom (local) python libraries
 from labelx.config_manager import load_config
 from labelx import __package_name__ as package_name
+from labelx import settings
 
 
 class TestConfigManager(unittest.TestCase):
@@ -72,3 +74,31 @@ class TestConfigManager(unittest.TestCase):
         all_configs = load_config(config_file_paths=[self.config_path])
         base_dir = all_configs["common"]["base_directory"]
         self.assertEqual(base_dir, self.config_path.parent)
+
+    def test_config_manager_parses_config_once_while_unchanged(self):
+        TestConfigManager._create_tmp_config(self)
+        with mock.patch.object(
+            settings, "read_yaml", wraps=settings.read_yaml
+        ) as read_yaml:
+            first = load_config()
+            second = load_config()
+        self.assertIs(first, second)
+        self.assertEqual(read_yaml.call_count, 1)
+
+    def test_config_manager_parses_config_again_when_changed(self):
+        TestConfigManager._create_tmp_config(self)
+        self.assertEqual(load_config()["login"]["token"], "secret")
+        self.config_dict["login"]["token"] = "rotated-secret"
+        TestConfigManager._create_tmp_config(self)
+        config_stat = os.stat(self.config_path)
+        os.utime(
+            self.config_path,
+            ns=(config_stat.st_atime_ns, config_stat.st_mtime_ns + 1000000),
+        )
+        self.assertEqual(load_config()["login"]["token"], "rotated-secret")
+
+    def test_config_manager_looks_up_config_again_when_removed(self):
+        TestConfigManager._create_tmp_config(self)
+        load_config()
+        shutil.rmtree(self.config_path.parent)
+        self.assertRaises(SystemExit, load_config)
@@ -0,0 +1,675 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Import custom (local) python libraries
+from labelx import api_manager, controller, report_manager
+
+
+class FakeResponse(object):
+    """Minimal stand-in for a requests response"""
+
+    def __init__(self, status_code=201, reason="Created"):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = {}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers POSTs with 201, or 409 for names starting with 'taken'"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(random.uniform(0, 0.01))
+        status = 409 if body["name"].startswith("taken") else 201
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestController(unittest.TestCase):
+    """
+    Test controller class
+    """
+
+    def setUp(self):
+        self.catalog = {
+            f"label-{number:03d}": {"color": "#FF0000", "description": None}
+            for number in range(40)
+        }
+        self.failing = {"label-003", "label-017", "label-031"}
+        self.calls = []
+
+    def _fake_call(self, method=None, api_url=None, data=None, api_headers=None):
+        self.calls.append((method, api_url, data))
+        time.sleep(random.uniform(0, 0.01))
+        body = data.decode() if isinstance(data, bytes) else data
+        if body and any(f'"{name}"' in body for name in self.failing):
+            return FakeResponse(status_code=409, reason="Conflict")
+        return FakeResponse()
+
+    def _run_controller(
+        self, workers=1, sync=False, existing=None, targets=None, custom_data_file=None
+    ):
+        with mock.patch.object(
+            controller, "get_host_url", return_value="https://test.gitlab.com"
+        ), mock.patch.object(
+            controller, "get_headers", return_value={}
+        ), mock.patch.object(
+            controller, "get_session"
+        ), mock.patch.object(
+            controller, "get_rate_limiter"
+        ), mock.patch.object(
+            controller, "generate_payload", return_value=self.catalog
+        ), mock.patch.object(
+            controller, "call_api_endpoint", side_effect=self._fake_call
+        ), mock.patch.object(
+            controller, "list_api_endpoint", return_value=existing
+        ), mock.patch.object(
+            controller, "goodbye"
+        ) as goodbye:
+            controller.labelx_controller(
+                endpoint="labels",
+                project_id=1,
+                workers=workers,
+                sync=sync,
+                targets=targets,
+                custom_data_file=custom_data_file,
+            )
+        return goodbye.call_args[1]["data"]
+
+    # _run_ordered()
+
+    def test_controller_run_ordered_keeps_input_order(self):
+        def slow_identity(item):
+            time.sleep(random.uniform(0, 0.01))
+            return item
+
+        results = list(
+            controller._run_ordered(function=slow_identity, items=range(50), workers=8)
+        )
+        self.assertEqual([result for _, result in results], list(range(50)))
+
+    def test_controller_run_ordered_consumes_items_lazily(self):
+        consumed = []
+
+        def items():
+            for number in range(100):
+                consumed.append(number)
+                yield number
+
+        results = controller._run_ordered(function=str, items=items(), workers=4)
+        next(results)
+        self.assertLess(len(consumed), 100)
+        results.close()
+
+    # labelx_controller()
+
+    def test_controller_serial_run_reports_skipped_in_catalog_order(self):
+        skipped = self._run_controller(workers=1)
+        self.assertEqual(skipped, sorted(self.failing))
+
+    def test_controller_concurrent_run_reports_skipped_in_catalog_order(self):
+        skipped = self._run_controller(workers=8)
+        self.assertEqual(skipped, sorted(self.failing))
+        self.assertEqual(len(self.calls), len(self.catalog))
+
+    def test_controller_sync_run_only_writes_missing_and_changed_entries(self):
+        existing = [
+            {"id": 100 + number, "name": name, "color": "#ff0000", "description": ""}
+            for number, name in enumerate(self.catalog)
+            if name not in ("label-005", "label-010")
+        ]
+        existing[0]["color"] = "#00FF00"
+        skipped = self._run_controller(workers=4, sync=True, existing=existing)
+        self.assertEqual(skipped, [])
+        self.assertEqual(
+            [(method, api_url.rsplit("/", 1)[1]) for method, api_url, _ in self.calls],
+            [("PUT", "100"), ("POST", "labels"), ("POST", "labels")],
+        )
+
+    def test_controller_multi_target_run_prefixes_skipped_with_target(self):
+        targets = [("project", 1), ("group", 2)]
+        skipped = self._run_controller(workers=4, targets=iter(targets))
+        self.assertEqual(
+            skipped,
+            [f"project 1: {name}" for name in sorted(self.failing)]
+            + [f"group 2: {name}" for name in sorted(self.failing)],
+        )
+        self.assertEqual(
+            {api_url for _, api_url, _ in self.calls},
+            {
+                "https://test.gitlab.com/api/v4/projects/1/labels",
+                "https://test.gitlab.com/api/v4/groups/2/labels",
+            },
+        )
+
+    def test_controller_streams_ndjson_catalog_per_target(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ndjson_file = os.path.join(temp_dir, "labels.ndjson")
+            with open(ndjson_file, "w") as ndjson_stream:
+                for name, attributes in self.catalog.items():
+                    ndjson_stream.write(json.dumps(dict(attributes, name=name)) + "\n")
+            with mock.patch.object(
+                controller, "stream_payload", wraps=controller.stream_payload
+            ) as stream_payload:
+                skipped = self._run_controller(
+                    workers=4,
+                    targets=iter([("project", 1), ("project", 2)]),
+                    custom_data_file=ndjson_file,
+                )
+        self.assertEqual(stream_payload.call_count, 2)
+        self.assertEqual(len(self.calls), 80)
+        self.assertEqual(
+            skipped,
+            [
+                f"project {target}: {name}"
+                for target in (1, 2)
+                for name in sorted(self.failing)
+            ],
+        )
+
+    def test_controller_exits_without_targets(self):
+        self.assertRaises(SystemExit, self._run_controller, targets=iter([]))
+
+    def test_controller_runs_host_profiles_in_parallel(self):
+        hosts = {"eu": "https://eu.gitlab.com", "us": "https://us.gitlab.com"}
+        reporter = mock.Mock(wraps=report_manager.QuietReporter())
+
+        def fake_call(method=None, api_url=None, data=None, api_headers=None):
+            if api_url.startswith(hosts["eu"]):
+                time.sleep(0.02)
+            api_manager.get_retry_policy().next_delay(attempt=1, status_code=503)
+            return self._fake_call(method, api_url, data, api_headers)
+
+        runs = []
+
+        def host_run(**kwargs):
+            runs.append(real_host_run(**kwargs))
+            return runs[-1]
+
+        real_host_run = controller._host_run
+
+        with mock.patch.object(
+            controller,
+            "get_host_url",
+            side_effect=lambda custom_config_path, host_profile: hosts[host_profile],
+        ), mock.patch.object(
+            controller, "get_login", return_value={"workers": 2}
+        ), mock.patch.object(
+            controller, "get_headers", return_value={}
+        ), mock.patch.object(
+            controller, "get_session"
+        ) as get_session, mock.patch.object(
+            controller, "get_rate_limiter"
+        ), mock.patch.object(
+            controller, "generate_payload", return_value=self.catalog
+        ), mock.patch.object(
+            controller, "call_api_endpoint", side_effect=fake_call
+        ), mock.patch.object(
+            controller, "get_reporter", return_value=reporter
+        ), mock.patch.object(
+            controller, "_host_run", host_run
+        ), mock.patch.object(
+            controller.click, "secho"
+        ) as secho, mock.patch.object(
+            controller, "goodbye"
+        ) as goodbye:
+            controller.labelx_controller(
+                endpoint="labels",
+                targets=iter([("project", 1)]),
+                host_profiles=("eu", "us"),
+            )
+        retry_policies = {id(run.retry_policy) for run in runs}
+        self.assertEqual(
+            sorted(call.kwargs["host_url"] for call in get_session.call_args_list),
+            sorted(hosts.values()),
+        )
+        self.assertEqual(len(self.calls), 2 * len(self.catalog))
+        self.assertEqual(len(retry_policies), 1)
+        self.assertIn(
+            mock.call(f"[*] Retried API calls: {len(self.calls)}", fg="cyan"),
+            secho.call_args_list,
+        )
+        self.assertEqual(
+            sorted(goodbye.call_args[1]["data"]),
+            [
+                f"{host_profile}: project 1: {name}"
+                for host_profile in sorted(hosts)
+                for name in sorted(self.failing)
+            ],
+        )
+        arrived = [call.kwargs["target"] for call in reporter.result.call_args_list]
+        self.assertEqual(
+            arrived[-10:], ["eu: project 1"] * 10, "the slow host held up the other"
+        )
+
+    def test_controller_sends_each_host_only_its_own_targets(self):
+        hosts = {
+            "eu": "https://eu.gitlab.com",
+            "us": "https://us.gitlab.com",
+            "ap": "https://ap.gitlab.com",
+        }
+        self.catalog = {"label-000": {"color": "#FF0000", "description": None}}
+        with mock.patch.object(
+            controller,
+            "get_host_url",
+            side_effect=lambda custom_config_path, host_profile: hosts[host_profile],
+        ), mock.patch.object(
+            controller, "get_login", return_value={}
+        ), mock.patch.object(
+            controller, "get_headers", return_value={}
+        ), mock.patch.object(
+            controller, "get_session"
+        ), mock.patch.object(
+            controller, "get_rate_limiter"
+        ), mock.patch.object(
+            controller, "generate_payload", return_value=self.catalog
+        ), mock.patch.object(
+            controller, "call_api_endpoint", side_effect=self._fake_call
+        ), mock.patch.object(
+            controller.click, "secho"
+        ) as secho, mock.patch.object(
+            controller, "goodbye"
+        ):
+            controller.labelx_controller(
+                endpoint="labels",
+                targets=iter(
+                    [("eu", "project", 1), ("us", "group", 2), ("asia", "project", 4)]
+                ),
+                host_profiles=("eu", "us", "ap"),
+            )
+        self.assertEqual(
+            sorted(api_url for _, api_url, _ in self.calls),
+            [
+                "https://eu.gitlab.com/api/v4/projects/1/labels",
+                "https://us.gitlab.com/api/v4/groups/2/labels",
+            ],
+        )
+        self.assertIn(
+            mock.call(
+                "[!] Target [asia:project:4] is not for a host profile of the run. "
+                "Skipping.....",
+                fg="yellow",
+            ),
+            secho.call_args_list,
+        )
+        self.assertIn(
+            mock.call(
+                "[!] No targets for host profile [ap]. Skipping.....", fg="yellow"
+            ),
+            secho.call_args_list,
+        )
+
+    def test_controller_sharded_run_counts_catalog_once_without_encoding(self):
+        patches = self._patch_run()
+        for patch in patches:
+            patch.start()
+        try:
+            with mock.patch.object(
+                controller, "run_shards", return_value=iter([])
+            ) as run_shards, mock.patch.object(
+                controller, "encode_entry"
+            ) as encode_entry, mock.patch.object(
+                controller, "_report", return_value=[]
+            ):
+                controller.labelx_controller(
+                    endpoint="labels",
+                    targets=iter([("project", 1), ("project", 2)]),
+                    processes=2,
+                )
+            generate_payload = controller.generate_payload
+        finally:
+            for patch in patches:
+                patch.stop()
+        generate_payload.assert_called_once_with(
+            endpoint_type="labels", custom_data_file_path=None
+        )
+        encode_entry.assert_not_called()
+        shards = run_shards.call_args.kwargs["shards"]
+        self.assertEqual(len(shards), 2)
+        self.assertTrue(all(shard["run"]["quiet_catalog"] for shard in shards))
+
+    # labelx_plan() / labelx_apply()
+
+    def _patch_run(self, host="https://test.gitlab.com", existing=None):
+        return [
+            mock.patch.object(controller, "get_host_url", return_value=host),
+            mock.patch.object(
+                controller, "get_headers", return_value={"PRIVATE-TOKEN": "secret"}
+            ),
+            mock.patch.object(controller, "get_session"),
+            mock.patch.object(controller, "get_rate_limiter"),
+            mock.patch.object(
+                controller, "generate_payload", return_value=self.catalog
+            ),
+            mock.patch.object(
+                controller, "call_api_endpoint", side_effect=self._fake_call
+            ),
+            mock.patch.object(controller, "list_api_endpoint", return_value=existing),
+            mock.patch.object(controller, "goodbye"),
+        ]
+
+    def _plan_and_apply(self, apply_host="https://test.gitlab.com"):
+        existing = [
+            {"id": 100 + number, "name": name, "color": "#ff0000"}
+            for number, name in enumerate(self.catalog)
+            if name not in ("label-003", "label-010")
+        ]
+        existing[0]["color"] = "#00FF00"
+        existing.append({"id": 999, "name": "obsolete", "color": "#000000"})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plan_file = os.path.join(temp_dir, "labels.plan")
+            patches = self._patch_run(existing=existing)
+            for patch in patches:
+                patch.start()
+            try:
+                controller.labelx_plan(
+                    endpoint="labels",
+                    plan_file=plan_file,
+                    targets=iter([("project", 1)]),
+                    prune=True,
+                )
+            finally:
+                for patch in patches:
+                    patch.stop()
+            self.assertEqual(self.calls, [])
+            with open(plan_file) as plan_stream:
+                plan_text = plan_stream.read()
+            patches = self._patch_run(host=apply_host)
+            for patch in patches:
+                patch.start()
+            try:
+                controller.labelx_apply(plan_file=plan_file, workers=4)
+                skipped = controller.goodbye.call_args[1]["data"]
+            finally:
+                for patch in patches:
+                    patch.stop()
+        return plan_text, skipped
+
+    def test_controller_plan_writes_changes_and_apply_executes_them(self):
+        plan_text, skipped = self._plan_and_apply()
+        self.assertNotIn("secret", plan_text)
+        self.assertEqual(len(plan_text.splitlines()), 5)
+        self.assertEqual(
+            [(method, api_url.rsplit("/", 1)[1]) for method, api_url, _ in self.calls],
+            [("PUT", "100"), ("POST", "labels"), ("POST", "labels"), ("DELETE", "999")],
+        )
+        self.assertEqual(skipped, ["project 1: label-003"])
+
+    def test_controller_apply_refuses_plan_of_another_host(self):
+        self.assertRaises(
+            SystemExit, self._plan_and_apply, apply_host="https://other.gitlab.com"
+        )
+        self.assertEqual(self.calls, [])
+
+    # labelx_controller(journal_file=...) / labelx_retry_failed()
+
+    def _journaled_run(self, function=None, existing=None, **kwargs):
+        patches = self._patch_run(existing=existing)
+        for patch in patches:
+            patch.start()
+        try:
+            function(**kwargs)
+            return controller.goodbye.call_args[1]["data"]
+        finally:
+            for patch in patches:
+                patch.stop()
+
+    def test_controller_journal_resumes_and_retries_failed_entries(self):
+        targets = [("project", 1), ("group", 2)]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal_file = os.path.join(temp_dir, "run.journal")
+            first = self._journaled_run(
+                function=controller.labelx_controller,
+                endpoint="labels",
+                targets=iter(targets),
+                workers=4,
+                journal_file=journal_file,
+            )
+            self.assertEqual(len(self.calls), 80)
+            self.calls = []
+            resumed = self._journaled_run(
+                function=controller.labelx_controller,
+                endpoint="labels",
+                targets=iter(targets),
+                journal_file=journal_file,
+                resume=True,
+            )
+            self.assertEqual(resumed, first)
+            self.assertEqual(len(self.calls), 6)
+            self.calls = []
+            self.failing = set()
+            existing = [{"id": 1, "name": "label-017", "color": "#ff0000"}]
+            retried = self._journaled_run(
+                function=controller.labelx_retry_failed,
+                existing=existing,
+                journal_file=journal_file,
+            )
+            _, failed = controller.failed_entries(journal_file=journal_file)
+        self.assertEqual(retried, [])
+        self.assertEqual(failed, {})
+        self.assertEqual(
+            sorted((method, api_url) for method, api_url, _ in self.calls),
+            sorted(
+                ("POST", f"https://test.gitlab.com/api/v4/{kind}/labels")
+                for kind in ("groups/2", "projects/1")
+                for _ in ("label-003", "label-031")
+            ),
+        )
+
+    def test_controller_retry_keeps_failures_of_unreadable_targets(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal_file = os.path.join(temp_dir, "run.journal")
+            self._journaled_run(
+                function=controller.labelx_controller,
+                endpoint="labels",
+                targets=iter([("project", 1)]),
+                journal_file=journal_file,
+            )
+            self.calls = []
+            retried = self._journaled_run(
+                function=controller.labelx_retry_failed,
+                existing=None,
+                journal_file=journal_file,
+            )
+            _, failed = controller.failed_entries(journal_file=journal_file)
+        self.assertEqual(retried, ["project 1"])
+        self.assertEqual(self.calls, [])
+        self.assertEqual(failed, {(None, "project:1"): None})
+
+    # labelx_controller(prune=True)
+
+    def _prune_run(self, sync=True, **kwargs):
+        existing = [
+            {"id": 100 + number, "name": name, "color": "#ff0000"}
+            for number, name in enumerate(self.catalog)
+            if name != "label-005"
+        ]
+        existing += [
+            {"id": 900, "name": "obsolete", "color": "#000000"},
+            {"id": 901, "name": "team::backend", "color": "#000000"},
+            {"id": 902, "name": "wontfix", "color": "#000000"},
+        ]
+        return self._journaled_run(
+            function=controller.labelx_controller,
+            existing=existing,
+            endpoint="labels",
+            targets=iter([("project", 1)]),
+            workers=4,
+            sync=sync,
+            prune=True,
+            keep=["team::*"],
+            **kwargs,
+        )
+
+    def test_controller_prune_deletes_entries_missing_from_the_catalog(self):
+        skipped = self._prune_run()
+        self.assertEqual(skipped, [])
+        self.assertEqual(
+            sorted(
+                (method, api_url.rsplit("/", 1)[1]) for method, api_url, _ in self.calls
+            ),
+            [("DELETE", "900"), ("DELETE", "902"), ("POST", "labels")],
+        )
+
+    def test_controller_prune_without_sync_only_creates_missing_entries(self):
+        skipped = self._prune_run(sync=False)
+        self.assertEqual(skipped, [])
+        self.assertEqual(
+            sorted(
+                (method, api_url.rsplit("/", 1)[1]) for method, api_url, _ in self.calls
+            ),
+            [("DELETE", "900"), ("DELETE", "902"), ("POST", "labels")],
+        )
+
+    def test_controller_prune_dry_run_makes_no_calls(self):
+        with mock.patch.object(controller.click, "secho") as secho:
+            self._prune_run(dry_run=True)
+        self.assertEqual(self.calls, [])
+        self.assertFalse(
+            any("up to date" in call.args[0] for call in secho.call_args_list)
+        )
+        self.assertIn(
+            mock.call(
+                "[$] project 1: 2 to delete\n    - obsolete\n    - wontfix", fg="cyan"
+            ),
+            secho.call_args_list,
+        )
+
+    # _walk_groups()
+
+    def test_controller_walk_groups_finds_every_descendant(self):
+        tree = {
+            (1, "subgroups"): [[{"id": 2}, {"id": 3}]],
+            (1, "projects"): [[{"id": 10}]],
+            (2, "subgroups"): [[{"id": 4}]],
+            (2, "projects"): [[{"id": 20}], [{"id": 21}]],
+            (3, "subgroups"): [[]],
+            (3, "projects"): [[{"id": 30}], [{"id": 31}], [{"id": 32}]],
+            (4, "subgroups"): [[]],
+            (4, "projects"): [[{"id": 40}]],
+        }
+
+        def fake_page(api_url=None, api_headers=None, parameters=None, page=1):
+            _, group_id, member = api_url.rsplit("/", 2)
+            pages = tree[(int(group_id), member)]
+            time.sleep(random.uniform(0, 0.005))
+            next_page = page + 1 if page < len(pages) else None
+            # Group 3 does not report the page count, like big GitLab listings
+            total_pages = None if group_id == "3" else len(pages)
+            return pages[page - 1], next_page, total_pages
+
+        with mock.patch.object(controller, "read_api_page", side_effect=fake_page):
+            targets = list(
+                controller._walk_groups(
+                    targets=[("project", 99), ("group", 1)],
+                    host_url="https://test.gitlab.com",
+                    workers=4,
+                )
+            )
+        self.assertEqual(targets[:2], [("project", 99), ("group", 1)])
+        self.assertEqual(
+            sorted(targets[2:]),
+            sorted(
+                [("group", 2), ("group", 3), ("group", 4)]
+                + [("project", n) for n in (10, 20, 21, 30, 31, 32, 40)]
+            ),
+        )
+
+    # _diff_catalog()
+
+    def test_controller_diff_catalog_ignores_inherited_badges(self):
+        all_data = {"license": {"link_url": "a", "image_url": "b", "position": 0}}
+        existing = [
+            {"id": 1, "name": "license", "link_url": "x", "kind": "group"},
+            {"id": 2, "name": "license", "link_url": "a", "kind": "project"},
+        ]
+        changes = controller._diff_catalog(
+            endpoint="badges",
+            all_data=all_data,
+            existing=existing,
+            target_kind="project",
+        )
+        self.assertEqual(changes, {})
+
+    def test_controller_diff_catalog_detects_priority_change(self):
+        all_data = {"Bug": {"color": "#FF0000", "description": None, "priority": 1}}
+        existing = [
+            {"id": 7, "name": "Bug", "color": "#ff0000", "priority": None},
+        ]
+        changes = controller._diff_catalog(
+            endpoint="labels", all_data=all_data, existing=existing
+        )
+        self.assertEqual(changes, {"Bug": ("PUT", 7)})
+
+    # _remote_index() / _stale_entries()
+
+    def test_controller_remote_index_keeps_badges_with_the_same_name(self):
+        existing = [
+            {"id": 9, "name": "pipeline", "kind": "project"},
+            {"id": 4, "name": "pipeline", "kind": "project"},
+            {"id": 5, "name": "coverage", "kind": "project"},
+        ]
+        with mock.patch.object(controller.click, "secho") as secho:
+            remote = controller._remote_index(existing=existing, target_kind="project")
+        secho.assert_called_once()
+        self.assertEqual([item["id"] for item in remote["pipeline"]], [4, 9])
+        stale, kept = controller._stale_entries(
+            remote=remote, names={"pipeline"}, keep=["cover*"]
+        )
+        self.assertEqual(stale, [("pipeline", existing[0])])
+        self.assertEqual(kept, 1)
+
+    # _execute(engine="asyncio")
+
+    def test_controller_asyncio_engine_returns_status_codes_in_order(self):
+        try:
+            import aiohttp
+        except ImportError:
+            self.skipTest("aiohttp is not installed")
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/api/v4/projects/1/labels"
+        names = [f"taken-{n}" if n % 5 == 0 else f"free-{n}" for n in range(30)]
+        items = [
+            (
+                name,
+                {
+                    "method": "POST",
+                    "api_url": url,
+                    "data": json.dumps({"name": name}),
+                    "api_headers": {"Content-Type": "application/json"},
+                },
+            )
+            for name in names
+        ]
+        try:
+            results = list(
+                controller._execute(items=items, engine="asyncio", workers=8)
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual([key for (key, _), _ in results], names)
+        self.assertEqual(
+            [response.status_code for _, response in results],
+            [409 if name.startswith("taken") else 201 for name in names],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
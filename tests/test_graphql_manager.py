@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+import threading
+import unittest
+from unittest import mock
+
+# Import custom (local) python libraries
+from labelx import api_manager, controller, graphql_manager
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    """Implements the project lookup and aliased labelCreate mutations"""
+
+    batches = []
+    existing = set()
+
+    def _send_json(self, body=None):
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        project_id = self.path.rsplit("/", 1)[1]
+        self._send_json({"id": int(project_id), "path_with_namespace": "team/app"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        aliases = re.findall(r"(\w+): labelCreate\(input: \$(\w+)\)", body["query"])
+        GraphQLHandler.batches.append(len(aliases))
+        data = {}
+        for alias, variable in aliases:
+            label_input = body["variables"][variable]
+            if label_input["projectPath"] != "team/app":
+                data[alias] = None
+            elif label_input["title"] in GraphQLHandler.existing:
+                data[alias] = {"errors": ["Title has already been taken"]}
+            else:
+                GraphQLHandler.existing.add(label_input["title"])
+                data[alias] = {"errors": []}
+        self._send_json({"data": data})
+
+    def log_message(self, *args):
+        pass
+
+
+class TestGraphQLManager(unittest.TestCase):
+    """
+    Test GraphQL manager class
+    """
+
+    def setUp(self):
+        GraphQLHandler.batches = []
+        GraphQLHandler.existing = {"label-004", "label-020"}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), GraphQLHandler)
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.host_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.catalog = {
+            f"label-{number:03d}": {"color": "#FF0000", "description": None}
+            for number in range(25)
+        }
+
+    def tearDown(self):
+        api_manager.close_sessions()
+        api_manager.set_retry_policy()
+        self.server.shutdown()
+        self.server.server_close()
+
+    # label_create_batch()
+
+    def test_graphql_manager_label_create_batch_aliases_every_label(self):
+        body = json.loads(
+            graphql_manager.label_create_batch(
+                target_kind="group",
+                full_path="team",
+                entries=[("Bug", {"color": "#FF0000", "priority": 1}), ("Docs", {})],
+            )
+        )
+        self.assertIn("l1: labelCreate(input: $l1)", body["query"])
+        self.assertEqual(
+            body["variables"]["l0"],
+            {"groupPath": "team", "title": "Bug", "color": "#FF0000"},
+        )
+
+    # split_batch_response()
+
+    def test_graphql_manager_split_batch_response_maps_errors_to_aliases(self):
+        response = api_manager.FailedResponse()
+        response.status_code = 200
+        response.content = json.dumps(
+            {
+                "data": {"l0": {"errors": []}, "l1": None, "l2": {"errors": ["x"]}},
+                "errors": [{"message": "denied", "path": ["l1"]}],
+            }
+        ).encode()
+        results = graphql_manager.split_batch_response(response=response, size=3)
+        self.assertEqual(
+            [result.reason for result in results], ["Created", "denied", "x"]
+        )
+
+    # labelx_controller(transport="graphql")
+
+    def test_graphql_manager_controller_creates_labels_in_batches(self):
+        with mock.patch.object(
+            controller, "get_host_url", return_value=self.host_url
+        ), mock.patch.object(
+            controller, "get_headers", return_value={}
+        ), mock.patch.object(
+            controller, "generate_payload", return_value=self.catalog
+        ), mock.patch.object(
+            controller, "goodbye"
+        ) as goodbye:
+            controller.labelx_controller(
+                endpoint="labels",
+                project_id=1,
+                workers=4,
+                transport="graphql",
+                batch_size=10,
+            )
+        self.assertEqual(sorted(GraphQLHandler.batches), [5, 10, 10])
+        self.assertEqual(goodbye.call_args[1]["data"], ["label-004", "label-020"])
+        self.assertEqual(len(GraphQLHandler.existing), 25)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
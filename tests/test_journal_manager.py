@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Import custom (local) python libraries
+from labelx import journal_manager
+
+
+class TestJournalManager(unittest.TestCase):
+    """
+    Test journal manager class
+    """
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.journal_file = os.path.join(directory.name, "run.ndjson")
+
+    # read_journal()
+
+    def test_journal_manager_ignores_a_truncated_last_line(self):
+        journal = journal_manager.Journal(
+            journal_file=self.journal_file, endpoint="labels"
+        )
+        journal.record(target=("project", 1), name="bug", action="POST")
+        journal.close()
+        with open(self.journal_file, "a") as stream:
+            stream.write('{"profile":null,"target":"proj')
+        header, outcomes = journal_manager.read_journal(journal_file=self.journal_file)
+        self.assertEqual(header["endpoint"], "labels")
+        self.assertEqual(list(outcomes), [("labels", None, "project:1", "bug")])
+
+    # completed_entries()
+
+    def test_journal_manager_keeps_the_entries_of_every_endpoint_apart(self):
+        for endpoint in ("labels", "badges"):
+            journal = journal_manager.Journal(
+                journal_file=self.journal_file, endpoint=endpoint
+            )
+            journal.record(target=("project", 1), name=endpoint, action="POST")
+            journal.close()
+        self.assertEqual(
+            journal_manager.completed_entries(
+                journal_file=self.journal_file, endpoint="badges"
+            ),
+            {(None, "project:1", "badges")},
+        )
+
+    # failed_entries()
+
+    def test_journal_manager_lists_the_last_failures(self):
+        journal = journal_manager.Journal(
+            journal_file=self.journal_file, endpoint="labels", host_profiles=["eu"]
+        )
+        journal.record(target=("eu", "project", 1), name=None, ok=False, reason="404")
+        journal.record(target=("eu", "project", 2), name="bug", ok=False, reason="500")
+        journal.record(target=("eu", "project", 2), name="doc", ok=False, reason="500")
+        journal.record(target=("eu", "group", 3), name=None, ok=False, reason="500")
+        journal.record(target=("eu", "group", 3), name="bug", action="POST")
+        journal.close()
+        journal = journal_manager.Journal(
+            journal_file=self.journal_file, endpoint="labels", host_profiles=["eu"]
+        )
+        journal.record(target=("eu", "project", 2), name="doc", action="PUT")
+        journal.close()
+        header, failed = journal_manager.failed_entries(journal_file=self.journal_file)
+        self.assertEqual(header["host_profiles"], ["eu"])
+        self.assertEqual(
+            failed, {("eu", "project:1"): None, ("eu", "project:2"): {"bug"}}
+        )
+
+    def test_journal_manager_lists_failures_with_the_header_of_their_run(self):
+        journal = journal_manager.Journal(
+            journal_file=self.journal_file, endpoint="labels"
+        )
+        journal.record(target=("project", 1), name="bug", ok=False, reason="409")
+        journal.close()
+        journal = journal_manager.Journal(
+            journal_file=self.journal_file, endpoint="badges"
+        )
+        journal.record(target=("project", 1), name="bug", action="POST")
+        journal.close()
+        header, failed = journal_manager.failed_entries(journal_file=self.journal_file)
+        self.assertEqual(header["endpoint"], "labels")
+        self.assertEqual(failed, {(None, "project:1"): {"bug"}})
+
+    def test_journal_manager_refuses_failures_of_different_endpoints(self):
+        for endpoint in ("labels", "badges"):
+            journal = journal_manager.Journal(
+                journal_file=self.journal_file, endpoint=endpoint
+            )
+            journal.record(target=("project", 1), name="bug", ok=False, reason="500")
+            journal.close()
+        with mock.patch.object(journal_manager.click, "secho"):
+            self.assertRaises(
+                SystemExit,
+                journal_manager.failed_entries,
+                journal_file=self.journal_file,
+            )
+
+    # settle()
+
+    def test_journal_manager_settles_entries_found_up_to_date(self):
+        journal = journal_manager.Journal(
+            journal_file=self.journal_file, endpoint="labels"
+        )
+        journal.record(target=("project", 2), name="bug", ok=False, reason="500")
+        journal.record(target=("project", 2), name="doc", ok=False, reason="500")
+        journal.settle(entries=[(None, "project:2", "doc")])
+        journal.close()
+        _, failed = journal_manager.failed_entries(journal_file=self.journal_file)
+        self.assertEqual(failed, {(None, "project:2"): {"bug"}})
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import logging
+import unittest
+from unittest import mock
+
+# Import custom (local) python libraries
+from labelx import log_manager
+
+
+class TestLogManager(unittest.TestCase):
+    """
+    Test log manager class
+    """
+
+    # Lazy()
+
+    def test_log_manager_lazy_is_only_formatted_when_emitted(self):
+        function = mock.Mock(return_value="formatted")
+        logger = logging.getLogger("labelx.tests.lazy")
+        logger.setLevel(logging.INFO)
+        logger.debug("Data: %s", log_manager.Lazy(function, 1, indent=4))
+        function.assert_not_called()
+        with self.assertLogs(logger, level="DEBUG") as logs:
+            logger.debug("Data: %s", log_manager.Lazy(function, 1, indent=4))
+        function.assert_called_once_with(1, indent=4)
+        self.assertEqual(logs.records[0].getMessage(), "Data: formatted")
+
+    # mask_secrets()
+
+    def test_log_manager_masks_nested_secrets(self):
+        data = {
+            "PRIVATE-TOKEN": "glpat-abcdefghijkl1234",
+            "login": {"host": "gitlab.com", "token": "short"},
+        }
+        self.assertEqual(
+            log_manager.mask_secrets(data=data),
+            {
+                "PRIVATE-TOKEN": "****1234",
+                "login": {"host": "gitlab.com", "token": "****"},
+            },
+        )
+        self.assertEqual(data["login"]["token"], "short")
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
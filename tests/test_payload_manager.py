@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import json
+import unittest
+from unittest import mock
+
+# Import custom (local) python libraries
+from labelx import payload_manager
+
+
+class TestPayloadManager(unittest.TestCase):
+    """
+    Test payload manager class
+    """
+
+    # dumps()
+
+    def test_payload_manager_dumps_compact_utf8_json(self):
+        with mock.patch.object(payload_manager, "orjson", None):
+            body = payload_manager.dumps({"name": "Ünïcode", "priority": 1})
+        self.assertEqual(body, '{"name":"Ünïcode","priority":1}'.encode("utf-8"))
+
+    # encode_entry()
+
+    def test_payload_manager_encodes_entry_once(self):
+        badge = {
+            "name": "pipeline",
+            "link_url": "https://a/%{project_path}/-/commits/%{default_branch}",
+            "description": None,
+        }
+        payload = payload_manager.encode_entry(data_value=badge)
+        self.assertIsInstance(payload.body, bytes)
+        self.assertEqual(json.loads(payload.body), badge)
+
+    def test_payload_manager_returns_none_on_type_error(self):
+        self.assertIsNone(
+            payload_manager.encode_entry(data_value={"name": "Bug", "color": {1, 2}})
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import json
+import os
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+# Import external python libraries
+import yaml
+
+# Import custom (local) python libraries
+from labelx import controller, process_manager, stats_manager
+from tests.fake_gitlab import FakeGitLab
+
+
+class ExitOnUnpickle(object):
+    """Ends the worker process while its shard is unpickled"""
+
+    def __reduce__(self):
+        return os._exit, (3,)
+
+
+class TestProcessManager(unittest.TestCase):
+    """
+    Test process manager class
+    """
+
+    # split_targets()
+
+    def test_process_manager_splits_targets_round_robin(self):
+        targets = [("project", number) for number in range(5)]
+        self.assertEqual(
+            process_manager.split_targets(targets=targets, shards=2),
+            [targets[0::2], targets[1::2]],
+        )
+        self.assertEqual(
+            process_manager.split_targets(targets=targets[:1], shards=4), [targets[:1]]
+        )
+
+    # run_shards()
+
+    def test_process_manager_aggregates_worker_results(self):
+        targets = [("project", number) for number in range(1, 7)]
+        recorder = stats_manager.set_stats_recorder(stats_manager.StatsRecorder())
+        self.addCleanup(stats_manager.set_stats_recorder, None)
+        with FakeGitLab() as fake_gitlab, tempfile.TemporaryDirectory() as home:
+            fake_gitlab.state[("projects", "3", "labels")] = {
+                1: {"id": 1, "name": "label-02"}
+            }
+            config_dir = Path(home) / ".config" / "labelx"
+            config_dir.mkdir(parents=True)
+            protocol, host = fake_gitlab.url.split("://")
+            with open(config_dir / "config.yaml", "w") as config_stream:
+                yaml.dump(
+                    {"login": {"protocol": protocol, "host": host, "token": "x"}},
+                    config_stream,
+                )
+            catalog_file = os.path.join(home, "labels.ndjson")
+            with open(catalog_file, "w") as catalog_stream:
+                for number in range(5):
+                    catalog_stream.write(
+                        json.dumps({"name": f"label-{number:02d}", "color": "#000000"})
+                        + "\n"
+                    )
+            with mock.patch.dict(os.environ, {"HOME": home}), mock.patch.object(
+                controller, "get_host_url", return_value=fake_gitlab.url
+            ), mock.patch.object(
+                controller, "get_headers", return_value={}
+            ), mock.patch.object(
+                controller, "goodbye"
+            ) as goodbye:
+                controller.labelx_controller(
+                    endpoint="labels",
+                    custom_data_file=catalog_file,
+                    targets=iter(targets),
+                    workers=2,
+                    processes=2,
+                    output_mode="quiet",
+                )
+        self.assertEqual(fake_gitlab.calls, {"POST": 30})
+        self.assertEqual(goodbye.call_args[1]["data"], ["project 3: label-02"])
+        self.assertEqual(recorder.summary()["calls"], 30)
+
+    def test_process_manager_stops_when_a_worker_dies_without_reporting(self):
+        with mock.patch.object(
+            process_manager, "worker_poll_seconds", 0.1
+        ), mock.patch.object(process_manager.click, "secho") as secho:
+            with self.assertRaises(SystemExit):
+                list(
+                    process_manager.run_shards(
+                        shards=[{"crash": ExitOnUnpickle()}], reporter=None, totals={}
+                    )
+                )
+        secho.assert_called_once_with(
+            "[x] Worker process 0 exited with code 3 before finishing!", fg="red"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import os
+import pstats
+import tempfile
+import unittest
+
+# Import external python libraries
+from click.testing import CliRunner
+
+# Import custom (local) python libraries
+from labelx.app import mission_control
+
+
+class TestProfileManager(unittest.TestCase):
+    """
+    Test profile manager class
+    """
+
+    def _run_profiled(self, arguments=None):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profile_file = os.path.join(temp_dir, "run.pstats")
+            result = CliRunner().invoke(
+                mission_control,
+                ["--profile", profile_file, "--profile-memory"] + arguments,
+            )
+            stats = pstats.Stats(profile_file)
+            with open(f"{profile_file}.memory.txt") as memory_stream:
+                memory_report = memory_stream.read()
+            self.assertTrue(os.path.exists(f"{profile_file}.txt"))
+        return result, stats, memory_report
+
+    def test_profile_manager_profiles_the_selected_command(self):
+        result, stats, memory_report = self._run_profiled(["pkg-info"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue(any(function == "pkg_info" for _, _, function in stats.stats))
+        self.assertIn("peak", memory_report)
+
+    def test_profile_manager_writes_profile_when_command_exits(self):
+        result, stats, _ = self._run_profiled(["create-labels"])
+        self.assertEqual(result.exit_code, 1)
+        self.assertTrue(
+            any(function == "create_labels" for _, _, function in stats.stats)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import io
+import unittest
+from unittest import mock
+
+# Import external python libraries
+from click.testing import CliRunner
+import click
+
+# Import custom (local) python libraries
+from labelx import report_manager
+
+
+class TestReportManager(unittest.TestCase):
+    """
+    Test report manager class
+    """
+
+    # Run a reporter and capture its output
+    @staticmethod
+    def _run(reporter_class, results, **kwargs):
+        runner = CliRunner(mix_stderr=False)
+
+        @click.command()
+        def report():
+            reporter = reporter_class(**kwargs)
+            for result in results:
+                reporter.result(**result)
+            reporter.close()
+
+        return runner.invoke(report)
+
+    # VerboseReporter()
+
+    def test_report_manager_verbose_prints_one_line_per_entry(self):
+        output = self._run(
+            report_manager.VerboseReporter,
+            [
+                {"target": "project 1", "name": "bug", "action": "POST"},
+                {
+                    "name": "feature",
+                    "action": "PUT",
+                    "ok": False,
+                    "reason": "Forbidden",
+                },
+            ],
+        ).stdout
+        self.assertEqual(
+            output.splitlines(),
+            [
+                "[$] Creating - [project 1] [bug] ..... DONE",
+                "[$] Updating - [feature] ..... FAILED (Forbidden)",
+            ],
+        )
+
+    # QuietReporter()
+
+    def test_report_manager_quiet_prints_the_failure_summary(self):
+        results = [{"name": "ok", "action": "POST"}]
+        results += [
+            {"target": "group 2", "name": f"l{n}", "action": "POST", "ok": False}
+            for n in range(report_manager.max_listed_failures + 2)
+        ]
+        for result in results[1:]:
+            result["reason"] = "Bad Request"
+        results.append({"target": "project 3", "action": "GET", "ok": False})
+        results[-1]["reason"] = "Not readable"
+        lines = self._run(report_manager.QuietReporter, results).stdout.splitlines()
+        self.assertEqual(lines[0], "[x] 23 failed: Bad Request (22), Not readable (1)")
+        self.assertEqual(lines[1], "    group 2: l0 (Bad Request)")
+        self.assertEqual(lines[-1], "    ... and 3 more")
+        self.assertEqual(len(lines), report_manager.max_listed_failures + 2)
+
+    def test_report_manager_quiet_prints_nothing_without_failures(self):
+        output = self._run(
+            report_manager.QuietReporter, [{"name": "bug", "action": "POST"}]
+        ).output
+        self.assertEqual(output, "")
+
+    # ProgressReporter()
+
+    def test_report_manager_progress_shows_throughput_and_eta(self):
+        stream = io.StringIO()
+        with mock.patch("labelx.report_manager.time.monotonic", return_value=0.0):
+            reporter = report_manager.ProgressReporter(total=40, stream=stream)
+        with mock.patch("labelx.report_manager.time.monotonic", return_value=10.0):
+            reporter.advance(count=9)
+            reporter.result(name="bug", action="POST", ok=False, reason="Conflict")
+            reporter.close()
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(
+            lines[-1],
+            "[*] [#######-----------------------] 10/40, 1 failed, 1.0/s, ETA 00:30",
+        )
+
+    def test_report_manager_progress_redraws_at_most_every_interval(self):
+        stream = io.StringIO()
+        stream.isatty = lambda: True
+        reporter = report_manager.ProgressReporter(total=1000, stream=stream)
+        for number in range(1000):
+            reporter.result(name=f"l{number}", action="POST")
+        self.assertLessEqual(stream.getvalue().count("\r"), 2)
+
+    # get_reporter()
+
+    def test_report_manager_defaults_to_quiet_off_a_terminal(self):
+        with mock.patch("labelx.report_manager.sys.stderr", io.StringIO()):
+            reporter = report_manager.get_reporter(total=3)
+        self.assertIsInstance(reporter, report_manager.QuietReporter)
+        self.assertEqual(reporter.total, 3)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
@@ -2,16 +2,21 @@
 # -*- coding: utf-8 -*-
 
 # Import builtin libraries
+import io
 import os
 import shutil
 from pathlib import Path
+import tempfile
 import unittest
+from unittest import mock
 
 # Import external python libraries
 import yaml
 
 # Import custom (local) python libraries
 from labelx.settings import generate_payload, generate_endpoints, read_yaml
+from labelx.settings import parse_target, read_targets, read_ndjson, stream_payload
+from labelx import cache_manager, settings
 from labelx import __package_name__ as package_name
 
 
@@ -39,8 +44,15 @@ class TestSettings(unittest.TestCase):
         self.config_dir = Path(f"{package_name}")
         self.config_file = "config.yaml"
         self.config_path = self.base_dir / self.config_dir / self.config_file
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_patch = mock.patch.object(
+            cache_manager, "cache_directory", Path(self.cache_dir.name)
+        )
+        self.cache_patch.start()
 
     def tearDown(self):
+        self.cache_patch.stop()
+        self.cache_dir.cleanup()
         if self.txt_test_file_path.exists():
             os.remove(self.txt_test_file_path)
         if self.config_path.parent.exists():
@@ -78,6 +90,30 @@ class TestSettings(unittest.TestCase):
         TestSettings._create_txt_file(self)
         self.assertFalse(read_yaml(yaml_file_path=self.txt_test_file_path))
 
+    # read_yaml(yaml_file_path=None, use_cache=True)
+
+    def test_settings_read_yaml_reuses_cached_catalog(self):
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch.object(
+            cache_manager, "cache_directory", Path(cache_dir)
+        ), mock.patch.object(yaml, "load", wraps=yaml.load) as load:
+            first = read_yaml(yaml_file_path=self.test_labels_file_path, use_cache=True)
+            second = read_yaml(
+                yaml_file_path=self.test_labels_file_path, use_cache=True
+            )
+        self.assertEqual(first, second)
+        self.assertEqual(load.call_count, 1)
+
+    def test_settings_read_yaml_parses_changed_catalog_again(self):
+        with tempfile.TemporaryDirectory() as cache_dir, mock.patch.object(
+            cache_manager, "cache_directory", Path(cache_dir)
+        ):
+            catalog_path = Path(cache_dir) / "catalog.yaml"
+            catalog_path.write_text("Bug:\n  color: '#FF0000'\n")
+            read_yaml(yaml_file_path=catalog_path, use_cache=True)
+            catalog_path.write_text("Bug:\n  color: '#00FF00'\n")
+            catalog = read_yaml(yaml_file_path=catalog_path, use_cache=True)
+        self.assertEqual(catalog["Bug"]["color"], "#00FF00")
+
     # generate_payload(endpoint_type=None)
     # test labels - payload
 
@@ -232,6 +268,108 @@ class TestSettings(unittest.TestCase):
             "https://test.gitlab.com/api/v4/projects/1234/badges",
         )
 
+    # parse_target(text=None, kind=None)
+    # read_targets(project_ids=(), group_ids=(), targets_file=None)
+
+    def test_settings_parse_target_accepts_bare_and_prefixed_ids(self):
+        self.assertEqual(parse_target(text="12"), ("project", 12))
+        self.assertEqual(parse_target(text="project:34"), ("project", 34))
+        self.assertEqual(parse_target(text=" Group:56 "), ("group", 56))
+
+    def test_settings_parse_target_accepts_host_profile_prefix(self):
+        self.assertEqual(parse_target(text="eu:project:12"), ("eu", "project", 12))
+        self.assertEqual(parse_target(text="eu:45", kind="group"), ("eu", "group", 45))
+        self.assertEqual(parse_target(text=45, kind="group"), ("group", 45))
+
+    def test_settings_parse_target_returns_none_if_invalid(self):
+        self.assertIsNone(parse_target(text="user:12"))
+        self.assertIsNone(parse_target(text="project:abc"))
+        self.assertIsNone(parse_target(text="eu:us:project:12"))
+        self.assertIsNone(parse_target(text=":project:12"))
+
+    def test_settings_read_targets_combines_ids_and_file(self):
+        targets_file = io.StringIO("# comment\n3\n\ngroup:4\nfoo\n")
+        targets = read_targets(
+            project_ids=(1,), group_ids=("eu:2",), targets_file=targets_file
+        )
+        self.assertEqual(
+            list(targets),
+            [("project", 1), ("eu", "group", 2), ("project", 3), ("group", 4)],
+        )
+
+    # read_ndjson(ndjson_file_path=None)
+
+    def test_settings_read_ndjson_skips_empty_and_invalid_lines(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ndjson_file = Path(temp_dir) / "labels.ndjson"
+            ndjson_file.write_text(
+                '{"name": "bug", "color": "#FF0000"}\n\n'
+                '{"color": "#00FF00"}\nnot json\n'
+                '{"name": "docs", "color": "#0000FF"}\n'
+            )
+            entries = list(read_ndjson(ndjson_file_path=ndjson_file))
+        self.assertEqual(
+            entries, [("bug", {"color": "#FF0000"}), ("docs", {"color": "#0000FF"})]
+        )
+
+    def test_settings_stream_payload_adds_host_to_badge_links(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ndjson_file = Path(temp_dir) / "badges.jsonl"
+            ndjson_file.write_text(
+                '{"name": "ci", "link_url": "%{project_path}", "image_url": "x"}\n'
+            )
+            entries = stream_payload(
+                endpoint_type="badges",
+                scm_host="https://test.gitlab.com",
+                custom_data_file_path=ndjson_file,
+            )
+            self.assertEqual(
+                next(entries)[1]["link_url"], "https://test.gitlab.com/%{project_path}"
+            )
+            self.assertEqual(
+                generate_payload(
+                    endpoint_type="badges",
+                    scm_host="https://test.gitlab.com",
+                    custom_data_file_path=ndjson_file,
+                )["ci"]["link_url"],
+                "https://test.gitlab.com/%{project_path}",
+            )
+
+    # generate_payload() debug logging
+
+    def test_settings_generate_payload_skips_debug_serialization(self):
+        with mock.patch.object(settings.json, "dumps") as dumps:
+            generate_payload(endpoint_type="labels")
+        dumps.assert_not_called()
+        with mock.patch.object(
+            settings.json, "dumps", wraps=settings.json.dumps
+        ) as dumps, self.assertLogs(level="DEBUG") as logs:
+            generate_payload(endpoint_type="labels")
+        dumps.assert_called_once()
+        self.assertTrue(any("Builtin data" in line for line in logs.output))
+
+    # get_login()
+
+    def test_settings_get_login_reads_host_profiles(self):
+        self.config_dict["hosts"] = {
+            "eu": {"host": "gitlab.eu.test", "protocol": "https", "token": "eu"}
+        }
+        TestSettings._create_tmp_config(self)
+        self.assertEqual(
+            settings.get_host_url(host_profile="eu"), "https://gitlab.eu.test"
+        )
+        self.assertEqual(settings.get_authentication(host_profile="eu"), "eu")
+        self.assertEqual(settings.get_host_url(), "https://test.gitlab.com")
+        self.assertRaises(SystemExit, settings.get_login, host_profile="us")
+
+    # get_authentication()
+
+    def test_settings_get_authentication_does_not_log_the_token(self):
+        TestSettings._create_tmp_config(self)
+        with self.assertLogs(level="DEBUG") as logs:
+            self.assertEqual(settings.get_authentication(), "secret")
+        self.assertFalse(any("secret" in line for line in logs.output))
+
 
 if __name__ == "__main__":
     unittest.main(buffer=True)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import subprocess
+import sys
+import unittest
+
+# Cumulative import time budget of a cold 'labelx --help' (microseconds)
+startup_budget_us = 150000
+
+# Modules only the API commands need
+heavy_modules = ["requests", "urllib3", "yaml", "aiohttp", "concurrent.futures"]
+
+run_cli = """
+import sys
+from labelx.app import mission_control
+try:
+    mission_control({arguments})
+except SystemExit:
+    pass
+print("heavy:" + ",".join(m for m in {heavy_modules} if m in sys.modules))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    """
+    Test startup class
+    """
+
+    # Run python in a fresh interpreter
+    def _run_python(self, code=None, import_time=False):
+        command = [sys.executable]
+        if import_time:
+            command += ["-X", "importtime"]
+        result = subprocess.run(
+            command + ["-c", code],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        return result.stdout.splitlines() + result.stderr.splitlines()
+
+    # Top-level imports and their cumulative time
+    def _import_times(self, lines=None):
+        import_times = {}
+        for line in lines:
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            _, cumulative, name = line.split("|")
+            if len(name) - len(name.lstrip()) == 1:
+                import_times[name.strip()] = int(cumulative)
+        return import_times
+
+    def test_startup_help_does_not_import_heavy_modules(self):
+        for arguments in (["--help"], ["create-labels", "--help"], ["pkg-info"]):
+            code = run_cli.format(arguments=arguments, heavy_modules=heavy_modules)
+            lines = self._run_python(code=code)
+            imported = [line for line in lines if line.startswith("heavy:")]
+            self.assertEqual(imported, ["heavy:"], f"labelx {' '.join(arguments)}")
+
+    def test_startup_help_import_time_is_within_budget(self):
+        code = run_cli.format(arguments=["--help"], heavy_modules=heavy_modules)
+        baseline = self._import_times(self._run_python("pass", import_time=True))
+        cli = self._import_times(self._run_python(code, import_time=True))
+        startup_us = sum(
+            cumulative for name, cumulative in cli.items() if name not in baseline
+        )
+        self.assertLess(startup_us, startup_budget_us)
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)
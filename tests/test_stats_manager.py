@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Import builtin libraries
+import json
+import os
+import tempfile
+import unittest
+
+# Import custom (local) python libraries
+from labelx import api_manager, stats_manager
+from tests.fake_gitlab import FakeGitLab
+
+
+class TestStatsManager(unittest.TestCase):
+    """
+    Test stats manager class
+    """
+
+    def setUp(self):
+        self.recorder = stats_manager.set_stats_recorder(stats_manager.StatsRecorder())
+
+    def tearDown(self):
+        stats_manager.set_stats_recorder(None)
+        api_manager.close_sessions()
+        api_manager.set_retry_policy()
+
+    # StatsRecorder()
+
+    def test_stats_manager_summary_reports_percentiles_and_classes(self):
+        for number in range(1, 101):
+            stats_manager.record_call(
+                method="POST",
+                api_url=f"https://test.gitlab.com/api/v4/projects/{number}/labels",
+                status_code=201,
+                latency=number / 1000,
+            )
+        stats_manager.record_call(
+            method="PUT",
+            api_url="https://test.gitlab.com/api/v4/groups/3/labels/17",
+            status_code=None,
+            latency=0.5,
+            attempt=2,
+        )
+        summary = self.recorder.summary()
+        self.assertEqual(summary["calls"], 101)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(
+            summary["latency_seconds"], {"p50": 0.051, "p95": 0.096, "p99": 0.1}
+        )
+        self.assertEqual(
+            summary["by_call"],
+            [
+                {"method": "POST", "endpoint": "labels", "status": "201", "count": 100},
+                {"method": "PUT", "endpoint": "labels", "status": "error", "count": 1},
+            ],
+        )
+
+    def test_stats_manager_records_every_attempt_of_api_calls(self):
+        with FakeGitLab(throttle_rate=0.3, seed=3) as fake_gitlab:
+            for number in range(10):
+                response = api_manager.call_api_endpoint(
+                    method="POST",
+                    api_url=f"{fake_gitlab.url}/api/v4/projects/1/labels",
+                    data=json.dumps({"name": f"label-{number}"}),
+                    api_headers={"Content-Type": "application/json"},
+                )
+                self.assertEqual(response.status_code, 201)
+        summary = self.recorder.summary()
+        self.assertEqual(summary["calls"], sum(fake_gitlab.calls.values()))
+        self.assertEqual(summary["retries"], summary["calls"] - 10)
+        self.assertGreater(summary["retries"], 0)
+
+    # write_stats()
+
+    def test_stats_manager_writes_json_and_prometheus_files(self):
+        stats_manager.record_call("GET", "https://a/api/v4/projects/1", 200, 0.01)
+        summary = self.recorder.summary()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_file = os.path.join(temp_dir, "run.json")
+            prom_file = os.path.join(temp_dir, "run.prom")
+            stats_manager.write_stats(output_file=json_file, summary=summary)
+            stats_manager.write_stats(output_file=prom_file, summary=summary)
+            with open(json_file) as json_stream:
+                self.assertEqual(json.load(json_stream)["calls"], 1)
+            with open(prom_file) as prom_stream:
+                prom_text = prom_stream.read()
+        self.assertIn(
+            'labelx_api_calls_total{method="GET",endpoint="projects",status="200"} 1',
+            prom_text,
+        )
+        self.assertIn(
+            'labelx_api_call_latency_seconds{quantile="0.99"} 0.01', prom_text
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(buffer=True)